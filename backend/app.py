@@ -3,13 +3,21 @@ Application Flask principale pour l'interface de collation automatique.
 Routes et API pour gérer les collations de manuscrits.
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 import json
 import os
+from config import (COLLATION_ENGINE, COLLATION_ENGINES, MIN_WITNESSES, MAX_WITNESSES,
+                    COLLATE_PAGE_DEFAULT_LIMIT, COLLATE_PAGE_MAX_LIMIT)
 from works import WorkManager
-from collate import perform_collation
+from collate import collation_cache_key, iter_collation, perform_collation
+from chapter_index import chapter_index_store
+from collation_cache import collation_cache
+from collation_queue import collation_queue
 from decisions import DecisionManager, WordDecisionManager
+from file_lock import file_lock, write_json_atomic
+from jobs import job_manager, compute_chapter_mapping
+from vocabulary import vocabulary_store
 
 app = Flask(__name__, 
             template_folder='../frontend/templates',
@@ -32,6 +40,71 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def witness_count_error(witness_ids):
+    """Message d'erreur si le nombre de témoins est hors limites, sinon None."""
+    if not MIN_WITNESSES <= len(witness_ids) <= MAX_WITNESSES:
+        return f"Il faut entre {MIN_WITNESSES} et {MAX_WITNESSES} témoins"
+    return None
+
+
+def witnesses_from_args():
+    """
+    Liste des témoins passée en paramètres de requête : ?wit=a&wit=b&...
+    ou, forme historique, ?wit1=a&wit2=b&wit3=c (wit1, wit2, ... jusqu'au premier absent).
+    """
+    witnesses = request.args.getlist('wit')
+    if witnesses:
+        return witnesses
+    while request.args.get(f'wit{len(witnesses) + 1}'):
+        witnesses.append(request.args.get(f'wit{len(witnesses) + 1}'))
+    return witnesses
+
+
+def collate_window(data):
+    """
+    Fenêtre de vers demandée à /api/collate.
+    
+    Formes acceptées (par ordre de priorité) :
+    - cursor : curseur retourné par la page précédente ("{offset}" ou "{offset}:{cache_key}") ;
+    - verse_start / verse_end : plage de numéros de vers (1-based, bornes incluses) ;
+    - offset / limit.
+    
+    Returns:
+        Tuple ((offset, limit) ou None pour tout le chapitre, clé de cache du curseur ou None)
+    
+    Raises:
+        ValueError: paramètres invalides
+    """
+    cursor = data.get('cursor')
+    cursor_key = None
+    limit = data.get('limit')
+    if cursor is not None:
+        offset, _, cursor_key = str(cursor).partition(':')
+        offset = int(offset)
+    elif data.get('verse_start') is not None or data.get('verse_end') is not None:
+        offset = int(data.get('verse_start') or 1) - 1
+        if data.get('verse_end') is not None:
+            limit = int(data['verse_end']) - offset
+    elif data.get('offset') is not None or limit is not None:
+        offset = int(data.get('offset') or 0)
+    else:
+        return None, None
+    
+    limit = COLLATE_PAGE_DEFAULT_LIMIT if limit is None else int(limit)
+    if offset < 0 or limit < 1:
+        raise ValueError("Fenêtre de vers invalide")
+    return (offset, min(limit, COLLATE_PAGE_MAX_LIMIT)), cursor_key or None
+
+
+def load_chapter_exclusions(work_id):
+    """Charge les exclusions de chapitres sauvegardées ({witness_id: [index...]})."""
+    exclusions_file = f'../data/decisions/{work_id}_chapter_exclusions.json'
+    if not os.path.exists(exclusions_file):
+        return {}
+    with open(exclusions_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('excluded_chapters', {})
+
+
 @app.route('/')
 def index():
     """Page d'accueil avec l'interface de visualisation."""
@@ -201,6 +274,30 @@ def get_chapters(work_id):
     return jsonify({"status": "success", "chapters": chapters})
 
 
+@app.route('/api/works/<work_id>/vocabulary', methods=['GET'])
+def get_work_vocabulary(work_id):
+    """
+    Statistiques du vocabulaire d'une œuvre : nombre de formes normalisées
+    distinctes et formes les plus fréquentes de chaque témoin.
+    Paramètre optionnel : limit (défaut 20).
+    """
+    witnesses = work_manager.list_witnesses(work_id)
+    if not witnesses:
+        return jsonify({"status": "error", "message": "Aucun témoin disponible"}), 404
+    
+    try:
+        limit = int(request.args.get('limit', 20))
+        # Enregistrer les fréquences des témoins pas encore rencontrés
+        for witness in witnesses:
+            vocabulary_store.witness_ids(work_id, witness['file'])
+        statistics = vocabulary_store.statistics(work_id, limit=limit)
+        return jsonify({"status": "success", "vocabulary": statistics})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @app.route('/api/validate-chapters', methods=['POST'])
 def validate_chapters():
     """
@@ -214,17 +311,17 @@ def validate_chapters():
     if not all([work_id, witness_ids]):
         return jsonify({"status": "error", "message": "Paramètres manquants"}), 400
     
-    if len(witness_ids) != 3:
-        return jsonify({"status": "error", "message": "3 témoins requis"}), 400
+    error = witness_count_error(witness_ids)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         # Récupérer les informations des témoins
-        witnesses = work_manager.list_witnesses(work_id)
         witness_files = {}
         witness_names = {}
         
         for wit_id in witness_ids:
-            witness = next((w for w in witnesses if w['id'] == wit_id), None)
+            witness = work_manager.get_witness(work_id, wit_id)
             if not witness:
                 return jsonify({"status": "error", "message": f"Témoin {wit_id} introuvable"}), 404
             witness_files[wit_id] = witness['file']
@@ -235,26 +332,27 @@ def validate_chapters():
         max_chapters = 0
         
         for wit_id, file_path in witness_files.items():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data_array = json.load(f)
-                num_chapters = len(data_array)
-                max_chapters = max(max_chapters, num_chapters)
-                
-                chapters_info = []
-                for chapter_index, chapter_data in enumerate(data_array):
-                    # Compter uniquement les vers MainZone
-                    mainzone_count = sum(1 for verse in chapter_data if verse.get('region') == 'MainZone')
-                    chapters_info.append({
-                        "chapter_number": chapter_index + 1,
-                        "mainzone_verses": mainzone_count,
-                        "total_verses": len(chapter_data)
-                    })
-                
-                analysis[wit_id] = {
-                    "name": witness_names[wit_id],
-                    "total_chapters": num_chapters,
-                    "chapters": chapters_info
-                }
+            # Index des chapitres (reconstruit si le témoin a changé)
+            index = chapter_index_store.get(file_path)
+            num_chapters = len(index['chapters'])
+            max_chapters = max(max_chapters, num_chapters)
+            
+            # Compter les vers MainZone par chapitre (précalculés dans l'index)
+            chapters_info = []
+            for chapter in index['chapters']:
+                chapters_info.append({
+                    "chapter_number": chapter['index'] + 1,
+                    "mainzone_verses": chapter['mainzone_verses'],
+                    "total_verses": chapter['total_verses'],
+                    "first_page": chapter['first_page'],
+                    "last_page": chapter['last_page']
+                })
+            
+            analysis[wit_id] = {
+                "name": witness_names[wit_id],
+                "total_chapters": num_chapters,
+                "chapters": chapters_info
+            }
         
         # Déterminer si warning nécessaire
         chapter_counts = [analysis[wit_id]["total_chapters"] for wit_id in witness_ids]
@@ -278,14 +376,7 @@ def get_chapter_exclusions(work_id):
     Recupere les exclusions de chapitres sauvegardees pour une oeuvre.
     """
     try:
-        exclusions_file = f'../data/decisions/{work_id}_chapter_exclusions.json'
-        
-        if os.path.exists(exclusions_file):
-            with open(exclusions_file, 'r', encoding='utf-8') as f:
-                exclusions_data = json.load(f)
-            return jsonify({"status": "success", "excluded_chapters": exclusions_data.get('excluded_chapters', {})})
-        else:
-            return jsonify({"status": "success", "excluded_chapters": {}})
+        return jsonify({"status": "success", "excluded_chapters": load_chapter_exclusions(work_id)})
     
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -308,13 +399,13 @@ def save_chapter_exclusions():
         # Creer le repertoire si necessaire
         os.makedirs('../data/decisions', exist_ok=True)
         
-        # Sauvegarder dans un fichier JSON
+        # Sauvegarder dans un fichier JSON (écriture atomique, sous verrou inter-processus)
         exclusions_file = f'../data/decisions/{work_id}_chapter_exclusions.json'
-        with open(exclusions_file, 'w', encoding='utf-8') as f:
-            json.dump({
+        with file_lock(exclusions_file):
+            write_json_atomic(exclusions_file, {
                 "work_id": work_id,
                 "excluded_chapters": excluded_chapters
-            }, f, indent=2, ensure_ascii=False)
+            })
         
         return jsonify({"status": "success", "message": "Exclusions sauvegardees"})
     
@@ -324,37 +415,44 @@ def save_chapter_exclusions():
 
 # ============ Routes pour la collation ============
 
-@app.route('/api/collate', methods=['POST'])
-def collate_texts():
+def collate_request(data):
     """
-    API endpoint pour lancer une collation.
-    Attend un JSON avec work_id, witness_ids (liste de 3), chapter_index, et optionnel chapter_mapping.
-    chapter_mapping: {witness_id: original_chapter_index} pour utiliser des chapitres différents par témoin.
-    """
-    data = request.json
+    Lit et vérifie les paramètres d'une requête de collation (/api/collate
+    et /api/collate/stream).
     
+    Returns:
+        Tuple (paramètres, None) ou (None, réponse d'erreur Flask)
+    """
     work_id = data.get('work_id')
     witness_ids = data.get('witness_ids')
     chapter_index = data.get('chapter_index')
     chapter_mapping = data.get('chapter_mapping')  # Optionnel: {witness_id: original_chapter_index}
+    engine = data.get('engine') or COLLATION_ENGINE
     
     if not all([work_id, witness_ids, chapter_index is not None]):
-        return jsonify({"status": "error", "message": "Paramètres manquants"}), 400
+        return None, (jsonify({"status": "error", "message": "Paramètres manquants"}), 400)
     
-    if len(witness_ids) != 3:
-        return jsonify({"status": "error", "message": "Il faut exactement 3 témoins"}), 400
+    if engine not in COLLATION_ENGINES:
+        return None, (jsonify({"status": "error", "message": f"Moteur de collation inconnu : {engine}"}), 400)
     
-    # Récupérer les informations des témoins
-    witnesses = work_manager.list_witnesses(work_id)
+    error = witness_count_error(witness_ids)
+    if error:
+        return None, (jsonify({"status": "error", "message": error}), 400)
+    
+    try:
+        window, cursor_key = collate_window(data)
+    except (TypeError, ValueError):
+        return None, (jsonify({"status": "error", "message": "Fenêtre de vers invalide"}), 400)
     
+    # Récupérer les informations des témoins
     witness_files = []
     witness_names = []
     chapter_indices = []  # Index original pour chaque témoin
     
     for wit_id in witness_ids:
-        wit = next((w for w in witnesses if w['id'] == wit_id), None)
+        wit = work_manager.get_witness(work_id, wit_id)
         if not wit:
-            return jsonify({"status": "error", "message": f"Témoin {wit_id} non trouvé"}), 404
+            return None, (jsonify({"status": "error", "message": f"Témoin {wit_id} non trouvé"}), 404)
         witness_files.append(wit['file'])
         witness_names.append(wit['name'])
         
@@ -364,24 +462,356 @@ def collate_texts():
         else:
             chapter_indices.append(chapter_index)
     
+    return {
+        'work_id': work_id,
+        'witness_ids': witness_ids,
+        'chapter_index': chapter_index,
+        'cursor_key': cursor_key,
+        'collation': {
+            'witness_files': witness_files,
+            'witness_names': witness_names,
+            'chapter_indices': chapter_indices,
+            'engine': engine,
+            'use_cache': data.get('use_cache'),
+            'work_id': work_id,
+            'verse_alignment': data.get('verse_alignment'),
+            'window': window
+        }
+    }, None
+
+
+def cursor_error(params, results):
+    """
+    Réponse 409 si la page demandée par curseur ne porte plus sur la même
+    collation (témoin mis à jour entre deux pages), sinon None.
+    Ajoute sinon le curseur de la page suivante à results['window'].
+    """
+    if 'window' not in results:
+        return None
+    if params['cursor_key'] and params['cursor_key'] != results.get('cache_key'):
+        return jsonify({
+            "status": "error",
+            "message": "La collation a changé depuis la page précédente : recommencer au début"
+        }), 409
+    next_offset = results['window']['next_offset']
+    results['window']['cursor'] = None if next_offset is None else (
+        f"{next_offset}:{results['cache_key']}" if results.get('cache_key') else str(next_offset))
+    return None
+
+
+def reconcile_word_decisions(params, results):
+    """
+    Témoin mis à jour depuis la dernière collation : rattache les décisions
+    de mots aux vers de la nouvelle collation (collation complète, ou dernière
+    page d'une collation paginée dont le chapitre complet est en cache).
+    
+    Returns:
+        Nombre de décisions déplacées / signalées (voir reconcile_chapter), ou None
+    """
+    if not results.get('cache_key'):
+        return None
+    paged = len(results['verses']) != results['total_verses']
+    if paged and results.get('window', {}).get('next_offset') is not None:
+        return None
+    work_id, witness_ids, chapter_index = (params['work_id'], params['witness_ids'],
+                                           params['chapter_index'])
+    previous_key = word_decision_manager.get_chapter_collation(work_id, witness_ids, chapter_index)
+    if previous_key == results['cache_key']:
+        return None
+    if paged:
+        results = collation_cache.get(results['cache_key'])
+        if results is None:
+            return None
+    previous = collation_cache.get(previous_key) if previous_key else None
+    return word_decision_manager.reconcile_chapter(
+        work_id, witness_ids, chapter_index, results, previous)
+
+
+@app.route('/api/collate', methods=['POST'])
+def collate_texts():
+    """
+    API endpoint pour lancer une collation.
+    Attend un JSON avec work_id, witness_ids (liste de MIN_WITNESSES à MAX_WITNESSES IDs), chapter_index, et optionnel chapter_mapping.
+    chapter_mapping: {witness_id: original_chapter_index} pour utiliser des chapitres différents par témoin.
+    engine (optionnel): 'verse' (un appel CollateX par vers) ou 'chapter' (un appel par chapitre).
+    use_cache (optionnel, défaut COLLATION_CACHE_ENABLED): false pour forcer le recalcul.
+    verse_alignment (optionnel, défaut VERSE_ALIGNMENT): true pour apparier les vers
+    par similarité plutôt que par rang (vers manquants, ajoutés ou coupés).
+    Si un témoin a changé depuis la dernière collation du chapitre, les décisions
+    de mots sont rattachées aux nouveaux vers (word_decision_changes dans la réponse).
+    offset / limit, verse_start / verse_end ou cursor (optionnels, voir collate_window) :
+    ne retourner qu'une fenêtre de vers, avec 'window' (dont 'cursor' de la page suivante).
+    async (optionnel, défaut false) : déposer la collation dans la file (réponse 202
+    avec la tâche, à suivre via /api/collate/jobs/<job_id>).
+    """
+    data = request.json or {}
+    params, error = collate_request(data)
+    if error:
+        return error
+    
     try:
-        # Effectuer la collation avec chapters spécifiques par témoin
-        results = perform_collation(witness_files, witness_names, chapter_indices)
-        
-        if 'error' in results:
-            return jsonify({"status": "error", "message": results['error']}), 500
-        
-        # Charger les décisions existantes pour ce chapitre
-        decisions = decision_manager.load_decisions(work_id, chapter_index)
+        if data.get('async'):
+            return enqueue_collation(params)
         
-        # Enrichir les résultats avec les décisions
-        for verse in results['verses']:
-            verse_num = verse['verse_number']
-            decision = decision_manager.get_decision_for_verse(work_id, chapter_index, verse_num)
-            verse['user_decision'] = decision
+        # Effectuer la collation avec chapters spécifiques par témoin
+        results = perform_collation(**params['collation'])
+        return collation_response(params, results)
+    
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+def collation_response(params, results):
+    """
+    Réponse de /api/collate pour un résultat de collation : rattache les
+    décisions de mots si un témoin a changé et ajoute les décisions de vers.
+    """
+    if 'error' in results:
+        return jsonify({"status": "error", "message": results['error']}), 500
+    
+    error = cursor_error(params, results)
+    if error:
+        return error
+    
+    changes = reconcile_word_decisions(params, results)
+    if changes is not None:
+        results['word_decision_changes'] = changes
+    
+    # Charger une seule fois les décisions existantes pour ce chapitre
+    decisions = decision_manager.get_decisions_by_verse(params['work_id'], params['chapter_index'])
+    
+    # Enrichir les résultats avec les décisions
+    for verse in results['verses']:
+        verse['user_decision'] = decisions.get(verse['verse_number'])
+    
+    return jsonify({"status": "success", "data": results})
+
+
+def enqueue_collation(params):
+    """
+    Dépose une collation complète dans la file (collation_queue.py) :
+    réponse 202 avec l'état de la tâche. La tâche est partagée avec les
+    demandes du même contenu, et terminée aussitôt si le résultat est en cache.
+    """
+    collation = params['collation']
+    if collation['use_cache'] is False:
+        return jsonify({"status": "error",
+                        "message": "Une collation asynchrone passe par le cache : use_cache doit être vrai"}), 400
+    
+    cache_key = collation_cache_key(collation['witness_files'], collation['witness_names'],
+                                    collation['chapter_indices'], engine=collation['engine'],
+                                    verse_alignment=collation['verse_alignment'])
+    if cache_key is None:
+        return jsonify({"status": "error", "message": "Impossible de charger les données de tous les témoins"}), 500
+    
+    params = dict(params, cursor_key=None, collation=dict(collation, window=None))
+    job = collation_queue.enqueue(cache_key, params)
+    return jsonify({"status": "success", "job": job}), 202
+
+
+@app.route('/api/collate/jobs/<job_id>', methods=['GET'])
+def get_collation_job(job_id):
+    """État d'une collation asynchrone (queued, running, done, error)."""
+    job = collation_queue.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Tâche introuvable"}), 404
+    return jsonify({"status": "success", "job": job})
+
+
+@app.route('/api/collate/jobs/<job_id>/result', methods=['GET'])
+def get_collation_job_result(job_id):
+    """
+    Résultat d'une collation asynchrone, au format de /api/collate.
+    202 avec l'état de la tâche si elle n'est pas terminée, 410 si le
+    résultat a été évincé du cache depuis.
+    """
+    job = collation_queue.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Tâche introuvable"}), 404
+    if job['status'] == 'error':
+        return jsonify({"status": "error", "message": job['error'], "job": job}), 500
+    if job['status'] != 'done':
+        return jsonify({"status": "success", "job": job}), 202
+    
+    try:
+        results = collation_cache.get(job['cache_key'])
+        if results is None:
+            return jsonify({"status": "error",
+                            "message": "Résultat expiré : relancer la collation", "job": job}), 410
+        return collation_response(collation_queue.get_params(job_id), results)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/api/collate/stream', methods=['POST'])
+def collate_stream():
+    """
+    Variante en flux de /api/collate (mêmes paramètres) : chaque vers est
+    envoyé dès qu'il est aligné. Événements (voir collate.iter_collation) :
+    'header' (témoins, similarités, distances, window), un 'verse' par vers
+    ({verse} avec user_decision), puis 'summary' (alignment_tiers, timing,
+    word_decision_changes) ; 'error' en cas d'échec pendant le flux.
+    Format : NDJSON (une ligne JSON par événement, champ "event"), ou
+    Server-Sent Events avec format: 'sse' ou Accept: text/event-stream.
+    """
+    data = request.json or {}
+    params, error = collate_request(data)
+    if error:
+        return error
+    
+    events = iter_collation(**params['collation'])
+    try:
+        header = next(events)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    if header['event'] == 'error':
+        return jsonify({"status": "error", "message": header['message']}), 500
+    error = cursor_error(params, header)
+    if error:
+        return error
+    
+    decisions = decision_manager.get_decisions_by_verse(params['work_id'], params['chapter_index'])
+    sse = data.get('format') == 'sse' or request.accept_mimetypes.best == 'text/event-stream'
+    
+    def encode(event):
+        payload = json.dumps(event, ensure_ascii=False)
+        return f"event: {event['event']}\ndata: {payload}\n\n" if sse else payload + '\n'
+    
+    def generate():
+        yield encode(header)
+        verses = []
+        try:
+            for event in events:
+                if event['event'] == 'verse':
+                    verse = event['verse']
+                    verse['user_decision'] = decisions.get(verse['verse_number'])
+                    verses.append(verse)
+                elif event['event'] == 'summary':
+                    changes = reconcile_word_decisions(params, {**header, 'verses': verses})
+                    if changes is not None:
+                        event['word_decision_changes'] = changes
+                yield encode(event)
+        except Exception as e:
+            yield encode({'event': 'error', 'message': str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/works/<work_id>/collate-all', methods=['POST'])
+def collate_all(work_id):
+    """
+    Lance en arrière-plan la collation de tous les chapitres d'une œuvre.
+    Attend: {witness_ids: [IDs], engine?}
+    Les chapitres sont appariés selon les exclusions sauvegardées
+    (voir /api/chapter-exclusions). Les résultats alimentent le cache.
+    """
+    data = request.json or {}
+    witness_ids = data.get('witness_ids')
+    engine = data.get('engine') or COLLATION_ENGINE
+    
+    error = witness_count_error(witness_ids or [])
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    
+    if engine not in COLLATION_ENGINES:
+        return jsonify({"status": "error", "message": f"Moteur de collation inconnu : {engine}"}), 400
+    
+    selected = []
+    for wit_id in witness_ids:
+        wit = work_manager.get_witness(work_id, wit_id)
+        if not wit:
+            return jsonify({"status": "error", "message": f"Témoin {wit_id} non trouvé"}), 404
+        selected.append(wit)
+    
+    try:
+        chapter_counts = {w['id']: work_manager.get_witness_chapters(w['file']) for w in selected}
+        chapters = compute_chapter_mapping(witness_ids, chapter_counts, load_chapter_exclusions(work_id))
         
-        return jsonify({"status": "success", "data": results})
+        job = job_manager.start_collate_all(
+            work_id,
+            witness_ids,
+            [w['file'] for w in selected],
+            [w['name'] for w in selected],
+            chapters,
+            engine=engine
+        )
+        return jsonify({"status": "success", "job": job}), 202
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Retourne l'état d'une tâche de collation en arrière-plan.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Tâche non trouvée"}), 404
+    return jsonify({"status": "success", "job": job})
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Demande l'arrêt d'une tâche de collation en arrière-plan.
+    """
+    if job_manager.cancel(job_id):
+        return jsonify({"status": "success"})
+    return jsonify({"status": "error", "message": "Tâche non trouvée ou déjà terminée"}), 404
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Flux Server-Sent Events de la progression d'une tâche.
+    Événements 'progress' à chaque chapitre, puis 'done' à la fin.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Tâche non trouvée"}), 404
     
+    def generate():
+        for state in job_manager.iter_events(job_id):
+            if state is None:
+                yield ": keep-alive\n\n"
+                continue
+            event = 'done' if state['status'] in ('done', 'error', 'cancelled') else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/collation-cache', methods=['GET'])
+def get_collation_cache_stats():
+    """
+    Retourne les statistiques du cache disque des collations.
+    """
+    return jsonify({"status": "success", "cache": collation_cache.stats()})
+
+
+@app.route('/api/collation-cache', methods=['DELETE'])
+def invalidate_collation_cache():
+    """
+    Invalide le cache des collations.
+    Paramètre optionnel: key (clé retournée par /api/collate dans cache_key).
+    Sans clé, tout le cache est vidé.
+    """
+    try:
+        removed = collation_cache.invalidate(request.args.get('key'))
+        return jsonify({"status": "success", "removed": removed})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -477,8 +907,9 @@ def save_word_decision():
     if not all([work_id, witnesses, chapter_index is not None, verse_number is not None, position is not None]):
         return jsonify({"status": "error", "message": "Paramètres manquants"}), 400
     
-    if len(witnesses) != 3:
-        return jsonify({"status": "error", "message": "Exactement 3 témoins requis"}), 400
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         word_decision_manager.save_word_decision(
@@ -502,16 +933,13 @@ def save_word_decision():
 def get_word_decisions(work_id, chapter_index):
     """
     Récupère toutes les décisions de mots pour un chapitre.
-    Nécessite les témoins en paramètre (wit1, wit2, wit3).
+    Nécessite les témoins en paramètres (wit=...&wit=..., ou wit1, wit2, ...).
     """
-    witnesses = [
-        request.args.get('wit1'),
-        request.args.get('wit2'),
-        request.args.get('wit3')
-    ]
+    witnesses = witnesses_from_args()
     
-    if not all(witnesses):
-        return jsonify({"status": "error", "message": "Les 3 témoins sont requis (wit1, wit2, wit3)"}), 400
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         decisions = word_decision_manager.load_word_decisions(work_id, witnesses, chapter_index)
@@ -524,16 +952,13 @@ def get_word_decisions(work_id, chapter_index):
 def delete_word_decision(work_id, chapter_index, verse_number, position):
     """
     Supprime une décision de mot.
-    Nécessite les témoins en paramètres (wit1, wit2, wit3).
+    Nécessite les témoins en paramètres (wit=...&wit=..., ou wit1, wit2, ...).
     """
-    witnesses = [
-        request.args.get('wit1'),
-        request.args.get('wit2'),
-        request.args.get('wit3')
-    ]
+    witnesses = witnesses_from_args()
     
-    if not all(witnesses):
-        return jsonify({"status": "error", "message": "Les 3 témoins sont requis (wit1, wit2, wit3)"}), 400
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         success = word_decision_manager.delete_word_decision(
@@ -551,16 +976,13 @@ def delete_word_decision(work_id, chapter_index, verse_number, position):
 def get_word_decisions_configuration(work_id):
     """
     Récupère la configuration actuelle (témoins, chapitres exclus).
-    Nécessite les témoins en paramètres (wit1, wit2, wit3).
+    Nécessite les témoins en paramètres (wit=...&wit=..., ou wit1, wit2, ...).
     """
-    witnesses = [
-        request.args.get('wit1'),
-        request.args.get('wit2'),
-        request.args.get('wit3')
-    ]
+    witnesses = witnesses_from_args()
     
-    if not all(witnesses):
-        return jsonify({"status": "error", "message": "Les 3 témoins sont requis"}), 400
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         config = word_decision_manager.get_configuration(work_id, witnesses)
@@ -569,20 +991,37 @@ def get_word_decisions_configuration(work_id):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/api/word-decisions/export/<work_id>', methods=['GET'])
+def export_word_decisions(work_id):
+    """
+    Exporte toutes les décisions de mots d'une configuration au format JSON
+    historique ({work_id, witnesses, excluded_chapters, chapters, last_modified}).
+    Nécessite les témoins en paramètres (wit=...&wit=..., ou wit1, wit2, ...).
+    """
+    witnesses = witnesses_from_args()
+    
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    
+    try:
+        export = word_decision_manager.export_json(work_id, witnesses)
+        return jsonify({"status": "success", "export": export})
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @app.route('/api/count-decisions/<work_id>', methods=['GET'])
 def count_decisions(work_id):
     """
     Compte le nombre total de décisions pour une œuvre + témoins.
-    Nécessite les témoins en paramètres (wit1, wit2, wit3).
+    Nécessite les témoins en paramètres (wit=...&wit=..., ou wit1, wit2, ...).
     """
-    witnesses = [
-        request.args.get('wit1'),
-        request.args.get('wit2'),
-        request.args.get('wit3')
-    ]
+    witnesses = witnesses_from_args()
     
-    if not all(witnesses):
-        return jsonify({"status": "error", "message": "Les 3 témoins sont requis"}), 400
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         count = word_decision_manager.count_all_decisions(work_id, witnesses)
@@ -595,16 +1034,13 @@ def count_decisions(work_id):
 def delete_all_decisions(work_id):
     """
     Supprime toutes les décisions pour une œuvre + témoins.
-    Nécessite les témoins en paramètres (wit1, wit2, wit3).
+    Nécessite les témoins en paramètres (wit=...&wit=..., ou wit1, wit2, ...).
     """
-    witnesses = [
-        request.args.get('wit1'),
-        request.args.get('wit2'),
-        request.args.get('wit3')
-    ]
+    witnesses = witnesses_from_args()
     
-    if not all(witnesses):
-        return jsonify({"status": "error", "message": "Les 3 témoins sont requis"}), 400
+    error = witness_count_error(witnesses)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
     
     try:
         deleted = word_decision_manager.delete_all_decisions(work_id, witnesses)
@@ -624,7 +1060,7 @@ def export_all_decisions():
         - valid_chapters: Liste des chapitres validés avec leur numéro normalisé
           [{index: 0, label: "Chapitre 1"}, ...]
         - witness_names: Liste des noms des témoins
-        - witnesses: Liste des IDs des témoins [wit1, wit2, wit3]
+        - witnesses: Liste des IDs des témoins [wit1, wit2, ...]
     
     Returns:
         Liste de toutes les variantes conservées avec le numéro de chapitre normalisé
@@ -633,14 +1069,15 @@ def export_all_decisions():
         data = request.json
         work_id = data.get('work_id')
         valid_chapters = data.get('valid_chapters', [])
-        witness_names = data.get('witness_names', ['Témoin 1', 'Témoin 2', 'Témoin 3'])
         witnesses = data.get('witnesses', [])
+        witness_names = data.get('witness_names') or [f'Témoin {i + 1}' for i in range(len(witnesses))]
         
         if not work_id:
             return jsonify({"status": "error", "message": "work_id requis"}), 400
         
-        if not witnesses or len(witnesses) != 3:
-            return jsonify({"status": "error", "message": "3 témoins requis"}), 400
+        error = witness_count_error(witnesses)
+        if error:
+            return jsonify({"status": "error", "message": error}), 400
         
         all_decisions = []
         
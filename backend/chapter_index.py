@@ -0,0 +1,223 @@
+"""
+Module d'index des chapitres des témoins.
+Un fichier annexe ({témoin}.index.json) décrit chaque chapitre : nombre de
+vers, histogramme des régions, position en octets dans le fichier source
+et plage de pages. Les endpoints de listing et de validation des chapitres
+répondent à partir de ces quelques Ko au lieu de reparser tout le témoin.
+"""
+
+import json
+import os
+import threading
+
+from file_lock import write_atomic
+from witness_reader import iter_chapters, read_chapter_at
+
+# Version du format de l'index.
+# À incrémenter quand la structure produite par build_chapter_index change.
+CHAPTER_INDEX_VERSION = 1
+
+INDEX_SUFFIX = '.index.json'
+
+
+def index_path(witness_file):
+    """
+    Retourne le chemin du fichier d'index d'un témoin.
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+
+    Returns:
+        Chemin du fichier annexe (témoin.json → témoin.index.json)
+    """
+    base, ext = os.path.splitext(witness_file)
+    if ext.lower() != '.json':
+        base = witness_file
+    return base + INDEX_SUFFIX
+
+
+def describe_chapter(index, chapter, start, end):
+    """
+    Calcule les métadonnées d'un chapitre.
+
+    Args:
+        index: Index du chapitre (0-based)
+        chapter: Liste des vers du chapitre
+        start: Position du début du chapitre dans le fichier (octets)
+        end: Position de fin (octets, exclue)
+
+    Returns:
+        Dict des métadonnées du chapitre
+    """
+    verses = chapter if isinstance(chapter, list) else []
+    regions = {}
+    pages = []
+    for verse in verses:
+        if not isinstance(verse, dict):
+            continue
+        region = verse.get('region', '')
+        regions[region] = regions.get(region, 0) + 1
+        page = verse.get('page')
+        if page and (not pages or pages[-1] != page):
+            pages.append(page)
+
+    return {
+        'index': index,
+        'offset': start,
+        'length': end - start,
+        'total_verses': len(verses),
+        'mainzone_verses': regions.get('MainZone', 0),
+        'regions': regions,
+        'first_page': pages[0] if pages else None,
+        'last_page': pages[-1] if pages else None,
+        'page_count': len(set(pages))
+    }
+
+
+def build_chapter_index(witness_file):
+    """
+    Construit l'index des chapitres d'un témoin (un seul parcours en flux du fichier).
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+
+    Returns:
+        Dict {version, source: {mtime_ns, size}, chapters: [...]}
+    """
+    stat = os.stat(witness_file)
+    with open(witness_file, 'rb') as f:
+        chapters = [
+            describe_chapter(index, chapter, offset, offset + length)
+            for index, (chapter, offset, length) in enumerate(iter_chapters(f))
+        ]
+
+    return {
+        'version': CHAPTER_INDEX_VERSION,
+        'source': {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size},
+        'chapters': chapters
+    }
+
+
+class ChapterIndexStore:
+    """
+    Accès aux index de chapitres, avec cache mémoire.
+
+    L'index est écrit à côté du témoin lors de son ajout, puis reconstruit
+    à la demande si le témoin a changé sur disque (mtime, taille) ou si le
+    format de l'index a évolué.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_valid(index, stat):
+        """Vérifie qu'un index correspond à l'état actuel du témoin."""
+        return (
+            isinstance(index, dict)
+            and index.get('version') == CHAPTER_INDEX_VERSION
+            and index.get('source') == {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        )
+
+    def get(self, witness_file):
+        """
+        Récupère l'index d'un témoin (mémoire, puis fichier annexe, puis reconstruction).
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            Dict de l'index (voir build_chapter_index)
+        """
+        key = os.path.abspath(witness_file)
+        stat = os.stat(key)
+
+        with self._lock:
+            index = self._entries.get(key)
+        if self._is_valid(index, stat):
+            return index
+
+        index = self._read(index_path(key))
+        if not self._is_valid(index, stat):
+            index = self.build(key)
+
+        with self._lock:
+            self._entries[key] = index
+        return index
+
+    def build(self, witness_file):
+        """
+        Construit et écrit l'index d'un témoin.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            Dict de l'index
+        """
+        key = os.path.abspath(witness_file)
+        index = build_chapter_index(key)
+        self._write(index_path(key), index)
+        with self._lock:
+            self._entries[key] = index
+        return index
+
+    def invalidate(self, witness_file, remove_file=False):
+        """
+        Oublie l'index d'un témoin.
+
+        Args:
+            witness_file: Chemin du témoin
+            remove_file: Supprimer aussi le fichier annexe
+        """
+        key = os.path.abspath(witness_file)
+        with self._lock:
+            self._entries.pop(key, None)
+        if remove_file:
+            try:
+                os.remove(index_path(key))
+            except FileNotFoundError:
+                pass
+
+    def chapter_count(self, witness_file):
+        """Retourne le nombre de chapitres d'un témoin."""
+        return len(self.get(witness_file)['chapters'])
+
+    def read_chapter(self, witness_file, chapter_index):
+        """
+        Lit un seul chapitre d'un témoin, directement à sa position dans le fichier.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+            chapter_index: Index du chapitre (0-based)
+
+        Returns:
+            Tuple (chapitre, taille en octets) ; ([], 0) si l'index est hors limites
+        """
+        chapters = self.get(witness_file)['chapters']
+        if chapter_index < 0 or chapter_index >= len(chapters):
+            return [], 0
+        entry = chapters[chapter_index]
+        return read_chapter_at(witness_file, entry['offset'], entry['length']), entry['length']
+
+    @staticmethod
+    def _read(path):
+        """Lit un fichier d'index, None s'il est absent ou illisible."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path, index):
+        """Écrit un fichier d'index (atomique ; ignoré si le dossier est en lecture seule)."""
+        try:
+            write_atomic(path, json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        except OSError as e:
+            print(f"Index de chapitres non écrit ({path}): {e}")
+
+
+# Instance partagée par le processus
+chapter_index_store = ChapterIndexStore()
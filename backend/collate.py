@@ -1,59 +1,30 @@
 """
 Module de collation avec CollateX.
-Gère la comparaison de 3 témoins et la normalisation du texte.
+Gère la comparaison de N témoins et la normalisation du texte.
 """
 
+import hashlib
 import json
+import threading
+import time
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from collatex import Collation, collate
-import re
+from collation_cache import collation_cache, make_cache_key, make_lineage_key
+from config import (COLLATION_ENGINE, COLLATION_ENGINES, COLLATION_WORKERS,
+                    COLLATION_CHUNK_SIZE, COLLATION_PARALLEL_MIN_VERSES,
+                    COLLATION_CACHE_ENABLED, ALIGNMENT_FAST_PATH,
+                    LINEAR_DIFF_MAX_SUBSTITUTION_RATIO, WORD_ALIGNER, NATIVE_ALIGNER_MAX_WITNESSES,
+                    MIN_WITNESSES, MAX_WITNESSES, VERSE_ALIGNMENT)
 from data_import import filter_regions
-
-
-def normalize_text(text):
-    """
-    Normalise le texte selon les règles du projet CreNum.
-    
-    Règles de normalisation :
-    - Minuscules
-    - Lettres doubles -> simples (ss->s, ff->f, etc.)
-    - Y -> I
-    - ict/ist -> it
-    - tz -> ts
-    - Supprime "/" (ne pas considérer comme token)
-    
-    Args:
-        text: Texte à normaliser
-    
-    Returns:
-        Texte normalisé
-    """
-    if not text:
-        return ""
-    
-    # Normaliser Unicode NFC pour fusionner les diacritiques combinants
-    text = unicodedata.normalize('NFC', text)
-    
-    # Supprimer la ponctuation et caractères spéciaux
-    text = re.sub(r'[/.,;:!?\-–—\'\"()\[\]{}…·*°⸫⁊¶§†‡⸝⸞‹›«»„""''‛‟⸗]', '', text)
-    
-    # Minuscules
-    text = text.lower()
-    
-    # Lettres doubles -> simples
-    text = re.sub(r'(.)\1', r'\1', text)
-    
-    # Y -> I
-    text = text.replace('y', 'i')
-    
-    # ict/ist -> it
-    text = text.replace('ict', 'it')
-    text = text.replace('ist', 'it')
-    
-    # tz -> ts
-    text = text.replace('tz', 'ts')
-    
-    return text
+from native_aligner import align_tokens, form_key
+from normalization import normalize_text, normalize_word, nfc, tokenize_words, strip_punctuation
+from similarity import (similarity_matrix, similarity_ratio, verse_similarities,
+                        witness_distance_matrix)
+from verse_alignment import align_witness_verses
+from vocabulary import vocabulary_store
+from witness_store import witness_store
 
 
 def prepare_text_for_collation(text):
@@ -76,21 +47,22 @@ def prepare_text_for_collation(text):
     if not text:
         return ""
     # Normaliser Unicode NFC pour fusionner les diacritiques combinants
-    text = unicodedata.normalize('NFC', text)
+    text = nfc(text)
     # Supprimer les diacritiques combinants restants (catégorie Unicode Mn)
     # qui n'ont pas de forme précomposée (ex: q + macron combinant)
-    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
-    # Supprimer la ponctuation et caractères spéciaux
-    text = re.sub(r'[/.,;:!?\-–—\'\"()\[\]{}…·*°⸫⁊¶§†‡⸝⸞‹›«»„""''‛‟⸗]', ' ', text)
-    # Réduire les espaces multiples en un seul
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    if not text.isascii():
+        text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    # Supprimer la ponctuation et réduire les espaces multiples
+    return strip_punctuation(text)
 
 
 def load_witness_data(witness_file, chapter_index):
     """
     Charge les données d'un témoin pour un chapitre donné.
     
+    Le fichier n'est parsé qu'une fois par processus : les appels suivants
+    sont servis par le cache des témoins tant que le fichier n'a pas changé.
+    
     Args:
         witness_file: Chemin vers le fichier JSON du témoin
         chapter_index: Index du chapitre (0-based)
@@ -99,28 +71,7 @@ def load_witness_data(witness_file, chapter_index):
         Liste de vers avec leurs métadonnées
     """
     try:
-        with open(witness_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        if not isinstance(data, list) or chapter_index >= len(data):
-            return []
-        
-        chapter = data[chapter_index]
-        
-        # Extraire les vers
-        verses = []
-        for item in chapter:
-            if isinstance(item, dict) and 'text' in item:
-                verses.append({
-                    'text': item['text'],
-                    'text_normalized': normalize_text(item['text']),
-                    'region': item.get('region', ''),
-                    'alto_id': item.get('alto_id', ''),
-                    'type': item.get('type', ''),
-                    'page': item.get('page', '')
-                })
-        
-        return verses
+        return list(witness_store.get_chapter(witness_file, chapter_index))
     except Exception as e:
         print(f"Erreur lors du chargement du témoin {witness_file}: {e}")
         return []
@@ -140,38 +91,44 @@ def tokenize_witness_text(text):
     Returns:
         Liste de dicts {"t": ..., "n": ...}
     """
-    if not text:
-        return []
-    
-    # Normaliser Unicode NFC pour fusionner les diacritiques combinants
-    text = unicodedata.normalize('NFC', text)
-    
-    # Tokeniser en gardant les mots et les espaces/ponctuation
-    # Regex du POC : \w+ capture les mots (incluant les diacritiques combinants)
-    raw_tokens = re.findall(r'\w+', text)
-    
-    tokens = []
-    for word in raw_tokens:
-        token = {
+    # Regex du POC : \w+ capture les mots (après normalisation NFC)
+    return [
+        {
             "t": word,                    # Forme originale pour affichage
-            "n": normalize_text(word)      # Forme normalisée pour comparaison
+            "n": normalize_word(word)     # Forme normalisée pour comparaison
         }
-        tokens.append(token)
+        for word in tokenize_words(text)
+    ]
+
+
+def token_dicts(tokens):
+    """
+    Construit l'entrée CollateX d'un témoin à partir de tokens pré-calculés.
+    
+    Args:
+        tokens: Séquence de paires (t, n) (voir token_store.py), ou de
+            triplets (t, n, identifiant de n dans le vocabulaire)
     
-    return tokens
+    Returns:
+        Liste de dicts {"t": ..., "n": ...} (et "i" pour les triplets)
+    """
+    if tokens and len(tokens[0]) == 3:
+        return [{"t": t, "n": n, "i": i} for t, n, i in tokens]
+    return [{"t": t, "n": n} for t, n in tokens]
 
 
-def collate_verse_words(texts, witness_names):
+def collate_verse_words(texts, witness_names, token_lists=None):
     """
-    Utilise CollateX pour aligner les mots d'un vers entre 3 témoins.
+    Utilise CollateX pour aligner les mots d'un vers entre les témoins.
     
     Utilise le modèle t/n : CollateX reçoit des tokens pré-tokenisés avec
     "t" (texte original pour affichage) et "n" (texte normalisé pour alignement).
     CollateX aligne sur "n" mais conserve "t" pour l'affichage.
     
     Args:
-        texts: Liste de 3 textes (un par témoin)
-        witness_names: Liste de 3 noms de témoins
+        texts: Liste des textes (un par témoin)
+        witness_names: Liste des noms de témoins
+        token_lists: Tokens déjà calculés par tokenize_witness_text (optionnel)
     
     Returns:
         Liste de positions avec les mots alignés
@@ -185,11 +142,13 @@ def collate_verse_words(texts, witness_names):
     if any(not text for text in texts):
         return fallback_word_alignment(texts, witness_names)
     
+    if token_lists is None:
+        token_lists = [tokenize_witness_text(text) for text in texts]
+    
     # Construire l'input pré-tokenisé pour CollateX
     witnesses_input = {"witnesses": []}
     
-    for text, name in zip(texts, witness_names):
-        tokens = tokenize_witness_text(text)
+    for tokens, name in zip(token_lists, witness_names):
         witnesses_input["witnesses"].append({
             "id": name,
             "tokens": tokens
@@ -212,46 +171,89 @@ def collate_verse_words(texts, witness_names):
         if not table or len(table) == 0:
             return fallback_word_alignment(texts, witness_names)
         
-        # Trouver le nombre de colonnes (positions)
-        num_columns = max(len(row) for row in table) if table else 0
-        num_witnesses = len(table)
+        return table_to_word_alignment(table)
+        
+    except Exception as e:
+        print(f"Erreur CollateX: {e}")
+        import traceback
+        traceback.print_exc()
+        return fallback_word_alignment(texts, witness_names)
+
+
+def native_verse_words(texts, witness_names, token_lists=None):
+    """
+    Aligne les mots d'un vers avec l'aligneur natif (native_aligner.py).
+    
+    Même algorithme que collate_verse_words, sans le graphe de variantes
+    générique de CollateX ; même résultat jusqu'à NATIVE_ALIGNER_MAX_WITNESSES
+    témoins (voir config.py). Repli sur CollateX en cas d'erreur.
+    
+    Args:
+        texts: Liste des textes (un par témoin)
+        witness_names: Liste des noms de témoins
+        token_lists: Tokens déjà calculés par tokenize_witness_text (optionnel)
+    
+    Returns:
+        Liste de positions avec les mots alignés
+    """
+    if not any(texts):
+        return []
+    if any(not text for text in texts):
+        return fallback_word_alignment(texts, witness_names)
+    
+    if token_lists is None:
+        token_lists = [tokenize_witness_text(text) for text in texts]
+    
+    try:
+        return table_to_word_alignment(align_tokens(token_lists))
+    except Exception as e:
+        print(f"Erreur de l'aligneur natif: {e}")
+        return collate_verse_words(texts, witness_names, token_lists)
+
+
+def table_to_word_alignment(table):
+    """
+    Transpose une table d'alignement en liste de positions.
+    
+    Args:
+        table: Table CollateX (ou native_aligner.align_tokens) organisée par
+            témoin puis par colonne : table[witness_idx][column_idx] = [tokens] ou None
+    
+    Returns:
+        Liste de positions avec les mots alignés
+    """
+    # Trouver le nombre de colonnes (positions)
+    num_columns = max(len(row) for row in table) if table else 0
+    num_witnesses = len(table)
+    
+    # Construire la liste des positions alignées (transposer la table)
+    aligned_words = []
+    
+    for col_idx in range(num_columns):
+        position = {
+            'index': col_idx,
+            'words': [],
+            'has_variant': False
+        }
         
-        # Construire la liste des positions alignées (transposer la table)
-        aligned_words = []
+        unique_forms = set()
         
-        for col_idx in range(num_columns):
-            position = {
-                'index': col_idx,
-                'words': [],
-                'has_variant': False
-            }
-            
-            unique_normalized = set()
-            
-            for wit_idx in range(num_witnesses):
-                if wit_idx < len(table) and col_idx < len(table[wit_idx]):
-                    cell = table[wit_idx][col_idx]
-                    if cell and len(cell) > 0:
-                        # Récupérer le texte original "t" et le normalisé "n"
-                        # CollateX conserve les propriétés t et n des tokens
-                        word_text = ' '.join([t.get('t', '').strip() for t in cell])
-                        word_normalized = ' '.join([t.get('n', '').strip() for t in cell])
-                        
-                        position['words'].append({
-                            'witness_index': wit_idx,
-                            'text': word_text,
-                            'normalized': word_normalized,
-                            'missing': False
-                        })
-                        unique_normalized.add(word_normalized)
-                    else:
-                        position['words'].append({
-                            'witness_index': wit_idx,
-                            'text': '',
-                            'normalized': '',
-                            'missing': True
-                        })
-                        unique_normalized.add('')
+        for wit_idx in range(num_witnesses):
+            if wit_idx < len(table) and col_idx < len(table[wit_idx]):
+                cell = table[wit_idx][col_idx]
+                if cell and len(cell) > 0:
+                    # Récupérer le texte original "t" et le normalisé "n"
+                    # CollateX conserve les propriétés t et n des tokens
+                    word_text = ' '.join([t.get('t', '').strip() for t in cell])
+                    word_normalized = ' '.join([t.get('n', '').strip() for t in cell])
+                    
+                    position['words'].append({
+                        'witness_index': wit_idx,
+                        'text': word_text,
+                        'normalized': word_normalized,
+                        'missing': False
+                    })
+                    unique_forms.add(tuple(form_key(t) for t in cell))
                 else:
                     position['words'].append({
                         'witness_index': wit_idx,
@@ -259,19 +261,22 @@ def collate_verse_words(texts, witness_names):
                         'normalized': '',
                         'missing': True
                     })
-                    unique_normalized.add('')
-            
-            # Déterminer si cette position a une variante
-            position['has_variant'] = len(unique_normalized) > 1
-            aligned_words.append(position)
-        
-        return aligned_words
+                    unique_forms.add(())
+            else:
+                position['words'].append({
+                    'witness_index': wit_idx,
+                    'text': '',
+                    'normalized': '',
+                    'missing': True
+                })
+                unique_forms.add(())
         
-    except Exception as e:
-        print(f"Erreur CollateX: {e}")
-        import traceback
-        traceback.print_exc()
-        return fallback_word_alignment(texts, witness_names)
+        # Déterminer si cette position a une variante
+        # (comparaison des identifiants de formes, sinon des formes normalisées)
+        position['has_variant'] = len(unique_forms) > 1
+        aligned_words.append(position)
+    
+    return aligned_words
 
 
 def fallback_word_alignment(texts, witness_names):
@@ -294,7 +299,7 @@ def fallback_word_alignment(texts, witness_names):
         for wit_idx, words in enumerate(words_per_witness):
             if idx < len(words):
                 word = words[idx]
-                normalized = normalize_text(word)
+                normalized = normalize_word(word)
                 position['words'].append({
                     'witness_index': wit_idx,
                     'text': word,
@@ -317,61 +322,574 @@ def fallback_word_alignment(texts, witness_names):
     return aligned_words
 
 
-def perform_collation(witness_files, witness_names, chapter_indices):
+def linear_word_alignment(token_lists):
+    """
+    Alignement position par position de listes de tokens de même longueur.
+    Produit la même structure que collate_verse_words.
+    
+    Args:
+        token_lists: Liste (un élément par témoin) de tokens {"t", "n"}
+    
+    Returns:
+        Liste de positions avec les mots alignés
+    """
+    aligned_words = []
+    for idx, column in enumerate(zip(*token_lists)):
+        aligned_words.append({
+            'index': idx,
+            'words': [
+                {
+                    'witness_index': wit_idx,
+                    'text': token['t'],
+                    'normalized': token['n'],
+                    'missing': False
+                }
+                for wit_idx, token in enumerate(column)
+            ],
+            'has_variant': len({form_key(token) for token in column}) > 1
+        })
+    return aligned_words
+
+
+def _is_linear_alignment_safe(token_lists):
+    """
+    Vérifie qu'un alignement position par position est fiable :
+    même nombre de tokens, peu de substitutions, et aucune forme d'une
+    position divergente qui se retrouve à une position voisine (signe
+    d'un décalage qu'il faut laisser à CollateX).
+    """
+    lengths = {len(tokens) for tokens in token_lists}
+    if len(lengths) != 1:
+        return False
+    length = lengths.pop()
+    if length == 0:
+        return False
+    
+    forms = [{form_key(tokens[i]) for tokens in token_lists} for i in range(length)]
+    divergent = [i for i in range(length) if len(forms[i]) > 1]
+    if len(divergent) > LINEAR_DIFF_MAX_SUBSTITUTION_RATIO * length:
+        return False
+    
+    for i in divergent:
+        for j in (i - 1, i + 1):
+            if 0 <= j < length and len(forms[j]) > 1 and forms[i] & forms[j]:
+                return False
+    return True
+
+
+def align_verse_tiered(texts, witness_names, tokens=None):
+    """
+    Aligne un vers avec la stratégie la moins coûteuse possible :
+    - 'empty' : aucun texte
+    - 'fallback' : un témoin sans texte (alignement simple)
+    - 'identical' : textes identiques, tokens appariés directement
+    - 'linear' : même nombre de tokens et quelques substitutions
+    - 'native' ou 'collatex' : vers réellement divergent, aligné par
+      l'aligneur choisi (WORD_ALIGNER ; CollateX au-delà de
+      NATIVE_ALIGNER_MAX_WITNESSES témoins)
+    
+    Args:
+        texts: Liste des textes (un par témoin)
+        witness_names: Liste des noms de témoins
+        tokens: Tokens pré-calculés, paires (t, n) par témoin (optionnel)
+    
+    Returns:
+        Tuple (positions alignées, niveau utilisé)
+    """
+    if not any(texts):
+        return [], 'empty'
+    if any(not text for text in texts):
+        return fallback_word_alignment(texts, witness_names), 'fallback'
+    
+    if tokens is not None:
+        token_lists = [token_dicts(pairs) for pairs in tokens]
+    else:
+        token_lists = [tokenize_witness_text(text) for text in texts]
+    if ALIGNMENT_FAST_PATH:
+        if len(set(texts)) == 1:
+            return linear_word_alignment(token_lists), 'identical'
+        if _is_linear_alignment_safe(token_lists):
+            return linear_word_alignment(token_lists), 'linear'
+    
+    if WORD_ALIGNER == 'native' and len(texts) <= NATIVE_ALIGNER_MAX_WITNESSES:
+        return native_verse_words(texts, witness_names, token_lists), 'native'
+    return collate_verse_words(texts, witness_names, token_lists), 'collatex'
+
+
+def collate_chapter_words(verse_texts, witness_names, verse_tokens=None):
+    """
+    Aligne tous les vers d'un chapitre en un seul appel CollateX.
+    
+    Les tokens portent leur numéro de vers ('verse_nb'), puis le résultat
+    est redécoupé par vers avec collation.factorize_by_verse.
+    
+    Args:
+        verse_texts: Liste (un élément par vers) de listes de textes (un par témoin)
+        witness_names: Liste des noms de témoins
+        verse_tokens: Tokens pré-calculés, même structure que verse_texts (optionnel)
+    
+    Returns:
+        Liste (un élément par vers) de positions avec les mots alignés
+    """
+    from collation import factorize_by_verse
+    
+    witnesses_input = {"witnesses": []}
+    for wit_idx, name in enumerate(witness_names):
+        tokens = []
+        for verse_nb, texts in enumerate(verse_texts):
+            if verse_tokens is not None:
+                verse_token_list = token_dicts(verse_tokens[verse_nb][wit_idx])
+            else:
+                verse_token_list = tokenize_witness_text(texts[wit_idx])
+            for token in verse_token_list:
+                token['verse_nb'] = verse_nb
+                tokens.append(token)
+        witnesses_input["witnesses"].append({"id": name, "tokens": tokens})
+    
+    # CollateX ne gère pas les témoins vides : repli sur l'alignement par vers
+    if not all(w["tokens"] for w in witnesses_input["witnesses"]):
+        return [alignment for alignment, _ in
+                _collate_verse_batch(verse_texts, witness_names, verse_tokens)]
+    
+    try:
+        alignment_json = collate(witnesses_input, output='json', segmentation=False)
+        if isinstance(alignment_json, str):
+            alignment = json.loads(alignment_json)
+        else:
+            alignment = alignment_json
+        by_verse = factorize_by_verse(alignment)
+    except Exception as e:
+        print(f"Erreur CollateX (chapitre): {e}")
+        return [alignment for alignment, _ in
+                _collate_verse_batch(verse_texts, witness_names, verse_tokens)]
+    
+    return [by_verse.get(verse_nb, []) for verse_nb in range(len(verse_texts))]
+
+
+# Pool de processus partagé pour l'alignement par vers (créé à la demande)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _warm_up_worker():
+    """
+    Initialise un processus de travail : CollateX est importé et exercé
+    une fois, pour que la première vraie tâche ne paie pas ce coût.
+    """
+    collate({"witnesses": [
+        {"id": "a", "tokens": [{"t": "a", "n": "a"}]},
+        {"id": "b", "tokens": [{"t": "a", "n": "a"}]}
+    ]}, output='json', segmentation=False)
+
+
+def _ping(_):
+    """Tâche vide utilisée pour démarrer tous les processus du pool."""
+    return True
+
+
+def get_executor():
+    """
+    Retourne le pool de processus partagé, en le créant et en le
+    préchauffant au premier appel.
+    
+    Returns:
+        ProcessPoolExecutor, ou None si le parallélisme est désactivé
+    """
+    global _executor
+    if COLLATION_WORKERS <= 1:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=COLLATION_WORKERS,
+                initializer=_warm_up_worker
+            )
+            list(_executor.map(_ping, range(COLLATION_WORKERS)))
+        return _executor
+
+
+def shutdown_executor():
+    """Arrête le pool de processus partagé (il sera recréé si nécessaire)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _collate_verse_batch(verse_texts, witness_names, verse_tokens=None):
+    """
+    Aligne un lot de vers (exécuté dans un processus du pool).
+    
+    Args:
+        verse_texts: Liste (un élément par vers) de listes de textes
+        witness_names: Liste des noms de témoins
+        verse_tokens: Tokens pré-calculés, même structure que verse_texts (optionnel)
+    
+    Returns:
+        Liste de tuples (alignement, niveau), dans l'ordre des vers
+    """
+    if verse_tokens is None:
+        verse_tokens = repeat(None)
+    return [align_verse_tiered(texts, witness_names, tokens)
+            for texts, tokens in zip(verse_texts, verse_tokens)]
+
+
+def iter_aligned_verses(verse_texts, witness_names, engine=COLLATION_ENGINE, verse_tokens=None):
+    """
+    Comme align_verses, mais produit (alignement, niveau) vers par vers,
+    dans l'ordre, dès que chaque vers (ou lot de vers du pool) est aligné.
+    
+    Args:
+        Voir align_verses
+    
+    Yields:
+        Tuple (positions alignées, niveau d'alignement) pour chaque vers
+    """
+    if engine == 'chapter':
+        alignments, tiers = align_verses(verse_texts, witness_names, engine, verse_tokens)
+        yield from zip(alignments, tiers)
+        return
+    
+    done = 0
+    executor = get_executor() if len(verse_texts) >= COLLATION_PARALLEL_MIN_VERSES else None
+    if executor is not None:
+        bounds = range(0, len(verse_texts), COLLATION_CHUNK_SIZE)
+        chunks = [verse_texts[i:i + COLLATION_CHUNK_SIZE] for i in bounds]
+        token_chunks = (repeat(None) if verse_tokens is None else
+                        [verse_tokens[i:i + COLLATION_CHUNK_SIZE] for i in bounds])
+        try:
+            # executor.map produit les lots dans l'ordre, dès que chacun est prêt
+            for chunk in executor.map(_collate_verse_batch, chunks, repeat(witness_names),
+                                      token_chunks):
+                for item in chunk:
+                    yield item
+                    done += 1
+            return
+        except Exception as e:
+            print(f"Erreur du pool de collation, repli en série: {e}")
+            shutdown_executor()
+    
+    # En série (ou suite d'un alignement interrompu par une erreur du pool)
+    tokens = repeat(None) if verse_tokens is None else verse_tokens[done:]
+    for texts, verse_token_list in zip(verse_texts[done:], tokens):
+        yield align_verse_tiered(texts, witness_names, verse_token_list)
+
+
+def align_verses(verse_texts, witness_names, engine=COLLATION_ENGINE, verse_tokens=None):
+    """
+    Calcule l'alignement mot à mot de chaque vers d'un chapitre.
+    
+    Args:
+        verse_texts: Liste (un élément par vers) de listes de textes (un par témoin)
+        witness_names: Liste des noms de témoins
+        engine: 'verse' (un appel CollateX par vers) ou 'chapter' (un seul appel)
+        verse_tokens: Tokens pré-calculés (paires (t, n)), même structure que
+            verse_texts ; calculés à partir des textes si None
+    
+    En mode 'verse', chaque vers passe par align_verse_tiered (seuls les
+    vers réellement divergents sont envoyés à CollateX), et les chapitres
+    d'au moins COLLATION_PARALLEL_MIN_VERSES vers sont alignés sur le pool
+    de processus, par lots de COLLATION_CHUNK_SIZE vers.
+    
+    Returns:
+        Tuple (alignements, niveaux) : une liste de positions alignées et
+        le niveau d'alignement utilisé, pour chaque vers
+    """
+    if engine == 'chapter':
+        alignments = collate_chapter_words(verse_texts, witness_names, verse_tokens)
+        tiers = ['chapter' if any(texts) else 'empty' for texts in verse_texts]
+        return alignments, tiers
+    
+    # Les vers sont indépendants : en parallèle pour les longs chapitres
+    results = list(iter_aligned_verses(verse_texts, witness_names, engine, verse_tokens))
+    return [alignment for alignment, _ in results], [tier for _, tier in results]
+
+
+def _witness_vocabulary_ids(work_id, witness_file):
+    """Correspondance identifiants du témoin → vocabulaire de l'œuvre (None si indisponible)."""
+    try:
+        return vocabulary_store.witness_ids(work_id, witness_file)
+    except Exception as e:
+        print(f"Vocabulaire indisponible pour {witness_file}: {e}")
+        return None
+
+
+def _vocabulary_tokens(verse, remap, vocabulary):
+    """Tokens (t, n, identifiant) d'un vers, identifiants dans le vocabulaire de l'œuvre."""
+    tokens = verse['tokens']
+    if remap is not None and verse.get('token_ids') is not None:
+        ids = [remap[i] for i in verse['token_ids']]
+    else:
+        ids = vocabulary.encode(n for _, n in tokens)
+    return tuple((t, n, i) for (t, n), i in zip(tokens, ids))
+
+
+def verse_content_hash(texts):
+    """
+    Empreinte du contenu d'un vers collationné, qui détermine son alignement.
+
+    Args:
+        texts: Liste des textes du vers, un par témoin (None si le témoin n'a pas ce vers)
+
+    Returns:
+        Empreinte hexadécimale (16 caractères)
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for text in texts:
+        digest.update(b'\x1e' if text is None else text.encode('utf-8') + b'\x1f')
+    return digest.hexdigest()
+
+
+def _merge_verses(verses):
+    """
+    Réunit les vers d'un témoin appariés à une seule ligne (vers coupé en
+    deux dans ce témoin, voir verse_alignment.py).
+
+    Args:
+        verses: Liste de vers (dicts de load_witness_data)
+
+    Returns:
+        Vers unique : textes et tokens concaténés, métadonnées du premier vers
+    """
+    if len(verses) == 1:
+        return verses[0]
+    token_ids = [verse.get('token_ids') for verse in verses]
+    return {
+        **verses[0],
+        'text': ' '.join(verse['text'] for verse in verses),
+        'text_normalized': ' '.join(verse['text_normalized'] for verse in verses),
+        'tokens': [token for verse in verses for token in verse['tokens']],
+        'token_ids': (None if any(ids is None for ids in token_ids)
+                      else [i for ids in token_ids for i in ids]),
+        'alto_ids': [verse['alto_id'] for verse in verses]
+    }
+
+
+def _window_info(offset, count, total, limit):
+    """Description d'une fenêtre de vers : position, taille, début de la suivante (None à la fin)."""
+    next_offset = offset + count
+    return {
+        'offset': offset,
+        'limit': limit,
+        'count': count,
+        'next_offset': next_offset if next_offset < total else None
+    }
+
+
+def _window_bounds(window, total):
+    """Bornes [début, fin) des vers d'une fenêtre (offset, limit), ou de tout le chapitre."""
+    if not window:
+        return 0, total
+    start = min(window[0], total)
+    return start, min(start + window[1], total)
+
+
+def _load_mainzone(witness_files, chapter_indices):
+    """Vers MainZone du chapitre de chaque témoin."""
+    return [
+        [v for v in load_witness_data(file, chapter_idx) if v.get('region', '') == 'MainZone']
+        for file, chapter_idx in zip(witness_files, chapter_indices)
+    ]
+
+
+def _cache_settings(engine, verse_alignment):
+    """Paramètres influant sur le résultat, inclus dans les clés de cache."""
+    return {
+        'engine': engine,
+        'fast_path': ALIGNMENT_FAST_PATH,
+        'linear_max_ratio': LINEAR_DIFF_MAX_SUBSTITUTION_RATIO,
+        'word_aligner': WORD_ALIGNER,
+        'native_max_witnesses': NATIVE_ALIGNER_MAX_WITNESSES,
+        'verse_alignment': verse_alignment
+    }
+
+
+def collation_cache_key(witness_files, witness_names, chapter_indices, engine=None,
+                        verse_alignment=None):
+    """
+    Clé de cache du résultat qu'aurait perform_collation, sans collationner
+    (lecture des chapitres seulement) : sert à dédupliquer les tâches de
+    collation (voir collation_queue.py).
+    
+    Args:
+        Voir perform_collation
+    
+    Returns:
+        Clé (voir collation_cache.make_cache_key), ou None si un témoin n'a
+        pas de vers pour ce chapitre
+    """
+    if not isinstance(chapter_indices, list):
+        chapter_indices = [chapter_indices] * len(witness_files)
+    witnesses_data = _load_mainzone(witness_files, chapter_indices)
+    if not all(witnesses_data):
+        return None
+    if verse_alignment is None:
+        verse_alignment = VERSE_ALIGNMENT
+    settings = _cache_settings(engine or COLLATION_ENGINE, verse_alignment)
+    return make_cache_key(witnesses_data, witness_names, settings)
+
+
+def perform_collation(witness_files, witness_names, chapter_indices, engine=None, use_cache=None,
+                      work_id=None, verse_alignment=None, window=None):
     """
-    Effectue la collation de 3 témoins pour un chapitre donné.
-    Ne compare que les vers de type MainZone.
+    Effectue la collation de N témoins (MIN_WITNESSES à MAX_WITNESSES)
+    pour un chapitre donné. Ne compare que les vers de type MainZone.
+    
+    Le résultat est servi depuis le cache disque si le même contenu a déjà
+    été collationné avec les mêmes paramètres (voir collation_cache.py).
+    Assemble les événements de iter_collation.
     
     Args:
-        witness_files: Liste de 3 chemins vers les fichiers JSON
-        witness_names: Liste de 3 noms de témoins
-        chapter_indices: Liste de 3 index de chapitre (0-based), un par témoin
+        witness_files: Liste des chemins vers les fichiers JSON
+        witness_names: Liste des noms de témoins (même ordre)
+        chapter_indices: Liste des index de chapitre (0-based), un par témoin,
+            ou un seul index commun
+        engine: Moteur d'alignement ('verse' ou 'chapter'), défaut COLLATION_ENGINE
+        use_cache: Utiliser le cache disque, défaut COLLATION_CACHE_ENABLED
+        work_id: ID de l'œuvre, pour son vocabulaire de formes (vocabulary.py)
+        verse_alignment: Apparier les vers par similarité (verse_alignment.py)
+            plutôt que par rang, défaut VERSE_ALIGNMENT
+        window: Tuple (offset, limit) pour ne retourner qu'une fenêtre de vers
+            (avec 'window' dans le résultat). En mode 'verse', hors cache, seuls
+            les vers de la fenêtre sont alignés ; leurs alignements sont conservés
+            et le chapitre est mis en cache quand les fenêtres l'ont couvert.
     
     Returns:
         Dict avec les résultats de collation structurés par vers
     """
-    if len(witness_files) != 3 or len(witness_names) != 3:
-        raise ValueError("Il faut exactement 3 témoins")
+    result = {}
+    verses = []
+    for event in iter_collation(witness_files, witness_names, chapter_indices, engine=engine,
+                                use_cache=use_cache, work_id=work_id,
+                                verse_alignment=verse_alignment, window=window):
+        kind = event.pop('event')
+        if kind == 'verse':
+            verses.append(event['verse'])
+        elif kind == 'error':
+            return {'error': event['message'], 'witnesses': witness_names,
+                    'chapter': event['chapter']}
+        else:
+            result.update(event)
+    result['verses'] = verses
+    return result
+
+
+def iter_collation(witness_files, witness_names, chapter_indices, engine=None, use_cache=None,
+                   work_id=None, verse_alignment=None, window=None):
+    """
+    Collation d'un chapitre sous forme d'événements : chaque vers est produit
+    dès qu'il est aligné (affichage progressif, voir /api/collate/stream).
+    
+    Événements (dicts, type dans la clé 'event') :
+    - 'header' : success, witnesses, chapter, total_verses, verse_alignment,
+      witness_distances, witness_similarities, cache_key (et window) ;
+    - 'verse' : {'verse': vers au format de perform_collation}, dans l'ordre ;
+    - 'summary' : alignment_tiers, timing ;
+    - 'error' : message, chapter (témoins sans données), seul événement produit.
+    
+    Args:
+        Voir perform_collation
+    
+    Raises:
+        ValueError: nombre de témoins ou moteur invalide (au premier événement)
+    """
+    witness_count = len(witness_files)
+    if len(witness_names) != witness_count:
+        raise ValueError("Il faut un nom par témoin")
+    if not MIN_WITNESSES <= witness_count <= MAX_WITNESSES:
+        raise ValueError(f"Il faut entre {MIN_WITNESSES} et {MAX_WITNESSES} témoins")
+    
+    engine = engine or COLLATION_ENGINE
+    if engine not in COLLATION_ENGINES:
+        raise ValueError(f"Moteur de collation inconnu : {engine}")
+    
+    start_time = time.perf_counter()
     
     # Convertir chapter_indices en liste si c'est un scalaire
     if not isinstance(chapter_indices, list):
-        chapter_indices = [chapter_indices, chapter_indices, chapter_indices]
+        chapter_indices = [chapter_indices] * witness_count
     
-    # Charger les données des 3 témoins - UNIQUEMENT les MainZone
-    witnesses_data = []
-    for i, file in enumerate(witness_files):
-        chapter_idx = chapter_indices[i]
-        all_verses = load_witness_data(file, chapter_idx)
-        
-        # Filtrer pour ne garder que les MainZone
-        mainzone_verses = [v for v in all_verses if v.get('region', '') == 'MainZone']
-        witnesses_data.append(mainzone_verses)
+    # Charger les données des témoins - UNIQUEMENT les MainZone
+    witnesses_data = _load_mainzone(witness_files, chapter_indices)
     
     # Vérifier que tous les témoins ont des données
     if not all(witnesses_data):
-        return {
-            'error': 'Impossible de charger les données de tous les témoins',
-            'witnesses': witness_names,
+        yield {
+            'event': 'error',
+            'message': 'Impossible de charger les données de tous les témoins',
             'chapter': chapter_indices
         }
+        return
+    
+    if use_cache is None:
+        use_cache = COLLATION_CACHE_ENABLED
+    if verse_alignment is None:
+        verse_alignment = VERSE_ALIGNMENT
+    
+    cache_key = None
+    lineage_key = None
+    if use_cache:
+        settings = _cache_settings(engine, verse_alignment)
+        cache_key = make_cache_key(witnesses_data, witness_names, settings)
+        lineage_key = make_lineage_key(witness_files, chapter_indices, witness_names, settings)
+        cached = collation_cache.get(cache_key)
+        if cached is not None:
+            cached_verses = cached.pop('verses')
+            tier_counts = cached.pop('alignment_tiers')
+            cached.pop('timing', None)
+            cached['chapter'] = chapter_indices
+            start, stop = _window_bounds(window, len(cached_verses))
+            if window:
+                cached['window'] = _window_info(start, stop - start, len(cached_verses), window[1])
+            yield {'event': 'header', **cached}
+            for verse_data in cached_verses[start:stop]:
+                yield {'event': 'verse', 'verse': verse_data}
+            yield {
+                'event': 'summary',
+                'alignment_tiers': tier_counts,
+                'timing': {
+                    'engine': engine,
+                    'cache': 'hit',
+                    'total_ms': round((time.perf_counter() - start_time) * 1000, 1)
+                }
+            }
+            return
+    
+    # Identifiants entiers des formes normalisées (vocabulaire de l'œuvre)
+    vocabulary = vocabulary_store.get(work_id)
+    remaps = [_witness_vocabulary_ids(work_id, file) for file in witness_files]
     
-    # Préparer les résultats - basé sur le nombre maximum de vers MainZone
-    max_verses = max(len(w) for w in witnesses_data)
+    # Lignes de la collation : index des vers MainZone de chaque témoin,
+    # appariés par similarité ou par rang
+    if verse_alignment:
+        verse_rows = align_witness_verses([
+            [verse['text_normalized'] for verse in verses] for verses in witnesses_data
+        ])
+    else:
+        verse_rows = [
+            [(verse_idx,) if verse_idx < len(verses) else () for verses in witnesses_data]
+            for verse_idx in range(max(len(w) for w in witnesses_data))
+        ]
     results = []
+    verse_texts = []
+    verse_tokens = []
     
-    for verse_idx in range(max_verses):
+    for verse_idx, verse_row in enumerate(verse_rows):
         verse_data = {
             'verse_number': verse_idx + 1,
             'witnesses': [],
+            'source_verses': [list(indices) for indices in verse_row],
             'is_filtered': False
         }
         
-        # Collecter les textes pour ce vers depuis les 3 témoins
+        # Collecter les textes pour ce vers depuis tous les témoins
         texts_for_collation = []
+        tokens_for_collation = []
         
-        for wit_idx in range(3):
-            if verse_idx < len(witnesses_data[wit_idx]):
-                verse = witnesses_data[wit_idx][verse_idx]
+        for wit_idx in range(witness_count):
+            if verse_row[wit_idx]:
+                verse = _merge_verses([witnesses_data[wit_idx][i] for i in verse_row[wit_idx]])
                 
                 verse_data['witnesses'].append({
                     'name': witness_names[wit_idx],
@@ -385,7 +903,11 @@ def perform_collation(witness_files, witness_names, chapter_indices):
                         'is_filtered': False
                     }
                 })
+                if 'alto_ids' in verse:
+                    verse_data['witnesses'][-1]['metadata']['alto_ids'] = verse['alto_ids']
                 texts_for_collation.append(verse['text_normalized'])
+                tokens_for_collation.append(
+                    _vocabulary_tokens(verse, remaps[wit_idx], vocabulary))
             else:
                 # Témoin manquant pour ce vers
                 verse_data['witnesses'].append({
@@ -396,56 +918,137 @@ def perform_collation(witness_files, witness_names, chapter_indices):
                     'missing': True
                 })
                 texts_for_collation.append('')
+                tokens_for_collation.append(())
         
         # Comme on ne garde que les MainZone, les vers ne sont jamais filtrés
         verse_data['is_filtered'] = False
+        verse_data['content_hash'] = verse_content_hash([
+            None if witness.get('missing') else witness['text']
+            for witness in verse_data['witnesses']
+        ])
         
         # Analyser les variantes
         verse_data['has_variants'] = len(set(texts_for_collation)) > 1
         verse_data['is_identical'] = len(set(texts_for_collation)) == 1
         
-        # Calculer les similarités
-        similarities = []
-        if texts_for_collation[0] and texts_for_collation[1]:
-            sim_01 = calculate_similarity(texts_for_collation[0], texts_for_collation[1])
-            similarities.append(('0-1', sim_01))
-        if texts_for_collation[0] and texts_for_collation[2]:
-            sim_02 = calculate_similarity(texts_for_collation[0], texts_for_collation[2])
-            similarities.append(('0-2', sim_02))
-        if texts_for_collation[1] and texts_for_collation[2]:
-            sim_12 = calculate_similarity(texts_for_collation[1], texts_for_collation[2])
-            similarities.append(('1-2', sim_12))
-        
+        results.append(verse_data)
+        verse_texts.append(texts_for_collation)
+        verse_tokens.append(tokens_for_collation)
+    
+    # Similarités entre témoins, calculées pour tout le chapitre en un passage
+    similarities_by_verse = verse_similarities(verse_texts)
+    for verse_data, similarities in zip(results, similarities_by_verse):
         verse_data['similarities'] = similarities
-        
-        # Alignement mot par mot avec CollateX
-        # Utiliser texts_for_collation (qui a des chaînes vides pour les filtrés)
-        # au lieu de original_texts pour éviter l'erreur CollateX
-        # Si tous les textes sont vides (filtrés), word_alignment sera vide
-        if any(texts_for_collation):
-            verse_data['word_alignment'] = collate_verse_words(texts_for_collation, witness_names)
+    witness_similarities = similarity_matrix(similarities_by_verse, witness_count)
+    
+    # Distances entre témoins sur l'ensemble du chapitre
+    witness_distances = witness_distance_matrix([
+        ' '.join(verse['text_normalized'] for verse in verses)
+        for verses in witnesses_data
+    ])
+    
+    total_verses = len(results)
+    start, stop = _window_bounds(window, total_verses)
+    header = {
+        'success': True,
+        'witnesses': witness_names,
+        'chapter': chapter_indices,
+        'total_verses': total_verses,
+        'verse_alignment': verse_alignment,
+        'witness_distances': witness_distances,
+        'witness_similarities': witness_similarities,
+        'cache_key': cache_key
+    }
+    window_header = {'window': _window_info(start, stop - start, total_verses, window[1])} if window else {}
+    yield {'event': 'header', **header, **window_header}
+    
+    # Alignement mot par mot avec CollateX
+    # Utiliser les textes normalisés (chaînes vides pour les vers manquants)
+    # et les tokens pré-calculés des témoins
+    alignment_start = time.perf_counter()
+    # Collation incrémentale (mode 'verse') : les vers dont le contenu n'a pas
+    # changé depuis la dernière collation de ces témoins gardent leur alignement
+    reusable = {}
+    if lineage_key and engine == 'verse':
+        previous = collation_cache.get_latest(lineage_key)
+        if previous:
+            reusable = {
+                verse['content_hash']: (verse['word_alignment'], verse['alignment_tier'])
+                for verse in previous.get('verses', []) if 'content_hash' in verse
+            }
+    # Fenêtre demandée (mode 'verse') : seuls ses vers sont alignés ; le
+    # moteur 'chapter' aligne tout le chapitre en un appel de toute façon
+    align_start, align_stop = (start, stop) if engine == 'verse' else (0, total_verses)
+    partial = align_stop - align_start < total_verses and cache_key is not None
+    if partial:
+        # Pages déjà alignées de ce contenu : si elles couvrent le reste du
+        # chapitre, il est complété (sans nouvel alignement) et mis en cache
+        reusable.update(collation_cache.get_partial(cache_key))
+        if all(results[i]['content_hash'] in reusable
+               for i in range(total_verses) if not align_start <= i < align_stop):
+            align_start, align_stop = 0, total_verses
+    complete = align_start == 0 and align_stop == total_verses
+    
+    pending = [i for i in range(align_start, align_stop)
+               if results[i]['content_hash'] not in reusable]
+    aligned = iter_aligned_verses(
+        [verse_texts[i] for i in pending], witness_names, engine,
+        [verse_tokens[i] for i in pending])
+    alignment_seconds = time.perf_counter() - alignment_start
+    
+    tier_counts = {}
+    for i in range(align_start, align_stop):
+        verse_data = results[i]
+        if verse_data['content_hash'] in reusable:
+            word_alignment, tier = reusable[verse_data['content_hash']]
         else:
-            verse_data['word_alignment'] = []
+            # Seul le temps d'alignement est compté (pas celui du consommateur)
+            alignment_start = time.perf_counter()
+            word_alignment, tier = next(aligned)
+            alignment_seconds += time.perf_counter() - alignment_start
+        verse_data['word_alignment'] = word_alignment
+        verse_data['alignment_tier'] = tier
+        tier_counts[tier] = tier_counts.get(tier, 0) + 1
         
         # Compter les variantes par mot
         verse_data['variant_word_count'] = sum(
-            1 for pos in verse_data['word_alignment'] if pos['has_variant']
+            1 for pos in word_alignment if pos['has_variant']
         )
-        
-        results.append(verse_data)
+        if start <= i < stop:
+            yield {'event': 'verse', 'verse': verse_data}
     
-    return {
-        'success': True,
-        'witnesses': witness_names,
-        'chapter': chapter_indices,
-        'total_verses': len(results),
-        'verses': results
+    summary = {
+        'alignment_tiers': tier_counts,
+        'timing': {
+            'engine': engine,
+            'cache': 'miss' if use_cache else 'disabled',
+            'alignment_ms': round(alignment_seconds * 1000, 1),
+            'reused_verses': (align_stop - align_start) - len(pending),
+            'total_ms': round((time.perf_counter() - start_time) * 1000, 1)
+        }
     }
+    
+    if complete and cache_key:
+        try:
+            collation_cache.put(cache_key, {**header, 'verses': results, **summary}, lineage_key)
+        except Exception as e:
+            print(f"Erreur d'écriture du cache de collation: {e}")
+    elif partial:
+        try:
+            collation_cache.put_partial(cache_key, {
+                results[i]['content_hash']: [results[i]['word_alignment'], results[i]['alignment_tier']]
+                for i in range(align_start, align_stop)
+            })
+        except Exception as e:
+            print(f"Erreur d'écriture du cache de collation: {e}")
+    
+    yield {'event': 'summary', **summary}
 
 
 def calculate_similarity(text1, text2):
     """
-    Calcule la similarité entre deux textes (ratio de Levenshtein).
+    Calcule la similarité entre deux textes (similarity.similarity_ratio).
+    Pour plusieurs paires, préférer similarity.batch_similarities.
     
     Args:
         text1: Premier texte
@@ -454,11 +1057,4 @@ def calculate_similarity(text1, text2):
     Returns:
         Score de similarité entre 0 et 1
     """
-    try:
-        from Levenshtein import ratio
-        return round(ratio(text1, text2), 3)
-    except ImportError:
-        # Fallback simple si Levenshtein n'est pas installé
-        if text1 == text2:
-            return 1.0
-        return 0.5
+    return similarity_ratio(text1, text2)
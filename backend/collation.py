@@ -6,29 +6,19 @@ Gère l'alignement automatique des témoins mot par mot et vers par vers.
 from collatex import *
 import json
 import re
+from normalization import normalize_text
 
 
 def normalize_token(token):
     """
-    Normalise un token (basé sur le prototype).
+    Normalise un token avec le moteur commun (voir normalization.py).
     - Lowercase
-    - Suppression doubles consonnes
+    - Suppression doubles lettres
     - Y → I
-    - tz → s (AVANT ict/ist)
     - ict/ist → it
+    - tz → ts
     """
-    lowered = token.lower().strip()
-    # Suppression doubles consonnes
-    erase_doubles = re.sub(r'([bcdfglmnprt])\1', r'\1', lowered)
-    # Y → I
-    y_to_i = re.sub('y', 'i', erase_doubles)
-    # tz → s (IMPORTANT: avant ict/ist pour éviter faictz → fais)
-    no_tz = re.sub(r'tz$', r'ts', y_to_i)
-    # ict/ist → it
-    no_ist = re.sub(r'ict([sz])?$', r'it\1', no_tz)
-    no_ict = re.sub(r'ist([sz])?$', r'it\1', no_ist)
-    
-    return no_ict
+    return normalize_text(token.strip())
 
 
 def tokenize_verses(verses):
@@ -104,11 +94,65 @@ def factorize_by_verse(collation_json):
     Réorganise le JSON de collation pour factoriser par vers.
     1 ligne du tableau HTML = 1 vers (au lieu de multiples segments).
     
+    Chaque token doit porter sa propriété 'verse_nb'. Une colonne de la
+    table CollateX produit une position dans chaque vers auquel appartient
+    l'un de ses tokens ; dans cette position, les témoins dont le token
+    appartient à un autre vers sont marqués manquants. Ainsi, les mots de
+    chaque témoin restent dans leur propre vers et dans l'ordre.
+    
     Args:
-        collation_json: Output JSON de CollateX
+        collation_json: Output JSON de CollateX (table, segmentation quelconque)
     
     Returns:
-        Dict réorganisé par vers
+        Dict {verse_nb: [positions]} au format word_alignment
     """
-    # TODO: Implémenter la factorisation (voir prototype)
-    pass
+    table = collation_json.get('table', [])
+    num_witnesses = len(table)
+    num_columns = max((len(row) for row in table), default=0)
+    
+    verses = {}
+    
+    for col_idx in range(num_columns):
+        # Regrouper les tokens de la colonne par vers, puis par témoin
+        by_verse = {}
+        for wit_idx in range(num_witnesses):
+            cell = table[wit_idx][col_idx] if col_idx < len(table[wit_idx]) else None
+            for token in cell or []:
+                cells = by_verse.setdefault(token.get('verse_nb'), {})
+                cells.setdefault(wit_idx, []).append(token)
+        
+        for verse_nb in sorted(by_verse, key=lambda v: (v is None, v)):
+            cells = by_verse[verse_nb]
+            positions = verses.setdefault(verse_nb, [])
+            position = {
+                'index': len(positions),
+                'words': [],
+                'has_variant': False
+            }
+            unique_normalized = set()
+            
+            for wit_idx in range(num_witnesses):
+                tokens = cells.get(wit_idx)
+                if tokens:
+                    word_text = ' '.join([t.get('t', '').strip() for t in tokens])
+                    word_normalized = ' '.join([t.get('n', '').strip() for t in tokens])
+                    position['words'].append({
+                        'witness_index': wit_idx,
+                        'text': word_text,
+                        'normalized': word_normalized,
+                        'missing': False
+                    })
+                    unique_normalized.add(word_normalized)
+                else:
+                    position['words'].append({
+                        'witness_index': wit_idx,
+                        'text': '',
+                        'normalized': '',
+                        'missing': True
+                    })
+                    unique_normalized.add('')
+            
+            position['has_variant'] = len(unique_normalized) > 1
+            positions.append(position)
+    
+    return verses
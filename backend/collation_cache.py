@@ -0,0 +1,301 @@
+"""
+Module de cache persistant des résultats de collation.
+Les résultats de perform_collation sont stockés sur disque (JSON compressé),
+indexés par une empreinte du contenu des chapitres collationnés.
+Le dernier résultat de chaque collation (mêmes fichiers, chapitres et
+paramètres, quel que soit leur contenu) est aussi repéré par une clé de
+lignée : après la mise à jour d'un témoin, seuls les vers modifiés sont
+réalignés (voir perform_collation). Les alignements calculés page par page
+(fenêtres de vers) sont conservés à part jusqu'à ce qu'ils couvrent tout
+le chapitre.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+
+from config import COLLATION_CACHE_DIR, COLLATION_CACHE_MAX_BYTES
+from file_lock import file_lock, write_atomic
+from normalization import NORMALIZATION_VERSION
+
+# Version du format des résultats mis en cache.
+# À incrémenter quand la structure retournée par perform_collation change.
+COLLATION_CACHE_VERSION = 6
+
+CACHE_SUFFIX = '.json.gz'
+LATEST_SUFFIX = '.latest'
+
+_KEY_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+
+def make_cache_key(witnesses_data, witness_names, settings):
+    """
+    Calcule la clé de cache d'une collation.
+
+    La clé dépend uniquement du contenu : textes et métadonnées des vers
+    de chaque témoin, noms des témoins, version des règles de normalisation,
+    version du format de cache et paramètres du moteur.
+
+    Args:
+        witnesses_data: Liste (un élément par témoin) de listes de vers
+        witness_names: Liste des noms de témoins
+        settings: Dict des paramètres influant sur le résultat (moteur, etc.)
+
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    digest = hashlib.sha256()
+    header = {
+        'cache_version': COLLATION_CACHE_VERSION,
+        'normalization_version': NORMALIZATION_VERSION,
+        'settings': settings,
+        'witnesses': witness_names
+    }
+    digest.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+    for verses in witnesses_data:
+        digest.update(b'\x1e')
+        for verse in verses:
+            fields = (verse['text'], verse['region'], verse['alto_id'],
+                      verse['type'], verse['page'])
+            digest.update('\x1f'.join(str(f) for f in fields).encode('utf-8'))
+            digest.update(b'\x1d')
+    return digest.hexdigest()
+
+
+def make_lineage_key(witness_files, chapter_indices, witness_names, settings):
+    """
+    Calcule la clé de lignée d'une collation : comme make_cache_key, mais
+    sans le contenu des témoins (fichiers et chapitres à la place).
+
+    Args:
+        witness_files: Liste des chemins des fichiers témoins
+        chapter_indices: Liste des index de chapitre, un par témoin
+        witness_names: Liste des noms de témoins
+        settings: Dict des paramètres influant sur le résultat (moteur, etc.)
+
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    header = {
+        'cache_version': COLLATION_CACHE_VERSION,
+        'normalization_version': NORMALIZATION_VERSION,
+        'settings': settings,
+        'witnesses': witness_names,
+        'files': [os.path.abspath(path) for path in witness_files],
+        'chapters': chapter_indices
+    }
+    return hashlib.sha256(json.dumps(header, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class CollationCache:
+    """
+    Cache disque des résultats de collation, borné en taille.
+
+    Chaque entrée est un fichier {clé}.json.gz. Un accès réussi met à jour
+    la date de modification du fichier : l'éviction supprime les entrées
+    les moins récemment utilisées.
+    """
+
+    def __init__(self, cache_dir=COLLATION_CACHE_DIR, max_bytes=COLLATION_CACHE_MAX_BYTES):
+        """
+        Initialise le cache.
+
+        Args:
+            cache_dir: Dossier de stockage des entrées
+            max_bytes: Taille totale maximale des entrées sur disque
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        """Retourne le chemin du fichier d'une entrée (la clé doit être une empreinte SHA-256)."""
+        if not isinstance(key, str) or not _KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Clé de cache invalide : {key}")
+        return os.path.join(self.cache_dir, f"{key}{CACHE_SUFFIX}")
+
+    def _latest_path(self, lineage_key):
+        """Retourne le chemin du pointeur vers le dernier résultat d'une lignée."""
+        if not isinstance(lineage_key, str) or not _KEY_PATTERN.fullmatch(lineage_key):
+            raise ValueError(f"Clé de lignée invalide : {lineage_key}")
+        return os.path.join(self.cache_dir, f"{lineage_key}{LATEST_SUFFIX}")
+
+    def get(self, key):
+        """
+        Récupère un résultat en cache.
+
+        Args:
+            key: Clé calculée par make_cache_key
+
+        Returns:
+            Dict du résultat, ou None si absent
+        """
+        result = self._load(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def contains(self, key):
+        """Indique si une entrée existe (sans la lire ni compter d'accès)."""
+        return os.path.exists(self._path(key))
+
+    def get_latest(self, lineage_key):
+        """
+        Récupère le dernier résultat enregistré pour une lignée.
+
+        Args:
+            lineage_key: Clé calculée par make_lineage_key
+
+        Returns:
+            Dict du résultat, ou None si absent (ou évincé)
+        """
+        try:
+            with open(self._latest_path(lineage_key), 'r', encoding='utf-8') as f:
+                key = f.read().strip()
+            return self._load(key)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key, result, lineage_key=None):
+        """
+        Enregistre un résultat (écriture atomique), puis applique la limite de taille.
+
+        Args:
+            key: Clé calculée par make_cache_key
+            result: Dict retourné par perform_collation
+            lineage_key: Clé calculée par make_lineage_key : le résultat devient
+                le dernier de sa lignée
+        """
+        payload = json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        write_atomic(self._path(key), gzip.compress(payload, compresslevel=6))
+        if lineage_key is not None:
+            write_atomic(self._latest_path(lineage_key), key.encode('ascii'))
+        self._unlink(self._path(self._partial_key(key)))
+        self._evict()
+
+    def get_partial(self, key):
+        """
+        Alignements des vers déjà calculés par les collations partielles
+        (fenêtres de vers) d'un même contenu.
+
+        Args:
+            key: Clé calculée par make_cache_key
+
+        Returns:
+            Dict {content_hash: [word_alignment, alignment_tier]} (vide si absent)
+        """
+        return self._load(self._partial_key(key)) or {}
+
+    def put_partial(self, key, alignments):
+        """
+        Ajoute les alignements d'une fenêtre de vers à ceux déjà enregistrés
+        pour ce contenu. L'entrée est supprimée par put(key, ...).
+
+        Args:
+            key: Clé calculée par make_cache_key
+            alignments: Dict {content_hash: [word_alignment, alignment_tier]}
+        """
+        partial_key = self._partial_key(key)
+        with file_lock(os.path.join(self.cache_dir, 'partial')):
+            merged = self._load(partial_key) or {}
+            merged.update(alignments)
+            payload = json.dumps(merged, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            write_atomic(self._path(partial_key), gzip.compress(payload, compresslevel=6))
+        self._evict()
+
+    @staticmethod
+    def _partial_key(key):
+        """Clé de l'entrée des alignements partiels d'une collation."""
+        return hashlib.sha256(f'partial:{key}'.encode('utf-8')).hexdigest()
+
+    def _load(self, key):
+        """Lit une entrée (None si absente ou illisible) et la marque comme utilisée."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = json.loads(gzip.decompress(f.read()))
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Entrée de cache illisible {path}: {e}")
+            self._unlink(path)
+            return None
+        return result
+
+    def invalidate(self, key=None):
+        """
+        Supprime une entrée, ou tout le cache.
+
+        Args:
+            key: Clé à supprimer, None pour vider le cache
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        if key is not None:
+            return 1 if self._unlink(self._path(key)) else 0
+        removed = 0
+        for entry in self._entries():
+            if self._unlink(entry.path):
+                removed += 1
+        for entry in self._entries(LATEST_SUFFIX):
+            self._unlink(entry.path)
+        return removed
+
+    def stats(self):
+        """Retourne des statistiques sur le cache."""
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(e.stat().st_size for e in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def _entries(self, suffix=CACHE_SUFFIX):
+        """Liste les fichiers d'entrées du cache (ou les pointeurs de lignée)."""
+        try:
+            return [e for e in os.scandir(self.cache_dir)
+                    if e.is_file() and e.name.endswith(suffix)]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes."""
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if self._unlink(path):
+                    total -= size
+
+    @staticmethod
+    def _unlink(path):
+        """Supprime un fichier s'il existe."""
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+# Instance partagée par le processus
+collation_cache = CollationCache()
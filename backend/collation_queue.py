@@ -0,0 +1,342 @@
+"""
+Module de la file de collations asynchrones.
+/api/collate avec async: true dépose une tâche dans une file SQLite locale
+(aucun service externe) et répond aussitôt avec son identifiant ; des
+threads de chaque processus exécutent les tâches (perform_collation), dont
+le résultat est écrit dans le cache des collations. Le calcul ne dépend
+plus de la requête HTTP : il se poursuit si le client se déconnecte.
+
+Les tâches sont dédupliquées par clé de cache : les demandes d'un même
+contenu (deux utilisateurs ouvrant le même chapitre) partagent un seul
+calcul, et une demande dont le résultat est déjà en cache est terminée
+aussitôt. La file est partagée par tous les workers du serveur (voir
+gunicorn.conf.py) : une tâche peut être suivie depuis n'importe lequel.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import collate
+from config import (COLLATION_QUEUE_DB, COLLATION_QUEUE_WORKERS, COLLATION_QUEUE_POLL_INTERVAL,
+                    COLLATION_JOB_TIMEOUT, COLLATION_JOB_TTL)
+
+
+def pid_alive(pid):
+    """Indique si un processus local existe (toujours vrai hors POSIX)."""
+    if os.name != 'posix' or pid is None:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CollationQueue:
+    """
+    File de tâches de collation, stockée en SQLite (mode WAL).
+
+    Une ligne par demande ; les demandes de même clé de cache en attente
+    sont prises ensemble par un seul thread, et une demande d'une clé en
+    cours de calcul rejoint ce calcul. Une tâche dont le processus a
+    disparu (worker redémarré) est remise en attente ; une tâche en cours
+    depuis plus de job_timeout secondes est marquée en erreur.
+    """
+
+    def __init__(self, db_path=COLLATION_QUEUE_DB, workers=COLLATION_QUEUE_WORKERS,
+                 poll_interval=COLLATION_QUEUE_POLL_INTERVAL, job_timeout=COLLATION_JOB_TIMEOUT,
+                 job_ttl=COLLATION_JOB_TTL):
+        """
+        Initialise la file.
+
+        Args:
+            db_path: Chemin de la base SQLite
+            workers: Nombre de threads d'exécution par processus (0 : aucun,
+                les tâches sont exécutées par run_pending)
+            poll_interval: Délai entre deux recherches de tâches (secondes)
+            job_timeout: Durée maximale d'une tâche (secondes)
+            job_ttl: Durée de conservation des tâches terminées (secondes)
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.job_ttl = job_ttl
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._init_db()
+
+    def _connect(self):
+        """Ouvre une connexion SQLite (une par opération, sûre entre threads et processus)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Crée le schéma et active le mode WAL."""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS collation_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    cache_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    deduplicated INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    worker_pid INTEGER,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS collation_jobs_key ON collation_jobs (cache_key, status);
+                CREATE INDEX IF NOT EXISTS collation_jobs_status ON collation_jobs (status, created_at);
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row):
+        """Convertit une ligne SQLite en état de tâche (JSON de l'API)."""
+        return {
+            'job_id': row['job_id'],
+            'status': row['status'],
+            'cache_key': row['cache_key'],
+            'deduplicated': bool(row['deduplicated']),
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def enqueue(self, cache_key, params):
+        """
+        Dépose une tâche de collation.
+
+        Args:
+            cache_key: Clé de cache du résultat attendu (collate.collation_cache_key)
+            params: Paramètres de la demande (sérialisables en JSON) ; la
+                collation exécutée est perform_collation(**params['collation'])
+
+        Returns:
+            Dict d'état de la tâche ('done' si le résultat est déjà en cache,
+            deduplicated si elle partage le calcul d'une autre demande)
+        """
+        self._ensure_workers()
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._recover(conn)
+                running = conn.execute(
+                    """
+                    SELECT worker_pid, started_at FROM collation_jobs
+                    WHERE cache_key = ? AND status = 'running' LIMIT 1
+                    """,
+                    (cache_key,)
+                ).fetchone()
+                status, worker_pid, started_at, finished_at = 'queued', None, None, None
+                deduplicated = True
+                if collate.collation_cache.contains(cache_key):
+                    status, finished_at = 'done', now
+                elif running:
+                    status, worker_pid, started_at = 'running', running['worker_pid'], running['started_at']
+                else:
+                    deduplicated = conn.execute(
+                        "SELECT 1 FROM collation_jobs WHERE cache_key = ? AND status = 'queued' LIMIT 1",
+                        (cache_key,)
+                    ).fetchone() is not None
+                conn.execute(
+                    "INSERT INTO collation_jobs VALUES (?, ?, ?, ?, ?, NULL, ?, ?, ?, ?)",
+                    (job_id, cache_key, status, json.dumps(params, ensure_ascii=False),
+                     int(deduplicated), worker_pid, now, started_at, finished_at)
+                )
+        finally:
+            conn.close()
+        if status == 'queued':
+            self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """Retourne l'état d'une tâche, ou None."""
+        self._ensure_workers()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM collation_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_job(row) if row else None
+
+    def get_params(self, job_id):
+        """Retourne les paramètres de la demande d'une tâche, ou None."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT params FROM collation_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['params']) if row else None
+
+    def run_pending(self):
+        """
+        Exécute les tâches en attente jusqu'à épuisement (dans le thread appelant).
+
+        Returns:
+            Nombre de calculs effectués
+        """
+        count = 0
+        while self._run_next():
+            count += 1
+        return count
+
+    def _ensure_workers(self):
+        """
+        Démarre les threads d'exécution du processus courant à la première
+        utilisation (après le fork des workers Gunicorn : aucun thread
+        n'est hérité du processus maître).
+        """
+        if self.workers < 1 or self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._wakeup = threading.Event()
+            self._stop = threading.Event()
+            for _ in range(self.workers):
+                threading.Thread(target=self._work, args=(self._stop,), daemon=True).start()
+
+    def stop(self):
+        """Arrête les threads d'exécution après leur tâche en cours (ils seront relancés si nécessaire)."""
+        with self._lock:
+            self._stop.set()
+            self._wakeup.set()
+            self._worker_pid = None
+
+    def _work(self, stop):
+        """Boucle d'un thread d'exécution."""
+        while not stop.is_set():
+            try:
+                if self._run_next():
+                    continue
+            except Exception as e:
+                print(f"Erreur de la file de collations : {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _run_next(self):
+        """Prend la plus ancienne tâche en attente et l'exécute ; False si la file est vide."""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        self._execute(*claimed)
+        return True
+
+    def _claim(self):
+        """
+        Passe en cours la plus ancienne tâche en attente, et toutes celles de
+        même clé de cache.
+
+        Returns:
+            Tuple (clé de cache, paramètres), ou None si la file est vide
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._recover(conn)
+                row = conn.execute(
+                    """
+                    SELECT cache_key, params FROM collation_jobs
+                    WHERE status = 'queued' ORDER BY created_at, rowid LIMIT 1
+                    """
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    """
+                    UPDATE collation_jobs SET status = 'running', worker_pid = ?, started_at = ?
+                    WHERE status = 'queued' AND cache_key = ?
+                    """,
+                    (os.getpid(), datetime.now().isoformat(), row['cache_key'])
+                )
+        finally:
+            conn.close()
+        return row['cache_key'], json.loads(row['params'])
+
+    def _execute(self, cache_key, params):
+        """Exécute une collation et termine les tâches qui l'attendent."""
+        collation = dict(params['collation'], use_cache=True, window=None)
+        try:
+            result = collate.perform_collation(**collation)
+            error = result.get('error')
+        except Exception as e:
+            result, error = None, str(e)
+
+        conn = self._connect()
+        try:
+            with conn:
+                # Un témoin mis à jour depuis le dépôt change la clé du résultat
+                conn.execute(
+                    """
+                    UPDATE collation_jobs SET status = ?, error = ?, cache_key = ?, finished_at = ?
+                    WHERE status = 'running' AND cache_key = ? AND worker_pid = ?
+                    """,
+                    ('error' if error else 'done', error,
+                     cache_key if error else result['cache_key'],
+                     datetime.now().isoformat(), cache_key, os.getpid())
+                )
+        finally:
+            conn.close()
+
+    def _recover(self, conn):
+        """
+        Remet en attente les tâches des processus disparus, marque en erreur
+        les tâches trop longues et supprime les tâches terminées anciennes
+        (dans la transaction d'écriture de l'appelant).
+        """
+        now = datetime.now()
+        pids = [row['worker_pid'] for row in conn.execute(
+            "SELECT DISTINCT worker_pid FROM collation_jobs WHERE status = 'running'"
+        )]
+        for pid in pids:
+            if not pid_alive(pid):
+                conn.execute(
+                    """
+                    UPDATE collation_jobs SET status = 'queued', worker_pid = NULL, started_at = NULL
+                    WHERE status = 'running' AND worker_pid = ?
+                    """,
+                    (pid,)
+                )
+        conn.execute(
+            """
+            UPDATE collation_jobs SET status = 'error', error = ?, finished_at = ?
+            WHERE status = 'running' AND started_at < ?
+            """,
+            ("Délai de collation dépassé", now.isoformat(),
+             (now - timedelta(seconds=self.job_timeout)).isoformat())
+        )
+        conn.execute(
+            "DELETE FROM collation_jobs WHERE status IN ('done', 'error') AND finished_at < ?",
+            ((now - timedelta(seconds=self.job_ttl)).isoformat(),)
+        )
+
+
+# Instance partagée par le processus
+collation_queue = CollationQueue()
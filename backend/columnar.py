@@ -0,0 +1,114 @@
+"""
+Module des fichiers binaires en colonnes.
+Format commun aux artefacts dérivés des témoins (format compilé, tokens) :
+un préambule, un en-tête JSON, puis des colonnes alignées sur 8 octets
+(tableaux d'entiers non signés sur 4 octets ou textes UTF-8 concaténés).
+Les fichiers sont projetés en mémoire (mmap) à la lecture.
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from file_lock import write_atomic
+
+# Magique, version, longueur de l'en-tête JSON
+_PREAMBLE = struct.Struct('<4sII')
+# Alignement des colonnes dans le fichier
+_ALIGN = 8
+
+# Terminateur des chaînes dans les colonnes de textes
+# (les chaînes d'un chapitre se décodent en une fois puis se découpent)
+TERMINATOR = '\0'
+
+
+def int_column():
+    """Retourne une colonne vide d'entiers non signés (4 octets)."""
+    return array('I')
+
+
+def write_columnar(path, magic, version, header, columns):
+    """
+    Écrit un fichier en colonnes (écriture atomique).
+
+    Args:
+        path: Fichier à écrire
+        magic: Identifiant du format (4 octets)
+        version: Version du format
+        header: Dict JSON des métadonnées (complété par 'byteorder' et 'sections')
+        columns: Dict {nom: array('I') ou bytes}, dans l'ordre d'écriture
+    """
+    sections = {}
+    payload = []
+    position = 0
+    for name, column in columns.items():
+        if isinstance(column, array):
+            data, kind = column.tobytes(), column.typecode
+        else:
+            data, kind = bytes(column), 'B'
+        sections[name] = [position, len(data), kind]
+        padding = -len(data) % _ALIGN
+        payload.append(data + b'\0' * padding)
+        position += len(data) + padding
+
+    header = dict(header, byteorder=sys.byteorder, sections=sections)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    header_bytes += b' ' * (-(_PREAMBLE.size + len(header_bytes)) % _ALIGN)
+
+    write_atomic(path, [_PREAMBLE.pack(magic, version, len(header_bytes)), header_bytes, *payload])
+
+
+def read_columnar(path, magic, version):
+    """
+    Ouvre un fichier en colonnes (projection mémoire, lecture seule).
+
+    Args:
+        path: Fichier à lire
+        magic: Identifiant attendu du format
+        version: Version attendue du format
+
+    Returns:
+        Tuple (en-tête, {nom: memoryview}, mmap) : les colonnes d'entiers
+        sont indexables directement, les colonnes de textes sont des octets
+
+    Raises:
+        ValueError: si le fichier est tronqué ou d'un autre format/version
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if len(view) < _PREAMBLE.size:
+        raise ValueError(f"Fichier tronqué : {path}")
+    file_magic, file_version, header_len = _PREAMBLE.unpack_from(view)
+    if file_magic != magic or file_version != version:
+        raise ValueError(f"Format inconnu ou périmé : {path}")
+    header = json.loads(bytes(view[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+    if header['byteorder'] != sys.byteorder:
+        raise ValueError(f"Ordre des octets différent : {path}")
+
+    base = _PREAMBLE.size + header_len
+    columns = {}
+    for name, (offset, length, kind) in header['sections'].items():
+        if base + offset + length > len(view):
+            raise ValueError(f"Fichier tronqué : {path}")
+        section = view[base + offset:base + offset + length]
+        columns[name] = section if kind == 'B' else section.cast(kind)
+    return header, columns, mapped
+
+
+def decode_strings(blob, start, end):
+    """
+    Décode les chaînes terminées par TERMINATOR entre deux positions d'une colonne de textes.
+
+    Args:
+        blob: Colonne de textes (memoryview)
+        start: Position de début (octets)
+        end: Position de fin (octets)
+
+    Returns:
+        Liste de chaînes
+    """
+    return str(blob[start:end], 'utf-8').split(TERMINATOR)[:-1]
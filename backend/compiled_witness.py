@@ -0,0 +1,269 @@
+"""
+Module du format binaire compilé des témoins.
+À l'ajout d'un témoin, son JSON est compilé en un fichier annexe
+({témoin}.wbin) organisé en colonnes : tables de chaînes internées pour
+les régions, types et pages, tableaux d'entiers pour les positions, et
+textes UTF-8 concaténés. Le fichier est projeté en mémoire (mmap) : un
+chapitre se lit sans parser de JSON.
+
+Le JSON reste la référence : le fichier compilé est reconstruit dès que
+le témoin change (mtime, taille) ou que COMPILED_FORMAT_VERSION change.
+"""
+
+import json
+import os
+import threading
+
+from columnar import TERMINATOR, decode_strings, int_column, read_columnar, write_columnar
+from witness_reader import iter_chapters
+
+# Version du format compilé.
+# À incrémenter quand la structure écrite par compile_witness change.
+COMPILED_FORMAT_VERSION = 2
+
+COMPILED_SUFFIX = '.wbin'
+
+_MAGIC = b'CRNW'
+
+# Colonnes d'entiers par chapitre (n + 1 bornes) puis par vers
+_INT_COLUMNS = ('chapter_starts', 'chapter_sizes', 'chapter_text_offsets',
+                'chapter_alto_offsets', 'regions', 'types', 'pages')
+_BLOB_COLUMNS = ('texts', 'alto_ids')
+
+
+def compiled_path(witness_file):
+    """
+    Retourne le chemin du fichier compilé d'un témoin.
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+
+    Returns:
+        Chemin du fichier annexe (témoin.json → témoin.wbin)
+    """
+    base, ext = os.path.splitext(witness_file)
+    if ext.lower() != '.json':
+        base = witness_file
+    return base + COMPILED_SUFFIX
+
+
+class _StringTable:
+    """Table de valeurs internées (chaque valeur distincte stockée une fois)."""
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def intern(self, value):
+        key = json.dumps(value, sort_keys=True)
+        if key not in self._ids:
+            self._ids[key] = len(self.values)
+            self.values.append(value)
+        return self._ids[key]
+
+
+def compile_witness(witness_file, output_file=None):
+    """
+    Compile un témoin JSON au format binaire en colonnes.
+
+    Seuls les vers ayant un texte sont conservés (comme pour la collation).
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+        output_file: Fichier à écrire (défaut : compiled_path(witness_file))
+
+    Returns:
+        Chemin du fichier écrit
+    """
+    output_file = output_file or compiled_path(witness_file)
+    stat = os.stat(witness_file)
+
+    tables = {name: _StringTable() for name in ('regions', 'types', 'pages')}
+    columns = {name: int_column() for name in _INT_COLUMNS}
+    blobs = {name: bytearray() for name in _BLOB_COLUMNS}
+    for name in ('chapter_starts', 'chapter_text_offsets', 'chapter_alto_offsets'):
+        columns[name].append(0)
+
+    verse_count = 0
+    with open(witness_file, 'rb') as f:
+        for chapter, _, length in iter_chapters(f):
+            for item in chapter if isinstance(chapter, list) else []:
+                if not isinstance(item, dict) or 'text' not in item:
+                    continue
+                text, alto_id = item['text'], item.get('alto_id', '')
+                if (not isinstance(text, str) or not isinstance(alto_id, str)
+                        or TERMINATOR in text or TERMINATOR in alto_id):
+                    raise ValueError(f"Vers non compilable : {item}")
+                columns['regions'].append(tables['regions'].intern(item.get('region', '')))
+                columns['types'].append(tables['types'].intern(item.get('type', '')))
+                columns['pages'].append(tables['pages'].intern(item.get('page', '')))
+                blobs['texts'] += (text + TERMINATOR).encode('utf-8')
+                blobs['alto_ids'] += (alto_id + TERMINATOR).encode('utf-8')
+                verse_count += 1
+            columns['chapter_starts'].append(verse_count)
+            columns['chapter_sizes'].append(length)
+            columns['chapter_text_offsets'].append(len(blobs['texts']))
+            columns['chapter_alto_offsets'].append(len(blobs['alto_ids']))
+
+    columns.update(blobs)
+    write_columnar(output_file, _MAGIC, COMPILED_FORMAT_VERSION, {
+        'source': {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size},
+        'chapters': len(columns['chapter_sizes']),
+        'verses': verse_count,
+        'tables': {name: table.values for name, table in tables.items()}
+    }, columns)
+    return output_file
+
+
+class CompiledWitness:
+    """Témoin compilé, projeté en mémoire (lecture seule)."""
+
+    def __init__(self, path):
+        """
+        Ouvre un fichier compilé.
+
+        Args:
+            path: Chemin du fichier .wbin
+
+        Raises:
+            ValueError: si le fichier n'est pas un témoin compilé de la version courante
+        """
+        header, self._columns, self._mmap = read_columnar(path, _MAGIC, COMPILED_FORMAT_VERSION)
+        self.source = header['source']
+        self.chapter_count = header['chapters']
+        self.verse_count = header['verses']
+        self._tables = header['tables']
+
+    def chapter_size(self, chapter_index):
+        """Taille (octets) du chapitre dans le JSON source."""
+        return self._columns['chapter_sizes'][chapter_index]
+
+    def get_chapter(self, chapter_index):
+        """
+        Reconstruit les vers d'un chapitre.
+
+        Args:
+            chapter_index: Index du chapitre (0-based)
+
+        Returns:
+            Liste de dicts {region, text, alto_id, type, page} ([] si hors limites)
+        """
+        if chapter_index < 0 or chapter_index >= self.chapter_count:
+            return []
+
+        columns = self._columns
+        first, last = columns['chapter_starts'][chapter_index:chapter_index + 2]
+        texts = decode_strings(columns['texts'],
+                               *columns['chapter_text_offsets'][chapter_index:chapter_index + 2])
+        alto_ids = decode_strings(columns['alto_ids'],
+                                  *columns['chapter_alto_offsets'][chapter_index:chapter_index + 2])
+        region_table, type_table, page_table = (
+            self._tables[name] for name in ('regions', 'types', 'pages'))
+
+        return [
+            {
+                'region': region_table[region],
+                'text': text,
+                'alto_id': alto_id,
+                'type': type_table[type_id],
+                'page': page_table[page]
+            }
+            for region, text, alto_id, type_id, page in zip(
+                columns['regions'][first:last], texts, alto_ids,
+                columns['types'][first:last], columns['pages'][first:last])
+        ]
+
+
+class CompiledWitnessStore:
+    """
+    Accès aux témoins compilés, avec cache des fichiers ouverts.
+
+    Un fichier compilé absent ou périmé est (re)construit à la demande.
+    Un échec de compilation est mémorisé jusqu'à la modification du témoin.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def get(self, witness_file):
+        """
+        Retourne le témoin compilé à jour, en le (re)compilant si besoin.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            CompiledWitness, ou None si le témoin ne peut pas être compilé
+        """
+        key = os.path.abspath(witness_file)
+        stat = os.stat(key)
+        source = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+        with self._lock:
+            compiled = self._entries.get(key)
+            if self._failed.get(key) == source:
+                return None
+        if compiled is not None and compiled.source == source:
+            return compiled
+
+        compiled = self._open(compiled_path(key))
+        if compiled is None or compiled.source != source:
+            try:
+                compiled = self.build(key)
+            except Exception as e:
+                print(f"Compilation impossible de {key}: {e}")
+                with self._lock:
+                    self._failed[key] = source
+                return None
+
+        with self._lock:
+            self._entries[key] = compiled
+        return compiled
+
+    def build(self, witness_file):
+        """
+        Compile un témoin et ouvre le résultat.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            CompiledWitness
+        """
+        key = os.path.abspath(witness_file)
+        compiled = CompiledWitness(compile_witness(key))
+        with self._lock:
+            self._entries[key] = compiled
+        return compiled
+
+    def invalidate(self, witness_file, remove_file=False):
+        """
+        Oublie le témoin compilé.
+
+        Args:
+            witness_file: Chemin du témoin
+            remove_file: Supprimer aussi le fichier compilé
+        """
+        key = os.path.abspath(witness_file)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._failed.pop(key, None)
+        if remove_file:
+            try:
+                os.remove(compiled_path(key))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _open(path):
+        """Ouvre un fichier compilé, None s'il est absent ou invalide."""
+        try:
+            return CompiledWitness(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+# Instance partagée par le processus
+compiled_witness_store = CompiledWitnessStore()
@@ -19,6 +19,10 @@ WITNESSES = {
     'chantilly': os.path.join(INPUT_DIR, 'chantilly_l4_by_chap_text', 'chantilly_l4_by_chap.json'),
 }
 
+# Nombre de témoins collationnés ensemble
+MIN_WITNESSES = 2
+MAX_WITNESSES = int(os.environ.get('MAX_WITNESSES', 16))
+
 # Régions à conserver
 ALLOWED_REGIONS = ['MainZone', 'Rubric', 'Chapter']
 
@@ -30,6 +34,82 @@ COLLATEX_CONFIG = {
     'output': 'json'
 }
 
+# Moteur d'alignement mot à mot par défaut :
+# - 'verse' : un appel CollateX par vers
+# - 'chapter' : un seul appel CollateX pour tout le chapitre (vers marqués par verse_nb)
+COLLATION_ENGINES = ('verse', 'chapter')
+COLLATION_ENGINE = 'verse'
+
+# Alignement rapide avant CollateX (vers identiques ou quasi identiques)
+ALIGNMENT_FAST_PATH = os.environ.get('ALIGNMENT_FAST_PATH', '1') != '0'
+# Aligneur des vers divergents (mode 'verse') :
+# - 'native' : aligneur natif (native_aligner.py), même algorithme que CollateX
+# - 'collatex' : CollateX
+WORD_ALIGNER = os.environ.get('WORD_ALIGNER', 'native')
+# Nombre maximal de témoins d'un vers aligné par l'aligneur natif ; au-delà,
+# CollateX. L'accord avec CollateX est vérifié jusqu'à 3 témoins ; avec plus
+# de témoins, CollateX départage différemment les formes répétées (table
+# d'appariements construite à partir de son index des blocs communs)
+NATIVE_ALIGNER_MAX_WITNESSES = int(os.environ.get('NATIVE_ALIGNER_MAX_WITNESSES', '3'))
+# Proportion maximale de positions divergentes pour l'alignement linéaire
+LINEAR_DIFF_MAX_SUBSTITUTION_RATIO = 0.34
+# Appariement des vers entre témoins par similarité (verse_alignment.py)
+# plutôt que par rang. Désactivé par défaut : les numéros de vers changent
+# quand des vers sont insérés, or les décisions éditoriales y sont rattachées
+VERSE_ALIGNMENT = os.environ.get('VERSE_ALIGNMENT', '0') != '0'
+
+# Alignement par vers en parallèle (ProcessPoolExecutor)
+# COLLATION_WORKERS <= 1 désactive le parallélisme
+COLLATION_WORKERS = int(os.environ.get('COLLATION_WORKERS', min(4, os.cpu_count() or 1)))
+# Nombre de vers envoyés à un processus par tâche
+COLLATION_CHUNK_SIZE = int(os.environ.get('COLLATION_CHUNK_SIZE', 16))
+# En dessous de ce nombre de vers, le coût IPC domine : alignement en série
+COLLATION_PARALLEL_MIN_VERSES = int(os.environ.get('COLLATION_PARALLEL_MIN_VERSES', 64))
+
+# Pagination de /api/collate (offset/limit, plage de vers ou curseur)
+COLLATE_PAGE_DEFAULT_LIMIT = int(os.environ.get('COLLATE_PAGE_DEFAULT_LIMIT', 100))
+COLLATE_PAGE_MAX_LIMIT = int(os.environ.get('COLLATE_PAGE_MAX_LIMIT', 1000))
+
+# Collation de toute une œuvre en arrière-plan
+# Nombre de chapitres collationnés simultanément par tâche
+COLLATE_ALL_CONCURRENCY = int(os.environ.get('COLLATE_ALL_CONCURRENCY', 2))
+# Nombre de tâches terminées conservées
+JOBS_HISTORY_SIZE = 50
+# État des tâches, partagé par les workers du serveur
+JOBS_DB = os.path.join(DATA_DIR, 'jobs', 'collate_all.sqlite3')
+# Délai entre deux lectures de l'état d'une tâche suivie (flux SSE, secondes)
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 0.5))
+
+# File de collations asynchrones (/api/collate avec async: true)
+COLLATION_QUEUE_DB = os.path.join(DATA_DIR, 'jobs', 'collation_queue.sqlite3')
+# Threads d'exécution des tâches, par processus
+COLLATION_QUEUE_WORKERS = int(os.environ.get('COLLATION_QUEUE_WORKERS', 1))
+# Délai entre deux recherches de tâches déposées par un autre processus (secondes)
+COLLATION_QUEUE_POLL_INTERVAL = float(os.environ.get('COLLATION_QUEUE_POLL_INTERVAL', 1.0))
+# Une tâche en cours depuis plus longtemps est considérée comme échouée (secondes)
+COLLATION_JOB_TIMEOUT = int(os.environ.get('COLLATION_JOB_TIMEOUT', 600))
+# Durée de conservation des tâches terminées (secondes)
+COLLATION_JOB_TTL = int(os.environ.get('COLLATION_JOB_TTL', 24 * 3600))
+
+# Cache disque des résultats de collation
+COLLATION_CACHE_ENABLED = os.environ.get('COLLATION_CACHE_ENABLED', '1') != '0'
+COLLATION_CACHE_DIR = os.path.join(DATA_DIR, 'cache', 'collations')
+COLLATION_CACHE_MAX_BYTES = int(os.environ.get('COLLATION_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Cache mémoire des témoins parsés (taille cumulée des fichiers sources, en octets)
+WITNESS_CACHE_MAX_BYTES = int(os.environ.get('WITNESS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Format binaire compilé des témoins ({témoin}.wbin), lu à la place du JSON
+COMPILED_WITNESS_ENABLED = os.environ.get('COMPILED_WITNESS_ENABLED', '1') != '0'
+# Tokens pré-calculés des témoins ({témoin}.tokens), utilisés par la collation
+TOKEN_STORE_ENABLED = os.environ.get('TOKEN_STORE_ENABLED', '1') != '0'
+
+# Vocabulaires des formes normalisées par œuvre (identifiants entiers, fréquences)
+VOCABULARY_DIR = os.path.join(DATA_DIR, 'vocabularies')
+
+# Nombre maximal de mots distincts gardés dans le cache de normalisation
+NORMALIZATION_CACHE_SIZE = 65536
+
 # Flask config
 FLASK_DEBUG = True
 FLASK_PORT = int(os.environ.get('FLASK_PORT', 5001))
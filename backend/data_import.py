@@ -3,9 +3,26 @@ Module d'import et de structuration des données.
 Parse les fichiers JSON des manuscrits et filtre les régions.
 """
 
-import json
 import os
 
+from chapter_index import chapter_index_store
+from witness_reader import iter_chapters
+
+
+def iter_witness_chapters(file_path):
+    """
+    Parcourt les chapitres d'un fichier JSON de témoin, un par un (lecture en flux).
+    
+    Args:
+        file_path: Chemin vers le fichier JSON
+    
+    Yields:
+        Chapitres (chaque chapitre = liste de vers)
+    """
+    with open(file_path, 'rb') as f:
+        for chapter, _, _ in iter_chapters(f):
+            yield chapter
+
 
 def load_witness_json(file_path):
     """
@@ -17,9 +34,22 @@ def load_witness_json(file_path):
     Returns:
         Liste de chapitres (chaque chapitre = liste de vers)
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data
+    return list(iter_witness_chapters(file_path))
+
+
+def load_witness_chapter(file_path, chapter_index):
+    """
+    Charge un seul chapitre d'un témoin, sans lire le reste du fichier.
+    
+    Args:
+        file_path: Chemin vers le fichier JSON
+        chapter_index: Index du chapitre (0-based)
+    
+    Returns:
+        Liste de vers du chapitre (vide si l'index est hors limites)
+    """
+    chapter, _ = chapter_index_store.read_chapter(file_path, chapter_index)
+    return chapter
 
 
 def filter_regions(verses, allowed_regions=None):
@@ -70,11 +100,8 @@ def prepare_witnesses_for_collation(witness_files, chapter_index=0):
     witnesses = []
     
     for wit_id, file_path in witness_files.items():
-        # Charger le JSON
-        data = load_witness_json(file_path)
-        
-        # Récupérer le chapitre
-        chapter = get_chapter_by_index(data, chapter_index)
+        # Charger uniquement le chapitre demandé
+        chapter = load_witness_chapter(file_path, chapter_index)
         
         # Filtrer les régions
         filtered_verses = filter_regions(chapter)
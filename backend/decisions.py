@@ -5,11 +5,19 @@ Permet de sauvegarder et charger les annotations/qualifications des utilisateurs
 
 import json
 import os
+import sqlite3
 from datetime import datetime
 
+from file_lock import file_lock, write_json_atomic
+
 
 class DecisionManager:
-    """Gère les décisions de collation des utilisateurs."""
+    """
+    Gère les décisions de collation des utilisateurs.
+    
+    Un fichier JSON par œuvre/chapitre, modifié sous verrou inter-processus
+    et écrit de façon atomique (voir file_lock.py).
+    """
     
     def __init__(self, decisions_dir='../data/decisions'):
         """
@@ -50,37 +58,37 @@ class DecisionManager:
         """
         file_path = self._get_decision_file(work_id, chapter_index)
         
-        # Charger les décisions existantes
-        decisions = self.load_decisions(work_id, chapter_index)
-        
-        # Ajouter/mettre à jour la décision
-        decision_data['verse_number'] = verse_number
-        decision_data['timestamp'] = datetime.now().isoformat()
-        
-        # Chercher si une décision existe déjà pour ce vers
-        existing_index = None
-        for i, dec in enumerate(decisions.get('verses', [])):
-            if dec.get('verse_number') == verse_number:
-                existing_index = i
-                break
-        
-        if 'verses' not in decisions:
-            decisions['verses'] = []
-        
-        if existing_index is not None:
-            decisions['verses'][existing_index] = decision_data
-        else:
-            decisions['verses'].append(decision_data)
-        
-        # Mettre à jour les métadonnées
-        decisions['work_id'] = work_id
-        decisions['chapter_index'] = chapter_index
-        decisions['last_modified'] = datetime.now().isoformat()
-        decisions['total_decisions'] = len(decisions['verses'])
-        
-        # Sauvegarder
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(decisions, f, ensure_ascii=False, indent=2)
+        with file_lock(file_path):
+            # Charger les décisions existantes
+            decisions = self.load_decisions(work_id, chapter_index)
+            
+            # Ajouter/mettre à jour la décision
+            decision_data['verse_number'] = verse_number
+            decision_data['timestamp'] = datetime.now().isoformat()
+            
+            # Chercher si une décision existe déjà pour ce vers
+            existing_index = None
+            for i, dec in enumerate(decisions.get('verses', [])):
+                if dec.get('verse_number') == verse_number:
+                    existing_index = i
+                    break
+            
+            if 'verses' not in decisions:
+                decisions['verses'] = []
+            
+            if existing_index is not None:
+                decisions['verses'][existing_index] = decision_data
+            else:
+                decisions['verses'].append(decision_data)
+            
+            # Mettre à jour les métadonnées
+            decisions['work_id'] = work_id
+            decisions['chapter_index'] = chapter_index
+            decisions['last_modified'] = datetime.now().isoformat()
+            decisions['total_decisions'] = len(decisions['verses'])
+            
+            # Sauvegarder
+            write_json_atomic(file_path, decisions)
         
         return True
     
@@ -129,13 +137,28 @@ class DecisionManager:
         Returns:
             Dict avec la décision ou None
         """
+        return self.get_decisions_by_verse(work_id, chapter_index).get(verse_number)
+    
+    def get_decisions_by_verse(self, work_id, chapter_index):
+        """
+        Charge toutes les décisions d'un chapitre, indexées par numéro de vers
+        (un seul chargement du fichier pour tout le chapitre).
+        
+        Args:
+            work_id: ID de l'œuvre
+            chapter_index: Index du chapitre
+        
+        Returns:
+            Dict {verse_number: décision}
+        """
         decisions = self.load_decisions(work_id, chapter_index)
         
+        by_verse = {}
         for dec in decisions.get('verses', []):
-            if dec.get('verse_number') == verse_number:
-                return dec
+            # En cas de doublon, la première décision est retenue
+            by_verse.setdefault(dec.get('verse_number'), dec)
         
-        return None
+        return by_verse
     
     def delete_decision(self, work_id, chapter_index, verse_number):
         """
@@ -154,22 +177,22 @@ class DecisionManager:
         if not os.path.exists(file_path):
             return False
         
-        decisions = self.load_decisions(work_id, chapter_index)
-        
-        # Filtrer les décisions
-        original_count = len(decisions.get('verses', []))
-        decisions['verses'] = [
-            dec for dec in decisions.get('verses', [])
-            if dec.get('verse_number') != verse_number
-        ]
-        
-        # Mettre à jour les métadonnées
-        decisions['total_decisions'] = len(decisions['verses'])
-        decisions['last_modified'] = datetime.now().isoformat()
-        
-        # Sauvegarder
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(decisions, f, ensure_ascii=False, indent=2)
+        with file_lock(file_path):
+            decisions = self.load_decisions(work_id, chapter_index)
+            
+            # Filtrer les décisions
+            original_count = len(decisions.get('verses', []))
+            decisions['verses'] = [
+                dec for dec in decisions.get('verses', [])
+                if dec.get('verse_number') != verse_number
+            ]
+            
+            # Mettre à jour les métadonnées
+            decisions['total_decisions'] = len(decisions['verses'])
+            decisions['last_modified'] = datetime.now().isoformat()
+            
+            # Sauvegarder
+            write_json_atomic(file_path, decisions)
         
         return len(decisions['verses']) < original_count
     
@@ -202,57 +225,190 @@ class DecisionManager:
 
 
 class WordDecisionManager:
-    """Gère les décisions au niveau mot (ignorer / conserver)."""
+    """
+    Gère les décisions au niveau mot (ignorer / conserver).
+    
+    Stockage SQLite (mode WAL) indexé sur (configuration, chapitre, vers,
+    position) : chaque clic ne réécrit qu'une ligne. Les modifications se
+    font en transaction d'écriture (BEGIN IMMEDIATE), sûre entre workers. Une configuration
+    correspond à une œuvre + une combinaison de témoins. Les anciens fichiers
+    {work_id}_witnesses_*.json sont importés automatiquement au premier accès,
+    et le même format JSON reste disponible via export_json.
+    
+    Les décisions d'un chapitre se rapportent à une collation (clé de cache
+    enregistrée) ; quand un témoin est mis à jour, reconcile_chapter les
+    rattache à la nouvelle collation et signale celles dont le vers a changé
+    (context_change : 'moved', 'changed' ou 'stale').
+    """
+    
+    DB_FILENAME = 'word_decisions.sqlite3'
     
     def __init__(self, decisions_dir='../data/decisions'):
         self.decisions_dir = decisions_dir
         os.makedirs(decisions_dir, exist_ok=True)
+        self.db_path = os.path.join(decisions_dir, self.DB_FILENAME)
+        self._init_db()
     
-    def _get_file(self, work_id, witnesses):
+    def _connect(self):
+        """Ouvre une connexion SQLite (une par opération, sûre entre threads)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @staticmethod
+    def _begin_write(conn):
+        """
+        Ouvre une transaction d'écriture : les lectures qui suivent voient
+        l'état qui sera modifié (pas d'écriture concurrente d'un autre
+        processus entre lecture et écriture).
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+    
+    def _init_db(self):
+        """Crée le schéma et active le mode WAL."""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS configurations (
+                    config_key TEXT PRIMARY KEY,
+                    work_id TEXT NOT NULL,
+                    witnesses TEXT NOT NULL,
+                    excluded_chapters TEXT NOT NULL,
+                    last_modified TEXT
+                );
+                CREATE TABLE IF NOT EXISTS word_decisions (
+                    config_key TEXT NOT NULL,
+                    chapter TEXT NOT NULL,
+                    verse_number INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    action TEXT,
+                    explication TEXT,
+                    words TEXT,
+                    pages TEXT,
+                    timestamp TEXT,
+                    context_change TEXT,
+                    PRIMARY KEY (config_key, chapter, verse_number, position)
+                );
+                CREATE TABLE IF NOT EXISTS chapter_collations (
+                    config_key TEXT NOT NULL,
+                    chapter TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    PRIMARY KEY (config_key, chapter)
+                );
+            """)
+            # Bases créées avant le suivi des collations
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(word_decisions)")]
+            if 'context_change' not in columns:
+                conn.execute("ALTER TABLE word_decisions ADD COLUMN context_change TEXT")
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _get_config_key(self, work_id, witnesses):
         """
-        Fichier dédié aux décisions de mots pour une configuration œuvre + témoins.
-        Format: {work_id}_witnesses_{wit1}_{wit2}_{wit3}.json
+        Clé d'une configuration œuvre + témoins.
+        Format: {work_id}_witnesses_{wit1}_{wit2}_..._{witN}
+        (nom de l'ancien fichier JSON, sans extension)
         """
-        # Trier les témoins pour toujours avoir le même nom de fichier
+        # Trier les témoins pour toujours avoir la même clé
         witness_ids = sorted([w.split('/')[-1].replace('.json', '') for w in witnesses])
         witness_str = '_'.join(witness_ids)
-        filename = f"{work_id}_witnesses_{witness_str}.json"
+        return f"{work_id}_witnesses_{witness_str}"
+    
+    def _get_file(self, work_id, witnesses):
+        """
+        Ancien fichier JSON des décisions de mots pour une configuration œuvre + témoins.
+        Format: {work_id}_witnesses_{wit1}_{wit2}_..._{witN}.json
+        """
+        filename = f"{self._get_config_key(work_id, witnesses)}.json"
         return os.path.join(self.decisions_dir, filename)
     
-    def _load(self, work_id, witnesses):
-        """Charge le fichier de décisions pour l'œuvre + témoins."""
+    def _ensure_configuration(self, conn, work_id, witnesses):
+        """
+        Retourne la clé de configuration, en important l'ancien fichier JSON
+        s'il existe et que la configuration n'est pas encore en base.
+        """
+        config_key = self._get_config_key(work_id, witnesses)
+        row = conn.execute(
+            "SELECT 1 FROM configurations WHERE config_key = ?", (config_key,)
+        ).fetchone()
+        if row:
+            return config_key
+        
         file_path = self._get_file(work_id, witnesses)
         if not os.path.exists(file_path):
-            return {
-                'work_id': work_id,
-                'witnesses': witnesses,
-                'excluded_chapters': {},
-                'chapters': {}
-            }
+            return config_key
+        
+        # Un autre processus a pu importer le fichier entre-temps
+        self._begin_write(conn)
+        if conn.execute(
+            "SELECT 1 FROM configurations WHERE config_key = ?", (config_key,)
+        ).fetchone():
+            return config_key
+        
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                # Assurer la structure
-                if 'chapters' not in data:
-                    data['chapters'] = {}
-                if 'excluded_chapters' not in data:
-                    data['excluded_chapters'] = {}
-                return data
         except Exception as e:
             print(f"Erreur chargement décisions mots: {e}")
-            return {
-                'work_id': work_id,
-                'witnesses': witnesses,
-                'excluded_chapters': {},
-                'chapters': {}
-            }
+            return config_key
+        
+        conn.execute(
+            "INSERT INTO configurations VALUES (?, ?, ?, ?, ?)",
+            (config_key, work_id,
+             json.dumps(data.get('witnesses', witnesses), ensure_ascii=False),
+             json.dumps(data.get('excluded_chapters', {}), ensure_ascii=False),
+             data.get('last_modified'))
+        )
+        for chapter_key, chapter in data.get('chapters', {}).items():
+            for dec in chapter.get('decisions', []):
+                self._upsert_decision(conn, config_key, chapter_key, dec)
+        return config_key
     
-    def _save(self, work_id, witnesses, data):
-        """Sauvegarde le fichier de décisions."""
-        file_path = self._get_file(work_id, witnesses)
-        data['last_modified'] = datetime.now().isoformat()
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    @staticmethod
+    def _upsert_decision(conn, config_key, chapter_key, decision):
+        """Insère ou remplace une décision (l'ordre d'insertion est conservé)."""
+        conn.execute(
+            """
+            INSERT INTO word_decisions
+                (config_key, chapter, verse_number, position, action,
+                 explication, words, pages, timestamp, context_change)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (config_key, chapter, verse_number, position) DO UPDATE SET
+                action = excluded.action,
+                explication = excluded.explication,
+                words = excluded.words,
+                pages = excluded.pages,
+                timestamp = excluded.timestamp,
+                context_change = excluded.context_change
+            """,
+            (config_key, chapter_key, decision['verse_number'], decision['position'],
+             decision.get('action'), decision.get('explication'),
+             json.dumps(decision.get('words') or {}, ensure_ascii=False),
+             json.dumps(decision.get('pages') or {}, ensure_ascii=False),
+             decision.get('timestamp'), decision.get('context_change'))
+        )
+    
+    @staticmethod
+    def _row_to_decision(row):
+        """
+        Convertit une ligne SQLite en décision (format JSON historique, plus
+        context_change pour les décisions signalées par reconcile_chapter).
+        """
+        decision = {
+            'verse_number': row['verse_number'],
+            'position': row['position'],
+            'action': row['action'],
+            'explication': row['explication'],
+            'words': json.loads(row['words']) if row['words'] else {},
+            'pages': json.loads(row['pages']) if row['pages'] else {},
+            'timestamp': row['timestamp']
+        }
+        if row['context_change']:
+            decision['context_change'] = row['context_change']
+        return decision
     
     def save_word_decision(self, work_id, witnesses, excluded_chapters, chapter_index, 
                            verse_number, position, action, explication=None, words=None, pages=None):
@@ -261,7 +417,7 @@ class WordDecisionManager:
         
         Args:
             work_id: ID de l'œuvre
-            witnesses: Liste des 3 témoins
+            witnesses: Liste des témoins
             excluded_chapters: Dict {witness_name: [chapters]} des chapitres exclus
             chapter_index: Index du chapitre
             verse_number: Numéro du vers
@@ -271,17 +427,7 @@ class WordDecisionManager:
             words: Dict {witness_name: word_text}
             pages: Dict {witness_name: page_number}
         """
-        data = self._load(work_id, witnesses)
-        
-        # Mettre à jour les métadonnées
-        data['witnesses'] = witnesses
-        data['excluded_chapters'] = excluded_chapters or {}
-        
-        # Créer le chapitre s'il n'existe pas
-        chapter_key = str(chapter_index)
-        if chapter_key not in data['chapters']:
-            data['chapters'][chapter_key] = {'decisions': []}
-        
+        now = datetime.now().isoformat()
         decision = {
             'verse_number': verse_number,
             'position': position,
@@ -289,65 +435,183 @@ class WordDecisionManager:
             'explication': explication,
             'words': words or {},
             'pages': pages or {},
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now
         }
         
-        # Remplacer si existant
-        chapter_decisions = data['chapters'][chapter_key]['decisions']
-        existing_idx = None
-        for i, dec in enumerate(chapter_decisions):
-            if dec['verse_number'] == verse_number and dec['position'] == position:
-                existing_idx = i
-                break
-        
-        if existing_idx is not None:
-            chapter_decisions[existing_idx] = decision
-        else:
-            chapter_decisions.append(decision)
-        
-        self._save(work_id, witnesses, data)
+        conn = self._connect()
+        try:
+            with conn:
+                self._begin_write(conn)
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+                # Mettre à jour les métadonnées de la configuration
+                conn.execute(
+                    """
+                    INSERT INTO configurations VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (config_key) DO UPDATE SET
+                        witnesses = excluded.witnesses,
+                        excluded_chapters = excluded.excluded_chapters,
+                        last_modified = excluded.last_modified
+                    """,
+                    (config_key, work_id,
+                     json.dumps(witnesses, ensure_ascii=False),
+                     json.dumps(excluded_chapters or {}, ensure_ascii=False),
+                     now)
+                )
+                self._upsert_decision(conn, config_key, str(chapter_index), decision)
+        finally:
+            conn.close()
         return True
     
     def load_word_decisions(self, work_id, witnesses, chapter_index):
         """Charge toutes les décisions de mots pour un chapitre."""
-        data = self._load(work_id, witnesses)
-        chapter_key = str(chapter_index)
-        
-        if chapter_key in data.get('chapters', {}):
-            return data['chapters'][chapter_key].get('decisions', [])
-        return []
+        conn = self._connect()
+        try:
+            with conn:
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+            rows = conn.execute(
+                """
+                SELECT * FROM word_decisions
+                WHERE config_key = ? AND chapter = ?
+                ORDER BY rowid
+                """,
+                (config_key, str(chapter_index))
+            ).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_decision(row) for row in rows]
     
     def delete_word_decision(self, work_id, witnesses, chapter_index, verse_number, position):
         """Supprime une décision de mot."""
-        data = self._load(work_id, witnesses)
-        chapter_key = str(chapter_index)
-        
-        if chapter_key not in data.get('chapters', {}):
-            return False
+        conn = self._connect()
+        try:
+            with conn:
+                self._begin_write(conn)
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+                cursor = conn.execute(
+                    """
+                    DELETE FROM word_decisions
+                    WHERE config_key = ? AND chapter = ? AND verse_number = ? AND position = ?
+                    """,
+                    (config_key, str(chapter_index), verse_number, position)
+                )
+                if cursor.rowcount:
+                    conn.execute(
+                        "UPDATE configurations SET last_modified = ? WHERE config_key = ?",
+                        (datetime.now().isoformat(), config_key)
+                    )
+        finally:
+            conn.close()
+        return cursor.rowcount > 0
+    
+    def get_chapter_collation(self, work_id, witnesses, chapter_index):
+        """
+        Clé de cache de la collation à laquelle se rapportent les décisions d'un chapitre.
         
-        chapter_decisions = data['chapters'][chapter_key]['decisions']
-        original = len(chapter_decisions)
+        Returns:
+            Clé (voir collation_cache.make_cache_key), ou None si jamais enregistrée
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT cache_key FROM chapter_collations WHERE config_key = ? AND chapter = ?",
+                (self._get_config_key(work_id, witnesses), str(chapter_index))
+            ).fetchone()
+        finally:
+            conn.close()
+        return row['cache_key'] if row else None
+    
+    def reconcile_chapter(self, work_id, witnesses, chapter_index, result, previous=None):
+        """
+        Rattache les décisions d'un chapitre à une nouvelle collation.
+        
+        Chaque décision suit son vers d'après l'empreinte de son contenu
+        (content_hash) dans la collation précédente :
+        - vers inchangé au même numéro : décision conservée telle quelle ;
+        - vers inchangé déplacé (vers inséré ou supprimé avant lui) : la
+          décision suit le vers, context_change = 'moved' ;
+        - vers modifié (ou de contenu répété) : la décision suit le décalage
+          des vers inchangés qui le précèdent, et est rattachée à la position
+          où se trouvent encore les mêmes mots (context_change = 'changed'),
+          ou à la même position avec context_change = 'stale' si ces mots
+          ont disparu.
         
-        data['chapters'][chapter_key]['decisions'] = [
-            d for d in chapter_decisions
-            if not (d['verse_number'] == verse_number and d['position'] == position)
-        ]
+        Args:
+            work_id: ID de l'œuvre
+            witnesses: Liste des témoins
+            chapter_index: Index du chapitre
+            result: Nouvelle collation (dict de perform_collation, avec cache_key)
+            previous: Collation à laquelle les décisions se rapportaient, None
+                si inconnue (les décisions sont alors laissées en place, de
+                même si elles ont été rattachées depuis à une autre collation)
         
-        self._save(work_id, witnesses, data)
-        return len(data['chapters'][chapter_key]['decisions']) < original
+        Returns:
+            Dict {'moved', 'changed', 'stale'} : nombre de décisions de chaque cas
+        """
+        counts = {'moved': 0, 'changed': 0, 'stale': 0}
+        chapter_key = str(chapter_index)
+        conn = self._connect()
+        try:
+            with conn:
+                self._begin_write(conn)
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+                stored = conn.execute(
+                    "SELECT cache_key FROM chapter_collations WHERE config_key = ? AND chapter = ?",
+                    (config_key, chapter_key)
+                ).fetchone()
+                stored_key = stored['cache_key'] if stored else None
+                # Déjà rattachées par une requête concurrente (autre worker)
+                if stored_key == result['cache_key']:
+                    return counts
+                # Les décisions ne se rapportent plus à previous : pas de déplacement
+                if previous is not None and previous.get('cache_key') == stored_key:
+                    rows = conn.execute(
+                        """
+                        SELECT * FROM word_decisions
+                        WHERE config_key = ? AND chapter = ?
+                        ORDER BY rowid
+                        """,
+                        (config_key, chapter_key)
+                    ).fetchall()
+                    decisions = [self._row_to_decision(row) for row in rows]
+                    relocated, counts = _relocate_decisions(decisions, previous, result)
+                    if relocated is not None:
+                        conn.execute(
+                            "DELETE FROM word_decisions WHERE config_key = ? AND chapter = ?",
+                            (config_key, chapter_key)
+                        )
+                        for decision in relocated:
+                            self._upsert_decision(conn, config_key, chapter_key, decision)
+                conn.execute(
+                    """
+                    INSERT INTO chapter_collations VALUES (?, ?, ?)
+                    ON CONFLICT (config_key, chapter) DO UPDATE SET cache_key = excluded.cache_key
+                    """,
+                    (config_key, chapter_key, result['cache_key'])
+                )
+        finally:
+            conn.close()
+        return counts
     
     def get_configuration(self, work_id, witnesses):
         """
         Récupère la configuration (témoins, chapitres exclus) pour vérification.
         """
-        data = self._load(work_id, witnesses)
+        conn = self._connect()
+        try:
+            with conn:
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+            row = conn.execute(
+                "SELECT * FROM configurations WHERE config_key = ?", (config_key,)
+            ).fetchone()
+            has_decisions = conn.execute(
+                "SELECT 1 FROM word_decisions WHERE config_key = ? LIMIT 1", (config_key,)
+            ).fetchone() is not None
+        finally:
+            conn.close()
         return {
-            'witnesses': data.get('witnesses', []),
-            'excluded_chapters': data.get('excluded_chapters', {}),
-            'has_decisions': any(
-                len(ch.get('decisions', [])) > 0 
-                for ch in data.get('chapters', {}).values()
-            )
+            'witnesses': json.loads(row['witnesses']) if row else witnesses,
+            'excluded_chapters': json.loads(row['excluded_chapters']) if row else {},
+            'has_decisions': has_decisions
         }
     
     def count_all_decisions(self, work_id, witnesses):
@@ -361,11 +625,15 @@ class WordDecisionManager:
         Returns:
             Nombre total de décisions
         """
-        data = self._load(work_id, witnesses)
-        total = 0
-        for chapter in data.get('chapters', {}).values():
-            total += len(chapter.get('decisions', []))
-        return total
+        conn = self._connect()
+        try:
+            with conn:
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+            return conn.execute(
+                "SELECT COUNT(*) FROM word_decisions WHERE config_key = ?", (config_key,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
     
     def delete_all_decisions(self, work_id, witnesses):
         """
@@ -376,14 +644,175 @@ class WordDecisionManager:
             witnesses: Liste des témoins
             
         Returns:
-            True si le fichier a été supprimé
+            True si des décisions ont été supprimées
         """
+        config_key = self._get_config_key(work_id, witnesses)
+        conn = self._connect()
+        try:
+            with conn:
+                self._begin_write(conn)
+                deleted = conn.execute(
+                    "DELETE FROM configurations WHERE config_key = ?", (config_key,)
+                ).rowcount
+                conn.execute("DELETE FROM word_decisions WHERE config_key = ?", (config_key,))
+        finally:
+            conn.close()
+        
+        # Supprimer aussi l'ancien fichier JSON pour qu'il ne soit pas réimporté
         file_path = self._get_file(work_id, witnesses)
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
-                return True
+                deleted = True
             except Exception as e:
                 print(f"Erreur suppression {file_path}: {e}")
                 return False
-        return False
+        return bool(deleted)
+    
+    def export_json(self, work_id, witnesses):
+        """
+        Exporte toutes les décisions d'une configuration au format JSON
+        historique ({work_id}_witnesses_*.json).
+        
+        Args:
+            work_id: ID de l'œuvre
+            witnesses: Liste des témoins
+        
+        Returns:
+            Dict {work_id, witnesses, excluded_chapters, chapters, last_modified}
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                config_key = self._ensure_configuration(conn, work_id, witnesses)
+            config = conn.execute(
+                "SELECT * FROM configurations WHERE config_key = ?", (config_key,)
+            ).fetchone()
+            rows = conn.execute(
+                "SELECT * FROM word_decisions WHERE config_key = ? ORDER BY rowid",
+                (config_key,)
+            ).fetchall()
+        finally:
+            conn.close()
+        
+        chapters = {}
+        for row in rows:
+            chapters.setdefault(row['chapter'], {'decisions': []})['decisions'].append(
+                self._row_to_decision(row)
+            )
+        
+        return {
+            'work_id': work_id,
+            'witnesses': json.loads(config['witnesses']) if config else witnesses,
+            'excluded_chapters': json.loads(config['excluded_chapters']) if config else {},
+            'chapters': chapters,
+            'last_modified': config['last_modified'] if config else None
+        }
+
+
+def _position_words(result, position):
+    """Mots d'une position alignée, {nom du témoin: texte} ('∅' si absent)."""
+    return {
+        result['witnesses'][word['witness_index']]: '∅' if word['missing'] else word['text']
+        for word in position['words']
+    }
+
+
+def _find_position(decision, result, verse):
+    """Position du vers où se trouvent les mots de la décision (la même d'abord), ou None."""
+    expected = decision['words']
+    alignment = verse['word_alignment']
+    order = [decision['position']] + [i for i in range(len(alignment)) if i != decision['position']]
+    for index in order:
+        if index < len(alignment):
+            words = _position_words(result, alignment[index])
+            if all(words.get(name) == text for name, text in expected.items()):
+                return index
+    return None
+
+
+def _relocate_decisions(decisions, previous, result):
+    """
+    Nouvelles clés (vers, position) et context_change des décisions d'un
+    chapitre (voir WordDecisionManager.reconcile_chapter).
+    
+    Returns:
+        Tuple (décisions mises à jour dans le même ordre, ou None si rien ne
+        change ; dict {'moved', 'changed', 'stale'} des nombres de décisions)
+    """
+    current_verses = {verse['verse_number']: verse for verse in result['verses']}
+    
+    # Nouveau numéro de chaque vers : celui du vers de même contenu (empreinte
+    # unique dans les deux collations), sinon le décalage du dernier vers
+    # retrouvé avant lui
+    def by_hash(verses):
+        numbers = {}
+        for verse in verses:
+            numbers.setdefault(verse.get('content_hash'), []).append(verse['verse_number'])
+        return numbers
+    previous_numbers = by_hash(previous.get('verses', []))
+    current_numbers = by_hash(result['verses'])
+    new_numbers = {}
+    offset = 0
+    for verse in previous.get('verses', []):
+        content_hash = verse.get('content_hash')
+        unchanged = (content_hash is not None and len(previous_numbers[content_hash]) == 1
+                     and len(current_numbers.get(content_hash, ())) == 1)
+        if unchanged:
+            offset = current_numbers[content_hash][0] - verse['verse_number']
+        new_numbers[verse['verse_number']] = (verse['verse_number'] + offset, unchanged)
+    
+    updates = []
+    for decision in decisions:
+        update = {}
+        if decision['verse_number'] in new_numbers:
+            verse_number, unchanged = new_numbers[decision['verse_number']]
+            if unchanged:
+                if verse_number != decision['verse_number']:
+                    update = {'verse_number': verse_number, 'context_change': 'moved'}
+            else:
+                verse = current_verses.get(verse_number)
+                position = _find_position(decision, result, verse) if verse else None
+                if position is None:
+                    update = {'verse_number': verse_number, 'context_change': 'stale'}
+                else:
+                    update = {'verse_number': verse_number, 'position': position,
+                              'context_change': 'changed'}
+        updates.append(update)
+    
+    counts = {'moved': 0, 'changed': 0, 'stale': 0}
+    if not any(updates):
+        return None, counts
+    
+    # Conflits de clés : les décisions des vers inchangés (en place ou
+    # déplacés) sont prioritaires, puis celles restées en place, puis les
+    # décisions changed et stale. Une décision qui perd sa place n'est jamais
+    # supprimée : elle reste à son ancienne clé, ou à la première position
+    # libre du vers, avec context_change = 'stale'
+    keys = [(decision['verse_number'], decision['position']) for decision in decisions]
+
+    def rank(index):
+        decision, update = decisions[index], updates[index]
+        if update.get('context_change') == 'moved' or (
+                not update and new_numbers.get(decision['verse_number'], (None, False))[1]):
+            return 0
+        return {None: 1, 'changed': 2, 'stale': 3}[update.get('context_change')]
+
+    taken = set()
+    relocated = [None] * len(decisions)
+    for index in sorted(range(len(decisions)), key=rank):
+        key, update = keys[index], updates[index]
+        decision = {'context_change': None, **decisions[index], **update}
+        new_key = (decision['verse_number'], decision['position'])
+        if new_key in taken:
+            new_key, position = key, 0
+            while new_key in taken:
+                new_key = (decision['verse_number'], position)
+                position += 1
+            decision.update(verse_number=new_key[0], position=new_key[1], context_change='stale')
+            update = True
+        taken.add(new_key)
+        if update:
+            counts[decision['context_change']] += 1
+        relocated[index] = decision
+    return relocated, counts
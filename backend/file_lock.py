@@ -0,0 +1,114 @@
+"""
+Module de verrous inter-processus sur les fichiers de données.
+En production, plusieurs workers (processus, voir gunicorn.conf.py)
+partagent le dossier data/ : les cycles lecture-modification-écriture des
+fichiers JSON (works.json, décisions par vers, exclusions de chapitres)
+sont protégés par un verrou fcntl sur un fichier annexe {fichier}.lock,
+et les écritures sont atomiques (fichier temporaire puis renommage).
+Sans fcntl (Windows), le verrou ne protège que les threads du processus.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+
+
+class _PathLock:
+    """Verrou d'un fichier pour le processus : réentrant, tient le verrou fcntl."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.fd = None
+        self.depth = 0
+
+
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path):
+    with _path_locks_guard:
+        return _path_locks.setdefault(path, _PathLock())
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Verrou exclusif sur un fichier de données, entre threads et entre processus.
+    Réentrant dans un même thread.
+
+    Args:
+        path: Chemin du fichier protégé (le verrou porte sur {path}.lock)
+    """
+    entry = _path_lock(os.path.abspath(path))
+    with entry.lock:
+        if entry.depth == 0 and fcntl is not None:
+            fd = os.open(os.path.abspath(path) + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except Exception:
+                os.close(fd)
+                raise
+            entry.fd = fd
+        entry.depth += 1
+        try:
+            yield
+        finally:
+            entry.depth -= 1
+            if entry.depth == 0 and entry.fd is not None:
+                fcntl.flock(entry.fd, fcntl.LOCK_UN)
+                os.close(entry.fd)
+                entry.fd = None
+
+
+def write_atomic(path, data):
+    """
+    Écrit un fichier de façon atomique (fichier temporaire puis renommage) :
+    un lecteur voit l'ancienne ou la nouvelle version, jamais un fichier à
+    moitié écrit.
+
+    Args:
+        path: Chemin du fichier
+        data: Contenu (bytes), ou liste de morceaux écrits à la suite
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                f.write(data)
+            else:
+                f.writelines(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_atomic(path, data, compact=False):
+    """
+    Écrit un fichier JSON de façon atomique (voir write_atomic).
+
+    Args:
+        path: Chemin du fichier
+        data: Données sérialisables en JSON
+        compact: JSON sans indentation ni espaces (gros fichiers)
+    """
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+    write_atomic(path, text.encode('utf-8'))
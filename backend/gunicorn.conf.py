@@ -0,0 +1,40 @@
+"""
+Configuration Gunicorn du serveur de production.
+
+Usage (depuis la racine du projet) :
+    gunicorn -c backend/gunicorn.conf.py wsgi:app
+
+Variables d'environnement :
+    SERVER_BIND     adresse d'écoute (défaut 127.0.0.1:$FLASK_PORT)
+    SERVER_WORKERS  nombre de processus (défaut : nombre de cœurs)
+    SERVER_THREADS  threads par processus (défaut 4 ; flux /api/collate/stream et SSE)
+    SERVER_TIMEOUT  durée maximale d'une requête en secondes (défaut 300)
+
+L'application est chargée une fois avant le fork (preload_app) : les
+modules et tables partagés le sont en copie sur écriture. Les états
+partagés entre workers passent par le disque (voir file_lock.py et la
+base SQLite des décisions de mots). Chaque worker a son propre pool de
+processus d'alignement, créé à la première collation qui en a besoin.
+"""
+
+import os
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+chdir = BACKEND_DIR
+bind = os.environ.get('SERVER_BIND', f"127.0.0.1:{os.environ.get('FLASK_PORT', 5001)}")
+workers = int(os.environ.get('SERVER_WORKERS', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('SERVER_THREADS', 4))
+timeout = int(os.environ.get('SERVER_TIMEOUT', 300))
+preload_app = True
+
+# Les workers se partagent les cœurs : sauf réglage explicite, le pool
+# d'alignement de chaque worker n'en prend que sa part
+os.environ.setdefault('COLLATION_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+
+def post_fork(server, worker):
+    """Un pool de processus créé avant le fork ne doit pas être partagé : il est recréé."""
+    import collate
+    collate.shutdown_executor()
@@ -0,0 +1,372 @@
+"""
+Module de gestion des tâches de collation en arrière-plan.
+Permet de collationner tous les chapitres d'une œuvre (« collate-all »)
+et de suivre la progression (statut, flux Server-Sent Events).
+
+L'état des tâches est stocké en SQLite, partagé par tous les workers du
+serveur (voir gunicorn.conf.py) : une tâche peut être suivie ou annulée
+depuis n'importe lequel.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from collate import perform_collation
+from collation_queue import pid_alive
+from config import COLLATE_ALL_CONCURRENCY, JOBS_DB, JOBS_HISTORY_SIZE, JOBS_POLL_INTERVAL
+
+# Statuts d'une tâche terminée
+FINISHED_STATUSES = ('done', 'error', 'cancelled')
+
+
+def compute_chapter_mapping(witness_ids, chapter_counts, excluded_chapters):
+    """
+    Calcule la correspondance entre chapitres normalisés et chapitres originaux.
+    Même règle que l'interface : le i-ème chapitre non exclu de chaque témoin.
+
+    Args:
+        witness_ids: Liste des IDs de témoins
+        chapter_counts: Dict {witness_id: nombre de chapitres}
+        excluded_chapters: Dict {witness_id: [index de chapitres exclus]}
+
+    Returns:
+        Liste de dicts {index, mapping: {witness_id: index_original}}
+    """
+    active = {}
+    for wit_id in witness_ids:
+        excluded = set(excluded_chapters.get(wit_id, []))
+        active[wit_id] = [i for i in range(chapter_counts.get(wit_id, 0)) if i not in excluded]
+
+    num_chapters = min((len(chapters) for chapters in active.values()), default=0)
+    return [
+        {'index': i, 'mapping': {wit_id: active[wit_id][i] for wit_id in witness_ids}}
+        for i in range(num_chapters)
+    ]
+
+
+class JobManager:
+    """
+    Lance et suit les tâches de collation en arrière-plan.
+
+    Une tâche s'exécute dans un thread du processus qui l'a lancée ; son
+    état (une ligne SQLite, mode WAL) est mis à jour à chaque chapitre.
+    Une tâche dont le processus a disparu (worker redémarré) passe en erreur.
+    """
+
+    def __init__(self, db_path=JOBS_DB, concurrency=COLLATE_ALL_CONCURRENCY,
+                 history_size=JOBS_HISTORY_SIZE, poll_interval=JOBS_POLL_INTERVAL):
+        """
+        Initialise le gestionnaire.
+
+        Args:
+            db_path: Chemin de la base SQLite
+            concurrency: Nombre de chapitres collationnés simultanément
+            history_size: Nombre de tâches terminées conservées
+            poll_interval: Délai entre deux lectures de l'état d'une tâche
+                suivie par iter_events (secondes)
+        """
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.history_size = history_size
+        self.poll_interval = poll_interval
+        # Réveille les abonnés du processus sans attendre poll_interval
+        self._changed = threading.Condition()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._init_db()
+
+    def _connect(self):
+        """Ouvre une connexion SQLite (une par opération, sûre entre threads et processus)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Crée le schéma et active le mode WAL."""
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS collate_all_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    work_id TEXT NOT NULL,
+                    witness_ids TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    total INTEGER NOT NULL,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    cached INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    errors TEXT NOT NULL DEFAULT '[]',
+                    cancelled INTEGER NOT NULL DEFAULT 0,
+                    worker_pid INTEGER,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    finished_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS collate_all_jobs_status ON collate_all_jobs (status, created_at);
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row):
+        """Convertit une ligne SQLite en état de tâche (JSON de l'API)."""
+        total = row['total']
+        return {
+            'job_id': row['job_id'],
+            'work_id': row['work_id'],
+            'witness_ids': json.loads(row['witness_ids']),
+            'status': row['status'],
+            'total': total,
+            'completed': row['completed'],
+            'cached': row['cached'],
+            'failed': row['failed'],
+            'progress': round(row['completed'] / total, 3) if total else 1.0,
+            'errors': json.loads(row['errors']),
+            'created_at': row['created_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def start_collate_all(self, work_id, witness_ids, witness_files, witness_names, chapters, engine=None):
+        """
+        Lance la collation de tous les chapitres en arrière-plan.
+        Les résultats sont écrits dans le cache des collations.
+
+        Args:
+            work_id: ID de l'œuvre
+            witness_ids: Liste des IDs de témoins
+            witness_files: Liste des fichiers des témoins (même ordre)
+            witness_names: Liste des noms des témoins (même ordre)
+            chapters: Liste de {index, mapping} (voir compute_chapter_mapping)
+            engine: Moteur d'alignement (défaut de perform_collation si None)
+
+        Returns:
+            Dict d'état de la tâche créée
+        """
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._recover(conn)
+                conn.execute(
+                    """
+                    INSERT INTO collate_all_jobs (job_id, work_id, witness_ids, status, total,
+                                                  worker_pid, created_at)
+                    VALUES (?, ?, ?, 'pending', ?, ?, ?)
+                    """,
+                    (job_id, work_id, json.dumps(witness_ids), len(chapters), os.getpid(),
+                     datetime.now().isoformat())
+                )
+                conn.execute(
+                    """
+                    DELETE FROM collate_all_jobs WHERE job_id IN (
+                        SELECT job_id FROM collate_all_jobs WHERE status IN ('done', 'error', 'cancelled')
+                        ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.history_size,)
+                )
+        finally:
+            conn.close()
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(job_id, work_id, chapters, witness_ids, witness_files, witness_names, engine),
+            daemon=True
+        )
+        thread.start()
+        return self.get(job_id)
+
+    def _read(self, job_id):
+        """Ligne SQLite d'une tâche (une tâche orpheline est d'abord passée en erreur), ou None."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM collate_all_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row and row['status'] not in FINISHED_STATUSES and not pid_alive(row['worker_pid']):
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._recover(conn)
+                row = conn.execute(
+                    "SELECT * FROM collate_all_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+        finally:
+            conn.close()
+        return row
+
+    def get(self, job_id):
+        """Retourne l'état d'une tâche, ou None."""
+        row = self._read(job_id)
+        return self._row_to_job(row) if row else None
+
+    def cancel(self, job_id):
+        """
+        Demande l'arrêt d'une tâche (les chapitres en cours se terminent).
+
+        Returns:
+            True si la tâche existe et n'était pas terminée
+        """
+        if self._read(job_id) is None:
+            return False
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    """
+                    UPDATE collate_all_jobs SET cancelled = 1, version = version + 1
+                    WHERE job_id = ? AND status IN ('pending', 'running')
+                    """,
+                    (job_id,)
+                )
+        finally:
+            conn.close()
+        self._notify()
+        return cursor.rowcount > 0
+
+    def iter_events(self, job_id, heartbeat=15.0):
+        """
+        Génère les états successifs d'une tâche jusqu'à sa fin.
+        Produit None toutes les `heartbeat` secondes sans changement
+        (permet d'envoyer un commentaire SSE pour garder la connexion).
+
+        Args:
+            job_id: ID de la tâche suivie
+            heartbeat: Délai maximal entre deux éléments produits
+
+        Yields:
+            Dict d'état (voir get) ou None
+        """
+        last_version = None
+        last_yield = time.monotonic()
+        while True:
+            row = self._read(job_id)
+            if row is None:
+                return
+            if row['version'] != last_version:
+                last_version = row['version']
+                last_yield = time.monotonic()
+                yield self._row_to_job(row)
+                if row['status'] in FINISHED_STATUSES:
+                    return
+            elif time.monotonic() - last_yield >= heartbeat:
+                last_yield = time.monotonic()
+                yield None
+            with self._changed:
+                self._changed.wait(self.poll_interval)
+
+    def _notify(self):
+        """Réveille les abonnés du processus."""
+        with self._changed:
+            self._changed.notify_all()
+
+    def _update(self, job_id, sql, params=()):
+        """Modifie une tâche (sql : affectations de l'UPDATE) et incrémente sa version."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"UPDATE collate_all_jobs SET {sql}, version = version + 1 WHERE job_id = ?",
+                    (*params, job_id)
+                )
+        finally:
+            conn.close()
+        self._notify()
+
+    def _add_error(self, job_id, error, failed=0):
+        """Ajoute une erreur à la liste des erreurs d'une tâche (transaction d'écriture)."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT errors FROM collate_all_jobs WHERE job_id = ?", (job_id,)
+                ).fetchone()
+                errors = json.loads(row['errors']) + [error]
+                conn.execute(
+                    """
+                    UPDATE collate_all_jobs SET errors = ?, completed = completed + ?,
+                           failed = failed + ?, version = version + 1
+                    WHERE job_id = ?
+                    """,
+                    (json.dumps(errors, ensure_ascii=False), failed, failed, job_id)
+                )
+        finally:
+            conn.close()
+        self._notify()
+
+    def _is_cancelled(self, job_id):
+        """Indique si l'arrêt d'une tâche a été demandé (depuis n'importe quel processus)."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT cancelled FROM collate_all_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return bool(row and row['cancelled'])
+
+    def _run(self, job_id, work_id, chapters, witness_ids, witness_files, witness_names, engine):
+        """Exécute une tâche (thread dédié)."""
+        self._update(job_id, "status = 'running'")
+
+        def collate_chapter(chapter):
+            if self._is_cancelled(job_id):
+                return
+            chapter_indices = [chapter['mapping'][wit_id] for wit_id in witness_ids]
+            try:
+                result = perform_collation(witness_files, witness_names, chapter_indices,
+                                           engine=engine, work_id=work_id)
+                if 'error' in result:
+                    raise RuntimeError(result['error'])
+                cached = int(result.get('timing', {}).get('cache') == 'hit')
+                self._update(job_id, "completed = completed + 1, cached = cached + ?", (cached,))
+            except Exception as e:
+                self._add_error(job_id, {'chapter': chapter['index'], 'message': str(e)}, failed=1)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                list(executor.map(collate_chapter, chapters))
+            status = 'cancelled' if self._is_cancelled(job_id) else 'done'
+        except Exception as e:
+            self._add_error(job_id, {'chapter': None, 'message': str(e)})
+            status = 'error'
+
+        self._update(job_id, "status = ?, finished_at = ?", (status, datetime.now().isoformat()))
+
+    def _recover(self, conn):
+        """
+        Passe en erreur les tâches non terminées des processus disparus
+        (dans la transaction d'écriture de l'appelant).
+        """
+        rows = conn.execute(
+            """
+            SELECT job_id, worker_pid, errors FROM collate_all_jobs
+            WHERE status IN ('pending', 'running')
+            """
+        ).fetchall()
+        for row in rows:
+            if pid_alive(row['worker_pid']):
+                continue
+            errors = json.loads(row['errors']) + [
+                {'chapter': None, 'message': "Processus de la tâche interrompu"}
+            ]
+            conn.execute(
+                """
+                UPDATE collate_all_jobs SET status = 'error', errors = ?, finished_at = ?,
+                       version = version + 1
+                WHERE job_id = ?
+                """,
+                (json.dumps(errors, ensure_ascii=False), datetime.now().isoformat(), row['job_id'])
+            )
+
+
+# Instance partagée par le processus
+job_manager = JobManager()
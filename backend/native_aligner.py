@@ -0,0 +1,247 @@
+"""
+Module d'alignement natif des mots d'un vers.
+Réimplémentation compacte de l'algorithme de CollateX (EditGraphAligner,
+sans détection des transpositions) pour les vers courts : les témoins sont
+ajoutés un à un à un graphe de variantes, chaque témoin étant aligné sur
+les rangs du graphe par programmation dynamique (Needleman-Wunsch, mêmes
+scores et mêmes priorités que CollateX), en comparant les identifiants
+entiers des formes normalisées.
+
+Le remplissage de la table de scores est vectorisé avec NumPy (une ligne
+par opération) pour les grandes tables quand NumPy est installé ; pour un
+vers ordinaire (quelques centaines de cellules), la boucle en Python pur
+est plus rapide que le coût fixe des appels NumPy.
+Le résultat a la forme de la table JSON de CollateX (table[témoin][colonne]).
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Taille de table (tokens × rangs) à partir de laquelle NumPy est plus rapide
+# que la boucle en Python pur (mesuré : ~1300 cellules)
+NUMPY_MIN_CELLS = 1024
+
+# Déplacements dans la table de scores (dans l'ordre de priorité de CollateX)
+_DIAGONAL, _LEFT, _UP = 0, 1, 2
+
+
+def _fill_moves_python(match):
+    """
+    Remplit la table de scores et retourne le déplacement retenu pour chaque cellule.
+
+    Args:
+        match: Matrice (liste de listes de booléens) token du témoin × rang du graphe
+
+    Returns:
+        Matrice (lignes + 1) × (rangs + 1) des déplacements
+    """
+    rows = len(match)
+    ranks = len(match[0]) if rows else 0
+    previous = [-x for x in range(ranks + 1)]
+    moves = [[_LEFT] * (ranks + 1)]
+    no_match = [False] * ranks
+
+    for y in range(1, rows + 1):
+        hits = match[y - 1]
+        hits_above = match[y - 2] if y > 1 else no_match
+        row = [-y]
+        row_moves = [_UP]
+        for x in range(1, ranks + 1):
+            hit = hits[x - 1]
+            diagonal = previous[x - 1] + (1 if hit else -1)
+            left = row[x - 1] - 1
+            # CollateX compte aussi comme appariement le passage vertical
+            # entre deux tokens qui correspondent au même rang
+            up = previous[x] + (1 if hit and hits_above[x - 1] else -1)
+            if diagonal >= left and diagonal >= up:
+                row.append(diagonal)
+                row_moves.append(_DIAGONAL)
+            elif left >= up:
+                row.append(left)
+                row_moves.append(_LEFT)
+            else:
+                row.append(up)
+                row_moves.append(_UP)
+        previous = row
+        moves.append(row_moves)
+    return moves
+
+
+def _fill_moves_numpy(match):
+    """
+    Comme _fill_moves_python, une ligne de la table à la fois.
+
+    Dans une ligne, score[x] = max(a[x], score[x - 1] - 1) où a[x] est le
+    meilleur score diagonal ou vertical : c'est un maximum cumulé de
+    a[k] + k, décalé de -x (numpy.maximum.accumulate). Les déplacements
+    sont ensuite déduits de toute la table en une fois.
+    """
+    match = numpy.asarray(match, dtype=bool)
+    rows, ranks = match.shape
+    positions = numpy.arange(ranks + 1)
+    diagonal_gain = numpy.where(match, 1, -1)
+    up_gain = numpy.full((rows, ranks), -1)
+    up_gain[1:][match[1:] & match[:-1]] = 1
+
+    scores = numpy.empty((rows + 1, ranks + 1), dtype=positions.dtype)
+    scores[0] = -positions
+    scores[:, 0] = -numpy.arange(rows + 1)
+    best = numpy.empty(ranks + 1, dtype=positions.dtype)
+    for y in range(1, rows + 1):
+        previous = scores[y - 1]
+        best[0] = -y
+        numpy.maximum(previous[:-1] + diagonal_gain[y - 1], previous[1:] + up_gain[y - 1],
+                      out=best[1:])
+        best += positions
+        numpy.maximum.accumulate(best, out=scores[y])
+        scores[y] -= positions
+
+    diagonal = scores[:-1, :-1] + diagonal_gain
+    up = scores[:-1, 1:] + up_gain
+    left = scores[1:, :-1] - 1
+    moves = numpy.full((rows + 1, ranks + 1), _LEFT, dtype=numpy.int8)
+    moves[1:, 0] = _UP
+    moves[1:, 1:] = numpy.where((diagonal >= left) & (diagonal >= up), _DIAGONAL,
+                                numpy.where(left >= up, _LEFT, _UP))
+    return moves.tolist()
+
+
+def fill_moves(match):
+    """Table des déplacements (NumPy pour les grandes tables s'il est disponible)."""
+    if numpy is not None and match and len(match) * len(match[0]) >= NUMPY_MIN_CELLS:
+        return _fill_moves_numpy(match)
+    return _fill_moves_python(match)
+
+
+class _VariantGraph:
+    """Graphe de variantes minimal : sommets (forme, tokens par témoin) et arcs."""
+
+    def __init__(self):
+        # Le sommet 0 est le début du graphe
+        self.keys = [None]
+        self.tokens = [{}]
+        self.successors = [set()]
+
+    def add_vertex(self, key):
+        self.keys.append(key)
+        self.tokens.append({})
+        self.successors.append(set())
+        return len(self.keys) - 1
+
+    def ranks(self):
+        """Rang de chaque sommet : plus long chemin depuis le début (tri topologique)."""
+        in_degree = [0] * len(self.keys)
+        for successors in self.successors:
+            for vertex in successors:
+                in_degree[vertex] += 1
+        ranks = [0] * len(self.keys)
+        pending = [0]
+        while pending:
+            vertex = pending.pop()
+            for successor in self.successors[vertex]:
+                ranks[successor] = max(ranks[successor], ranks[vertex] + 1)
+                in_degree[successor] -= 1
+                if not in_degree[successor]:
+                    pending.append(successor)
+        return ranks
+
+    def merge(self, witness_index, tokens, keys, aligned):
+        """Ajoute le chemin d'un témoin (aligned : position du token → sommet existant)."""
+        last = 0
+        for position, (token, key) in enumerate(zip(tokens, keys)):
+            vertex = aligned.get(position)
+            if vertex is None:
+                vertex = self.add_vertex(key)
+            self.tokens[vertex][witness_index] = token
+            self.successors[last].add(vertex)
+            last = vertex
+
+
+def _align_witness(graph, keys):
+    """
+    Aligne un témoin sur le graphe.
+
+    Args:
+        graph: _VariantGraph des témoins précédents
+        keys: Clés de comparaison des tokens du témoin
+
+    Returns:
+        Dict {position du token: sommet apparié}
+    """
+    ranks = graph.ranks()
+    rank_count = max(ranks)
+    if not keys or not rank_count:
+        return {}
+
+    # Sommets candidats par forme, puis sommet apparié par (token, rang)
+    vertices_by_key = {}
+    for vertex in range(1, len(graph.keys)):
+        vertices_by_key.setdefault(graph.keys[vertex], []).append(vertex)
+    match_vertex = [[None] * rank_count for _ in keys]
+    for y, key in enumerate(keys):
+        for vertex in vertices_by_key.get(key, ()):
+            cell = match_vertex[y]
+            if cell[ranks[vertex] - 1] is None:
+                cell[ranks[vertex] - 1] = vertex
+
+    match = [[vertex is not None for vertex in row] for row in match_vertex]
+    moves = fill_moves(match)
+
+    # Remontée depuis la dernière cellule ; un sommet n'est apparié qu'une fois
+    aligned = {}
+    matched = set()
+    y, x = len(keys), rank_count
+    while y or x:
+        move = moves[y][x]
+        if move == _DIAGONAL:
+            vertex = match_vertex[y - 1][x - 1]
+            y, x = y - 1, x - 1
+        elif move == _LEFT:
+            vertex = None
+            x -= 1
+        else:
+            vertex = None
+            if x and y > 1 and match[y - 2][x - 1]:
+                vertex = match_vertex[y - 1][x - 1]
+            y -= 1
+        if vertex is not None and vertex not in matched:
+            aligned[y] = vertex
+            matched.add(vertex)
+    return aligned
+
+
+def form_key(token):
+    """
+    Clé de comparaison d'un token : identifiant entier de sa forme
+    normalisée s'il est connu (voir vocabulary.py), sinon la forme elle-même.
+    Partagée avec collate.py (variantes, alignement linéaire).
+    """
+    return token['i'] if 'i' in token else token['n']
+
+
+def align_tokens(token_lists):
+    """
+    Aligne les tokens de plusieurs témoins, comme collatex.collate(..., segmentation=False).
+
+    Args:
+        token_lists: Liste (un élément par témoin) de tokens {"t", "n"} (et "i")
+
+    Returns:
+        Table table[témoin][colonne] : liste d'un token, ou None si le témoin
+        n'a pas de mot à cette position
+    """
+    graph = _VariantGraph()
+    for witness_index, tokens in enumerate(token_lists):
+        keys = [form_key(token) for token in tokens]
+        aligned = _align_witness(graph, keys) if witness_index else {}
+        graph.merge(witness_index, tokens, keys, aligned)
+
+    ranks = graph.ranks()
+    rank_count = max(ranks)
+    table = [[None] * rank_count for _ in token_lists]
+    for vertex in range(1, len(graph.keys)):
+        for witness_index, token in graph.tokens[vertex].items():
+            table[witness_index][ranks[vertex] - 1] = [token]
+    return table
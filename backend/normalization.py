@@ -0,0 +1,122 @@
+"""
+Module de normalisation orthographique.
+Moteur unique utilisé par collate.py et collation.py : motifs précompilés,
+tables str.translate et cache borné des mots déjà normalisés.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+from config import NORMALIZATION_CACHE_SIZE
+
+# Version des règles de normalisation.
+# À incrémenter à chaque modification des règles ci-dessous : elle sert à
+# invalider tout ce qui a été calculé à partir des formes normalisées.
+NORMALIZATION_VERSION = 1
+
+# Ponctuation et caractères spéciaux qui ne sont pas des tokens
+PUNCTUATION = '/.,;:!?-–—\'"()[]{}…·*°⸫⁊¶§†‡⸝⸞‹›«»„‛‟⸗'
+
+# Tables de traduction précalculées
+_DELETE_PUNCTUATION = str.maketrans('', '', PUNCTUATION)
+_PUNCTUATION_TO_SPACE = str.maketrans(PUNCTUATION, ' ' * len(PUNCTUATION))
+_Y_TO_I = str.maketrans('y', 'i')
+
+# Motifs précompilés
+_DOUBLE_LETTERS = re.compile(r'(.)\1')
+_WORD = re.compile(r'\w+')
+_SPACES = re.compile(r'\s+')
+
+
+def nfc(text):
+    """
+    Normalise Unicode en NFC (fusion des diacritiques combinants).
+    Le texte ASCII est retourné tel quel, sans passer par unicodedata.
+    """
+    if text.isascii():
+        return text
+    return unicodedata.normalize('NFC', text)
+
+
+def _apply_rules(text):
+    """Applique les règles CreNum (sans cache)."""
+    text = nfc(text).translate(_DELETE_PUNCTUATION).lower()
+    # Lettres doubles -> simples
+    text = _DOUBLE_LETTERS.sub(r'\1', text)
+    # Y -> I
+    text = text.translate(_Y_TO_I)
+    # ict/ist -> it, tz -> ts
+    return text.replace('ict', 'it').replace('ist', 'it').replace('tz', 'ts')
+
+
+@lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def normalize_word(word):
+    """
+    Normalise un mot isolé, avec mémoïsation.
+    Le vocabulaire médiéval étant très répétitif, la plupart des appels
+    sont servis par le cache.
+
+    Args:
+        word: Mot original
+
+    Returns:
+        Mot normalisé
+    """
+    return _apply_rules(word)
+
+
+def normalize_text(text):
+    """
+    Normalise le texte selon les règles du projet CreNum.
+
+    Règles de normalisation :
+    - Minuscules
+    - Lettres doubles -> simples (ss->s, ff->f, etc.)
+    - Y -> I
+    - ict/ist -> it
+    - tz -> ts
+    - Supprime "/" (ne pas considérer comme token)
+
+    Les mots isolés passent par le cache de normalize_word ; les textes
+    de plusieurs mots (vers entiers) sont normalisés directement.
+
+    Args:
+        text: Texte à normaliser
+
+    Returns:
+        Texte normalisé
+    """
+    if not text:
+        return ""
+    if ' ' in text:
+        return _apply_rules(text)
+    return normalize_word(text)
+
+
+def tokenize_words(text):
+    """
+    Découpe un texte en mots (\\w+) après normalisation NFC.
+
+    Args:
+        text: Texte original
+
+    Returns:
+        Liste des mots
+    """
+    if not text:
+        return []
+    return _WORD.findall(nfc(text))
+
+
+def strip_punctuation(text):
+    """
+    Remplace la ponctuation par des espaces et réduit les espaces multiples.
+
+    Args:
+        text: Texte original
+
+    Returns:
+        Texte sans ponctuation
+    """
+    return _SPACES.sub(' ', text.translate(_PUNCTUATION_TO_SPACE)).strip()
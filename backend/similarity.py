@@ -0,0 +1,168 @@
+"""
+Module de calcul de similarité entre textes.
+Ratio de Levenshtein (distance d'insertion/suppression normalisée), calculé
+par lots : toutes les paires de vers d'un chapitre en un seul passage.
+
+Utilise rapidfuzz quand il est installé (avec NumPy pour les calculs
+vectorisés), sinon un calcul exact en Python pur (LCS bit-parallèle).
+"""
+
+from itertools import combinations
+
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:
+    Indel = None
+
+try:
+    # process.cdist / cpdist retournent des tableaux NumPy
+    import numpy  # noqa: F401
+    from rapidfuzz import process
+except ImportError:
+    process = None
+
+
+def _lcs_length(text1, text2):
+    """
+    Longueur de la plus longue sous-séquence commune.
+    Algorithme bit-parallèle (Allison-Dix / Hyyrö) sur entiers Python :
+    O(len(text1) × len(text2) / taille de mot machine).
+    """
+    if len(text1) < len(text2):
+        text1, text2 = text2, text1
+    if not text2:
+        return 0
+
+    masks = {}
+    for i, char in enumerate(text2):
+        masks[char] = masks.get(char, 0) | (1 << i)
+
+    full = (1 << len(text2)) - 1
+    row = full
+    for char in text1:
+        matches = row & masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & full
+
+    return len(text2) - bin(row).count('1')
+
+
+def _python_ratio(text1, text2):
+    """Ratio de Levenshtein (Indel) en Python pur, identique à celui de rapidfuzz."""
+    total = len(text1) + len(text2)
+    if total == 0:
+        return 1.0
+    return 2 * _lcs_length(text1, text2) / total
+
+
+_ratio = Indel.normalized_similarity if Indel is not None else _python_ratio
+
+
+def similarity_ratio(text1, text2):
+    """
+    Calcule la similarité entre deux textes (ratio de Levenshtein).
+
+    Args:
+        text1: Premier texte
+        text2: Deuxième texte
+
+    Returns:
+        Score de similarité entre 0 et 1 (arrondi à 3 décimales)
+    """
+    return round(_ratio(text1, text2), 3)
+
+
+def batch_similarities(pairs):
+    """
+    Calcule la similarité de chaque paire de textes, en un seul passage.
+
+    Args:
+        pairs: Liste de tuples (texte1, texte2)
+
+    Returns:
+        Liste des scores (arrondis à 3 décimales), dans l'ordre des paires
+    """
+    if not pairs:
+        return []
+    if process is not None:
+        left, right = zip(*pairs)
+        scores = process.cpdist(left, right, scorer=Indel.normalized_similarity, workers=1)
+        return [round(float(score), 3) for score in scores]
+    return [round(_ratio(text1, text2), 3) for text1, text2 in pairs]
+
+
+def verse_similarities(verse_texts):
+    """
+    Calcule les similarités entre témoins pour tous les vers d'un chapitre.
+    Seules les paires dont les deux textes sont non vides sont calculées.
+
+    Args:
+        verse_texts: Liste (un élément par vers) de listes de textes (un par témoin)
+
+    Returns:
+        Liste (un élément par vers) de listes [('i-j', score), ...]
+    """
+    requests = []
+    for verse_idx, texts in enumerate(verse_texts):
+        for i, j in combinations(range(len(texts)), 2):
+            if texts[i] and texts[j]:
+                requests.append((verse_idx, f'{i}-{j}', texts[i], texts[j]))
+
+    scores = batch_similarities([(text1, text2) for _, _, text1, text2 in requests])
+
+    similarities = [[] for _ in verse_texts]
+    for (verse_idx, pair, _, _), score in zip(requests, scores):
+        similarities[verse_idx].append((pair, score))
+    return similarities
+
+
+def similarity_matrix(similarities, size):
+    """
+    Matrice N×N des similarités moyennes entre témoins, à partir des
+    similarités par vers (verse_similarities) : moyenne sur les vers où
+    les deux témoins ont un texte.
+
+    Args:
+        similarities: Liste (un élément par vers) de listes [('i-j', score), ...]
+        size: Nombre de témoins
+
+    Returns:
+        Matrice N×N (liste de listes), diagonale à 1.0 ; None pour une
+        paire de témoins sans aucun vers commun
+    """
+    totals = [[0.0] * size for _ in range(size)]
+    counts = [[0] * size for _ in range(size)]
+    for verse in similarities:
+        for pair, score in verse:
+            i, j = map(int, pair.split('-'))
+            totals[i][j] += score
+            counts[i][j] += 1
+
+    matrix = [[1.0] * size for _ in range(size)]
+    for i, j in combinations(range(size), 2):
+        mean = round(totals[i][j] / counts[i][j], 3) if counts[i][j] else None
+        matrix[i][j] = matrix[j][i] = mean
+    return matrix
+
+
+def witness_distance_matrix(texts):
+    """
+    Matrice de distances entre témoins (1 - similarité), par exemple sur le
+    texte normalisé complet d'un chapitre pour chaque témoin.
+
+    Args:
+        texts: Liste de textes (un par témoin)
+
+    Returns:
+        Matrice N×N (liste de listes), diagonale nulle
+    """
+    size = len(texts)
+    if process is not None:
+        matrix = process.cdist(texts, texts, scorer=Indel.normalized_similarity, workers=1)
+        return [[0.0 if i == j else round(1 - float(matrix[i][j]), 3) for j in range(size)]
+                for i in range(size)]
+
+    distances = [[0.0] * size for _ in range(size)]
+    for i, j in combinations(range(size), 2):
+        distance = round(1 - _ratio(texts[i], texts[j]), 3)
+        distances[i][j] = distances[j][i] = distance
+    return distances
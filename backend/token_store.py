@@ -0,0 +1,298 @@
+"""
+Module des tokens pré-calculés des témoins.
+À l'ajout d'un témoin, chaque vers est normalisé et tokenisé une fois pour
+toutes : texte normalisé, tokens (forme "t" et forme normalisée "n") et
+identifiants entiers des formes normalisées sont écrits dans un fichier
+annexe ({témoin}.tokens). La collation n'a plus qu'à assembler ces
+tableaux pour CollateX.
+
+Le fichier est reconstruit si le témoin change (mtime, taille), si
+TOKEN_STORE_VERSION change ou si les règles de normalisation changent
+(NORMALIZATION_VERSION).
+"""
+
+import os
+import threading
+from collections import Counter
+
+from columnar import TERMINATOR, decode_strings, int_column, read_columnar, write_columnar
+from normalization import NORMALIZATION_VERSION, normalize_text, normalize_word, tokenize_words
+from witness_reader import iter_chapters
+
+# Version du format des tokens.
+# À incrémenter quand la structure écrite par build_token_store change.
+TOKEN_STORE_VERSION = 1
+
+TOKENS_SUFFIX = '.tokens'
+
+_MAGIC = b'CRNT'
+
+# Colonnes d'entiers :
+# - chapter_starts : premier vers de chaque chapitre (n + 1 bornes)
+# - chapter_text_offsets : bornes des textes normalisés de chaque chapitre
+# - verse_token_starts : premier token de chaque vers (n + 1 bornes)
+# - tokens : identifiant de la forme "t" de chaque token
+# - form_normalized : identifiant de la forme normalisée de chaque forme "t"
+_INT_COLUMNS = ('chapter_starts', 'chapter_text_offsets', 'verse_token_starts',
+                'tokens', 'form_normalized')
+
+
+def tokens_path(witness_file):
+    """
+    Retourne le chemin du fichier de tokens d'un témoin.
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+
+    Returns:
+        Chemin du fichier annexe (témoin.json → témoin.tokens)
+    """
+    base, ext = os.path.splitext(witness_file)
+    if ext.lower() != '.json':
+        base = witness_file
+    return base + TOKENS_SUFFIX
+
+
+def tokenize_verse(text):
+    """
+    Normalise et tokenise le texte d'un vers (même traitement que la collation).
+
+    Args:
+        text: Texte original du vers
+
+    Returns:
+        Tuple (texte normalisé, liste de paires (t, n))
+    """
+    text_normalized = normalize_text(text)
+    return text_normalized, [(word, normalize_word(word)) for word in tokenize_words(text_normalized)]
+
+
+def build_token_store(witness_file, output_file=None):
+    """
+    Normalise et tokenise tous les vers d'un témoin et écrit le fichier de tokens.
+
+    Les vers sont ceux qui ont un texte, dans l'ordre du fichier (mêmes
+    index que witness_store.prepare_verses et le format compilé).
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+        output_file: Fichier à écrire (défaut : tokens_path(witness_file))
+
+    Returns:
+        Chemin du fichier écrit
+    """
+    output_file = output_file or tokens_path(witness_file)
+    stat = os.stat(witness_file)
+
+    forms, form_ids = [], {}
+    normalized, normalized_ids = [], {}
+    columns = {name: int_column() for name in _INT_COLUMNS}
+    texts = bytearray()
+    for name in ('chapter_starts', 'chapter_text_offsets', 'verse_token_starts'):
+        columns[name].append(0)
+
+    verse_count = 0
+    with open(witness_file, 'rb') as f:
+        for chapter, _, _ in iter_chapters(f):
+            for item in chapter if isinstance(chapter, list) else []:
+                if not isinstance(item, dict) or 'text' not in item:
+                    continue
+                text_normalized, tokens = tokenize_verse(item['text'])
+                if TERMINATOR in text_normalized:
+                    raise ValueError(f"Vers non tokenisable : {item}")
+                texts += (text_normalized + TERMINATOR).encode('utf-8')
+                for word, norm in tokens:
+                    form_id = form_ids.get(word)
+                    if form_id is None:
+                        form_id = form_ids[word] = len(forms)
+                        forms.append(word)
+                        if norm not in normalized_ids:
+                            normalized_ids[norm] = len(normalized)
+                            normalized.append(norm)
+                        columns['form_normalized'].append(normalized_ids[norm])
+                    columns['tokens'].append(form_id)
+                columns['verse_token_starts'].append(len(columns['tokens']))
+                verse_count += 1
+            columns['chapter_starts'].append(verse_count)
+            columns['chapter_text_offsets'].append(len(texts))
+
+    columns['texts_normalized'] = texts
+    write_columnar(output_file, _MAGIC, TOKEN_STORE_VERSION, {
+        'source': {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size},
+        'normalization_version': NORMALIZATION_VERSION,
+        'chapters': len(columns['chapter_starts']) - 1,
+        'verses': verse_count,
+        'forms': forms,
+        'normalized': normalized
+    }, columns)
+    return output_file
+
+
+class WitnessTokens:
+    """Tokens pré-calculés d'un témoin, projetés en mémoire (lecture seule)."""
+
+    def __init__(self, path):
+        """
+        Ouvre un fichier de tokens.
+
+        Args:
+            path: Chemin du fichier .tokens
+
+        Raises:
+            ValueError: si le fichier n'est pas un fichier de tokens de la version courante
+        """
+        header, self._columns, self._mmap = read_columnar(path, _MAGIC, TOKEN_STORE_VERSION)
+        self.source = header['source']
+        self.normalization_version = header['normalization_version']
+        self.chapter_count = header['chapters']
+        self.verse_count = header['verses']
+        # Formes normalisées, indexées par leur identifiant
+        self.normalized = header['normalized']
+        # Paires (t, n) et identifiant de n, indexées par identifiant de forme "t"
+        self._form_tokens = [(form, self.normalized[n_id])
+                             for form, n_id in zip(header['forms'], self._columns['form_normalized'])]
+        self._form_normalized = self._columns['form_normalized'].tolist()
+
+    def normalized_counts(self):
+        """
+        Nombre d'occurrences de chaque forme normalisée dans tout le témoin.
+
+        Returns:
+            Liste de comptes, indexée par identifiant de forme normalisée
+        """
+        counts = [0] * len(self.normalized)
+        for form, count in Counter(self._columns['tokens']).items():
+            counts[self._form_normalized[form]] += count
+        return counts
+
+    def get_chapter(self, chapter_index):
+        """
+        Retourne les vers tokenisés d'un chapitre.
+
+        Args:
+            chapter_index: Index du chapitre (0-based)
+
+        Returns:
+            Liste (un élément par vers) de tuples
+            (texte normalisé, tuple de paires (t, n), tuple d'identifiants de n)
+        """
+        if chapter_index < 0 or chapter_index >= self.chapter_count:
+            return []
+
+        columns = self._columns
+        first, last = columns['chapter_starts'][chapter_index:chapter_index + 2]
+        texts = decode_strings(columns['texts_normalized'],
+                               *columns['chapter_text_offsets'][chapter_index:chapter_index + 2])
+        starts = columns['verse_token_starts'][first:last + 1].tolist()
+        token_forms = columns['tokens'][starts[0]:starts[-1]].tolist()
+        base = starts[0]
+
+        verses = []
+        for text_normalized, start, end in zip(texts, starts, starts[1:]):
+            forms = token_forms[start - base:end - base]
+            verses.append((
+                text_normalized,
+                tuple(self._form_tokens[form] for form in forms),
+                tuple(self._form_normalized[form] for form in forms)
+            ))
+        return verses
+
+
+class TokenStore:
+    """
+    Accès aux tokens pré-calculés des témoins, avec cache des fichiers ouverts.
+
+    Un fichier absent ou périmé est (re)construit à la demande.
+    Un échec de construction est mémorisé jusqu'à la modification du témoin.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_valid(tokens, source):
+        return (tokens is not None and tokens.source == source
+                and tokens.normalization_version == NORMALIZATION_VERSION)
+
+    def get(self, witness_file):
+        """
+        Retourne les tokens à jour d'un témoin, en les (re)calculant si besoin.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            WitnessTokens, ou None si le témoin ne peut pas être tokenisé
+        """
+        key = os.path.abspath(witness_file)
+        stat = os.stat(key)
+        source = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+        with self._lock:
+            tokens = self._entries.get(key)
+            if self._failed.get(key) == source:
+                return None
+        if self._is_valid(tokens, source):
+            return tokens
+
+        tokens = self._open(tokens_path(key))
+        if not self._is_valid(tokens, source):
+            try:
+                tokens = self.build(key)
+            except Exception as e:
+                print(f"Tokenisation impossible de {key}: {e}")
+                with self._lock:
+                    self._failed[key] = source
+                return None
+
+        with self._lock:
+            self._entries[key] = tokens
+        return tokens
+
+    def build(self, witness_file):
+        """
+        Calcule et écrit les tokens d'un témoin, puis les ouvre.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            WitnessTokens
+        """
+        key = os.path.abspath(witness_file)
+        tokens = WitnessTokens(build_token_store(key))
+        with self._lock:
+            self._entries[key] = tokens
+        return tokens
+
+    def invalidate(self, witness_file, remove_file=False):
+        """
+        Oublie les tokens d'un témoin.
+
+        Args:
+            witness_file: Chemin du témoin
+            remove_file: Supprimer aussi le fichier de tokens
+        """
+        key = os.path.abspath(witness_file)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._failed.pop(key, None)
+        if remove_file:
+            try:
+                os.remove(tokens_path(key))
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _open(path):
+        """Ouvre un fichier de tokens, None s'il est absent ou invalide."""
+        try:
+            return WitnessTokens(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+# Instance partagée par le processus
+token_store = TokenStore()
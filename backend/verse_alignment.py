@@ -0,0 +1,263 @@
+"""
+Module d'alignement des vers entre témoins.
+Avant l'alignement mot à mot, les vers MainZone des témoins sont appariés
+par programmation dynamique sur leur similarité, au lieu d'être appariés
+par rang : un vers manquant (1:0), ajouté (0:1), coupé en deux (1:2) ou
+fusionné (2:1) dans un témoin ne décale plus tous les vers suivants.
+
+Signature d'un vers : ensemble de ses trigrammes de caractères (texte
+normalisé), plus robuste aux variantes graphiques qu'un ensemble de mots.
+Similarité : indice de Jaccard, calculé pour toutes les paires de vers
+d'un chapitre en produits matriciels NumPy quand il est installé.
+"""
+
+from collections import defaultdict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Taille des shingles (caractères)
+SHINGLE_SIZE = 3
+# Similarité en dessous de laquelle deux vers ne sont pas appariés
+# (mesuré sur les témoins fournis : vers correspondants ≥ 0,4 en général,
+# vers sans rapport ≤ 0,26)
+MATCH_THRESHOLD = 0.25
+# Pénalité d'une coupe (1:2 ou 2:1) par rapport à un appariement simple
+SPLIT_PENALTY = 0.05
+# Demi-largeur de la bande de la programmation dynamique autour de la
+# diagonale (en vers), en plus de l'écart entre les nombres de vers
+BAND = 32
+
+
+def verse_signature(text):
+    """
+    Signature d'un vers : ensemble de ses trigrammes de caractères.
+
+    Args:
+        text: Texte normalisé du vers
+
+    Returns:
+        frozenset de chaînes
+    """
+    padded = f' {text} '
+    return frozenset(padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1))
+
+
+def _jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def _pair_similarities_python(signatures_a, signatures_b):
+    """Matrices de similarités 1:1, 1:2 et 2:1 (Python pur)."""
+    joined_a = [a | b for a, b in zip(signatures_a, signatures_a[1:])]
+    joined_b = [a | b for a, b in zip(signatures_b, signatures_b[1:])]
+    return (
+        [[_jaccard(a, b) for b in signatures_b] for a in signatures_a],
+        [[_jaccard(a, b) for b in joined_b] for a in signatures_a],
+        [[_jaccard(a, b) for b in signatures_b] for a in joined_a]
+    )
+
+
+def _pair_similarities_numpy(signatures_a, signatures_b):
+    """
+    Matrices de similarités 1:1, 1:2 et 2:1 : les signatures sont codées en
+    matrices d'incidence vers × trigrammes, et les intersections de toutes
+    les paires sont obtenues par un produit matriciel.
+    """
+    columns = {}
+    for signature in (*signatures_a, *signatures_b):
+        for shingle in signature:
+            columns.setdefault(shingle, len(columns))
+
+    def incidence(signatures):
+        matrix = numpy.zeros((len(signatures), len(columns)), dtype=numpy.float32)
+        for row, signature in enumerate(signatures):
+            matrix[row, [columns[shingle] for shingle in signature]] = 1
+        return matrix
+
+    def jaccard(left, right):
+        inter = left @ right.T
+        union = left.sum(axis=1)[:, None] + right.sum(axis=1)[None, :] - inter
+        return numpy.divide(inter, union, out=numpy.zeros_like(inter), where=union > 0).tolist()
+
+    matrix_a, matrix_b = incidence(signatures_a), incidence(signatures_b)
+    joined_a = numpy.maximum(matrix_a[:-1], matrix_a[1:])
+    joined_b = numpy.maximum(matrix_b[:-1], matrix_b[1:])
+    return jaccard(matrix_a, matrix_b), jaccard(matrix_a, joined_b), jaccard(joined_a, matrix_b)
+
+
+def align_pair(signatures_a, signatures_b):
+    """
+    Aligne les vers de deux témoins.
+
+    Args:
+        signatures_a: Signatures des vers du premier témoin
+        signatures_b: Signatures des vers du second témoin
+
+    Returns:
+        Liste ordonnée d'opérations (index dans a, index dans b) : tuples
+        d'index de 0 à 2 éléments de chaque côté ((i,), (j,)) appariement,
+        ((i,), ()) vers absent de b, ((), (j,)) vers absent de a,
+        ((i,), (j, j + 1)) et ((i, i + 1), (j,)) coupes
+    """
+    rows, cols = len(signatures_a), len(signatures_b)
+    if not rows or not cols:
+        return [((i,), ()) for i in range(rows)] + [((), (j,)) for j in range(cols)]
+
+    if numpy is not None:
+        single, split_b, split_a = _pair_similarities_numpy(signatures_a, signatures_b)
+    else:
+        single, split_b, split_a = _pair_similarities_python(signatures_a, signatures_b)
+
+    # Bande autour de la diagonale : j ≈ i × cols / rows
+    band = BAND + abs(rows - cols)
+    ratio = cols / rows
+    bounds = [(max(0, int(i * ratio) - band), min(cols, int(i * ratio) + band))
+              for i in range(rows + 1)]
+
+    minus_infinity = float('-inf')
+    score = [[minus_infinity] * (cols + 1) for _ in range(rows + 1)]
+    back = [[None] * (cols + 1) for _ in range(rows + 1)]
+    score[0][0] = 0.0
+    split_cost = MATCH_THRESHOLD + SPLIT_PENALTY
+    for i in range(rows + 1):
+        low, high = bounds[i]
+        row, row_back = score[i], back[i]
+        above = score[i - 1] if i else None
+        for j in range(low if i else 1, high + 1):
+            # Ordre de priorité : appariement, coupes, puis vers absents
+            best, move = minus_infinity, None
+            if i and j:
+                best, move = above[j - 1] + single[i - 1][j - 1] - MATCH_THRESHOLD, (1, 1)
+                if j > 1:
+                    value = above[j - 2] + split_b[i - 1][j - 2] - split_cost
+                    if value > best:
+                        best, move = value, (1, 2)
+                if i > 1:
+                    value = score[i - 2][j - 1] + split_a[i - 2][j - 1] - split_cost
+                    if value > best:
+                        best, move = value, (2, 1)
+            if i and (move is None or above[j] > best):
+                best, move = above[j], (1, 0)
+            if j and (move is None or row[j - 1] > best):
+                best, move = row[j - 1], (0, 1)
+            row[j] = best
+            row_back[j] = move
+
+    operations = []
+    i, j = rows, cols
+    while i or j:
+        step_a, step_b = back[i][j]
+        operations.append((tuple(range(i - step_a, i)), tuple(range(j - step_b, j))))
+        i, j = i - step_a, j - step_b
+    operations.reverse()
+    return _pair_rewritten(operations)
+
+
+def _pair_rewritten(operations):
+    """
+    Apparie les vers absents d'un côté et de l'autre au même endroit, en
+    nombre égal : ce sont des vers réécrits, trop différents pour être
+    appariés sur leur similarité mais qui occupent la même place.
+    """
+    paired = []
+    run = []
+    for operation in (*operations, None):
+        if operation is not None and not (operation[0] and operation[1]):
+            run.append(operation)
+            continue
+        only_a = [indices for indices, other in run if not other]
+        only_b = [indices for other, indices in run if not other]
+        if only_a and len(only_a) == len(only_b):
+            paired.extend(zip(only_a, only_b))
+        else:
+            paired.extend(run)
+        run = []
+        if operation is not None:
+            paired.append(operation)
+    return paired
+
+
+def align_witness_verses(witness_texts):
+    """
+    Apparie les vers de N témoins.
+
+    Chaque témoin est aligné sur un pivot (le témoin qui a le plus de vers).
+    Les vers du pivot fusionnés par un témoin (2:1) forment une seule ligne ;
+    les vers absents du pivot forment des lignes supplémentaires, où les
+    vers semblables de plusieurs témoins sont regroupés.
+
+    Args:
+        witness_texts: Liste (un élément par témoin) de listes de textes normalisés
+
+    Returns:
+        Liste de lignes ; chaque ligne est une liste (un élément par témoin)
+        de tuples d'index de vers (vide si le témoin n'a pas de vers à cette ligne)
+    """
+    witness_count = len(witness_texts)
+    if not witness_count:
+        return []
+    pivot = max(range(witness_count), key=lambda k: len(witness_texts[k]))
+    signatures = [[verse_signature(text) for text in texts] for texts in witness_texts]
+    pivot_count = len(witness_texts[pivot])
+
+    # Vers appariés à chaque vers du pivot, et vers insérés avant chaque vers du pivot
+    assigned = [[() for _ in range(pivot_count)] for _ in range(witness_count)]
+    inserted = [defaultdict(list) for _ in range(witness_count)]
+    joined_with_next = [False] * pivot_count
+    for i in range(pivot_count):
+        assigned[pivot][i] = (i,)
+
+    for k in range(witness_count):
+        if k == pivot:
+            continue
+        position = 0
+        for pivot_indices, indices in align_pair(signatures[pivot], signatures[k]):
+            if not pivot_indices:
+                inserted[k][position].extend(indices)
+                continue
+            if len(pivot_indices) == 2:
+                joined_with_next[pivot_indices[0]] = True
+            assigned[k][pivot_indices[0]] = indices
+            position = pivot_indices[-1] + 1
+
+    lines = []
+    for position in range(pivot_count + 1):
+        lines.extend(_inserted_lines(inserted, position, signatures))
+        if position == pivot_count or (position and joined_with_next[position - 1]):
+            continue
+        end = position
+        while joined_with_next[end] and end + 1 < pivot_count:
+            end += 1
+        lines.append([
+            sum((assigned[k][i] for i in range(position, end + 1)), ())
+            for k in range(witness_count)
+        ])
+    return lines
+
+
+def _inserted_lines(inserted, position, signatures):
+    """
+    Lignes des vers absents du pivot insérés à une position.
+    Un vers rejoint une ligne déjà ouverte (après la dernière utilisée par
+    son témoin) s'il ressemble à son premier vers, sinon ouvre une ligne.
+    """
+    lines = []
+    first_signatures = []
+    for k, witness_inserted in enumerate(inserted):
+        start = 0
+        for index in witness_inserted.get(position, ()):
+            signature = signatures[k][index]
+            for line_index in range(start, len(lines)):
+                if _jaccard(first_signatures[line_index], signature) >= MATCH_THRESHOLD:
+                    break
+            else:
+                line_index = len(lines)
+                lines.append([() for _ in inserted])
+                first_signatures.append(signature)
+            lines[line_index][k] = (index,)
+            start = line_index + 1
+    return lines
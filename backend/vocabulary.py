@@ -0,0 +1,272 @@
+"""
+Module du vocabulaire des formes normalisées.
+Chaque œuvre a un vocabulaire qui associe à chaque forme normalisée un
+identifiant entier stable (les nouvelles formes sont ajoutées à la fin).
+L'alignement et la détection des variantes comparent ces identifiants au
+lieu des chaînes ; le vocabulaire conserve aussi la fréquence de chaque
+forme dans chaque témoin de l'œuvre.
+
+Stockage : data/vocabularies/{work_id}.json, partagé par les workers du
+serveur : chaque enregistrement fusionne sous verrou le vocabulaire du
+processus avec celui du disque. Les identifiants du processus ne changent
+jamais ; ceux du fichier sont traduits à la lecture et à l'écriture.
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+
+from config import VOCABULARY_DIR
+from file_lock import file_lock, write_json_atomic
+from normalization import NORMALIZATION_VERSION
+from token_store import token_store
+
+# Version du format des fichiers de vocabulaire
+VOCABULARY_VERSION = 1
+
+
+class Vocabulary:
+    """Association forme normalisée ↔ identifiant entier (ajout seulement)."""
+
+    def __init__(self, forms=()):
+        self.forms = list(forms)
+        self._ids = {form: i for i, form in enumerate(self.forms)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.forms)
+
+    def encode(self, forms):
+        """
+        Retourne les identifiants d'une suite de formes (ajoutées si inconnues).
+
+        Args:
+            forms: Itérable de formes normalisées
+
+        Returns:
+            Liste d'identifiants
+        """
+        ids = []
+        with self._lock:
+            for form in forms:
+                form_id = self._ids.get(form)
+                if form_id is None:
+                    form_id = self._ids[form] = len(self.forms)
+                    self.forms.append(form)
+                ids.append(form_id)
+        return ids
+
+    def decode(self, ids):
+        """Retourne les formes d'une suite d'identifiants."""
+        return [self.forms[form_id] for form_id in ids]
+
+
+class VocabularyStore:
+    """
+    Vocabulaires des œuvres, avec fréquences des formes par témoin.
+
+    Sans œuvre (work_id None), un vocabulaire partagé en mémoire est utilisé.
+    """
+
+    def __init__(self, vocabulary_dir=VOCABULARY_DIR):
+        """
+        Initialise le gestionnaire.
+
+        Args:
+            vocabulary_dir: Dossier des fichiers de vocabulaire
+        """
+        self.vocabulary_dir = vocabulary_dir
+        self._works = {}
+        self._lock = threading.Lock()
+        os.makedirs(vocabulary_dir, exist_ok=True)
+
+    def _path(self, work_id):
+        """Chemin du fichier de vocabulaire d'une œuvre."""
+        if not work_id or os.path.basename(work_id) != work_id or work_id.startswith('.'):
+            raise ValueError(f"Identifiant d'œuvre invalide : {work_id}")
+        return os.path.join(self.vocabulary_dir, f"{work_id}.json")
+
+    def _read(self, work_id):
+        """Vocabulaire enregistré d'une œuvre, {forms, witnesses} (vide si absent ou obsolète)."""
+        data = None
+        if work_id is not None:
+            try:
+                with open(self._path(work_id), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                pass
+            except ValueError as e:
+                print(f"Vocabulaire illisible pour {work_id}: {e}")
+        if (not data or data.get('version') != VOCABULARY_VERSION
+                or data.get('normalization_version') != NORMALIZATION_VERSION):
+            data = {'forms': [], 'witnesses': {}}
+        return data
+
+    def _load(self, work_id):
+        """
+        Retourne l'état d'une œuvre (chargé depuis le disque au premier accès).
+        État : {vocabulary, witnesses: {witness_id: {source, counts}}, remaps: {...},
+        dirty: témoins dont les fréquences ne sont pas encore enregistrées}
+        """
+        with self._lock:
+            state = self._works.get(work_id)
+            if state is not None:
+                return state
+
+            data = self._read(work_id)
+            state = {
+                'vocabulary': Vocabulary(data['forms']),
+                'witnesses': data['witnesses'],
+                'remaps': {},
+                'dirty': set()
+            }
+            self._works[work_id] = state
+            return state
+
+    def get(self, work_id=None):
+        """
+        Retourne le vocabulaire d'une œuvre.
+
+        Args:
+            work_id: ID de l'œuvre (None : vocabulaire partagé, non persisté)
+
+        Returns:
+            Vocabulary
+        """
+        return self._load(work_id)['vocabulary']
+
+    def witness_ids(self, work_id, witness_file):
+        """
+        Correspondance entre les identifiants de formes d'un témoin
+        (token_ids de ses vers, voir token_store.py) et ceux du vocabulaire.
+        À la première rencontre du témoin, ses fréquences sont enregistrées.
+
+        Args:
+            work_id: ID de l'œuvre (None : vocabulaire partagé)
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            Liste (identifiant du témoin → identifiant du vocabulaire),
+            ou None si les tokens du témoin sont indisponibles
+        """
+        tokens = token_store.get(witness_file)
+        if tokens is None:
+            return None
+
+        state = self._load(work_id)
+        key = os.path.abspath(witness_file)
+        remap = state['remaps'].get(key)
+        if remap is not None and remap[0] is tokens:
+            return remap[1]
+
+        ids = state['vocabulary'].encode(tokens.normalized)
+        with self._lock:
+            state['remaps'][key] = (tokens, ids)
+
+        witness_id = os.path.splitext(os.path.basename(witness_file))[0]
+        if state['witnesses'].get(witness_id, {}).get('source') != tokens.source:
+            counts = Counter()
+            for local_id, count in enumerate(tokens.normalized_counts()):
+                if count:
+                    counts[ids[local_id]] += count
+            with self._lock:
+                state['witnesses'][witness_id] = {
+                    'source': tokens.source,
+                    'counts': sorted(counts.items())
+                }
+                state['dirty'].add(witness_id)
+            self.save(work_id)
+        return ids
+
+    def statistics(self, work_id, limit=20):
+        """
+        Statistiques de fréquence des formes d'une œuvre.
+
+        Args:
+            work_id: ID de l'œuvre
+            limit: Nombre de formes les plus fréquentes retournées par témoin
+
+        Returns:
+            Dict {size, witnesses: {witness_id: {tokens, distinct, top: [[forme, n], ...]}}}
+        """
+        state = self._load(work_id)
+        vocabulary = state['vocabulary']
+        witnesses = {}
+        with self._lock:
+            entries = list(state['witnesses'].items())
+        for witness_id, entry in entries:
+            counts = entry['counts']
+            top = sorted(counts, key=lambda item: (-item[1], item[0]))[:limit]
+            witnesses[witness_id] = {
+                'tokens': sum(count for _, count in counts),
+                'distinct': len(counts),
+                'top': [[vocabulary.forms[form_id], count] for form_id, count in top]
+            }
+        return {'size': len(vocabulary), 'witnesses': witnesses}
+
+    def save(self, work_id):
+        """
+        Écrit le vocabulaire d'une œuvre (sans effet si work_id est None).
+
+        Sous verrou inter-processus, le fichier est relu et fusionné avec
+        l'état du processus : les formes enregistrées par les autres
+        workers gardent leurs identifiants dans le fichier, celles du
+        processus y sont ajoutées à la suite, et seules les fréquences des
+        témoins comptés par le processus depuis le dernier enregistrement
+        remplacent celles du fichier. Les identifiants du processus ne
+        changent pas (les formes inconnues du processus y sont ajoutées).
+        """
+        if work_id is None:
+            return
+        state = self._load(work_id)
+        vocabulary = state['vocabulary']
+        path = self._path(work_id)
+        with file_lock(path):
+            stored = self._read(work_id)
+            with self._lock:
+                # Identifiant du fichier → identifiant du processus
+                to_process = vocabulary.encode(stored['forms'])
+                # Identifiant du processus → identifiant du fichier
+                forms = list(stored['forms'])
+                to_disk = [None] * len(vocabulary)
+                for disk_id, form_id in enumerate(to_process):
+                    to_disk[form_id] = disk_id
+                for form_id, form in enumerate(vocabulary.forms[:len(to_disk)]):
+                    if to_disk[form_id] is None:
+                        to_disk[form_id] = len(forms)
+                        forms.append(form)
+
+                witnesses = {
+                    witness_id: dict(entry, counts=sorted(
+                        [to_process[form_id], count] for form_id, count in entry['counts']))
+                    for witness_id, entry in stored['witnesses'].items()
+                }
+                for witness_id in state['dirty']:
+                    witnesses[witness_id] = state['witnesses'][witness_id]
+                state['witnesses'] = witnesses
+                state['dirty'].clear()
+                data = {
+                    'version': VOCABULARY_VERSION,
+                    'normalization_version': NORMALIZATION_VERSION,
+                    'forms': forms,
+                    'witnesses': {
+                        witness_id: dict(entry, counts=sorted(
+                            [to_disk[form_id], count] for form_id, count in entry['counts']))
+                        for witness_id, entry in witnesses.items()
+                    }
+                }
+            write_json_atomic(path, data, compact=True)
+
+    def delete(self, work_id):
+        """Supprime le vocabulaire d'une œuvre (mémoire et disque)."""
+        with self._lock:
+            self._works.pop(work_id, None)
+        try:
+            os.remove(self._path(work_id))
+        except FileNotFoundError:
+            pass
+
+
+# Instance partagée par le processus
+vocabulary_store = VocabularyStore()
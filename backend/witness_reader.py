@@ -0,0 +1,126 @@
+"""
+Module de lecture en flux des fichiers témoins.
+Un témoin est un tableau JSON de chapitres : ce module le parcourt chapitre
+par chapitre sans charger tout le fichier, et relit un chapitre isolé à
+partir de sa position en octets (voir chapter_index.py).
+"""
+
+import codecs
+import json
+import re
+
+# Taille des blocs lus lors d'un parcours en flux
+READ_BLOCK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class _Buffer:
+    """
+    Tampon de texte décodé au fil de la lecture d'un fichier binaire.
+    Conserve la position en octets du début du tampon dans le fichier.
+    """
+
+    def __init__(self, f, block_size):
+        self.f = f
+        self.block_size = block_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.byte_start = 0
+        self.eof = False
+
+    def fill(self, min_size=None):
+        """Lit un bloc supplémentaire. Retourne False en fin de fichier."""
+        if self.eof:
+            return False
+        block = self.f.read(max(self.block_size, min_size or 0))
+        if not block:
+            self.eof = True
+            self.text += self.decoder.decode(b'', final=True)
+            return False
+        self.text += self.decoder.decode(block)
+        return True
+
+    def byte_offset(self, pos):
+        """Position en octets dans le fichier d'une position du tampon."""
+        return self.byte_start + len(self.text[:pos].encode('utf-8'))
+
+    def discard(self):
+        """Oublie le texte déjà consommé (avant self.pos)."""
+        if self.pos:
+            self.byte_start = self.byte_offset(self.pos)
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+    def skip_whitespace(self):
+        """Avance après les blancs ; retourne le caractère suivant ('' en fin de fichier)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+
+def iter_chapters(f, block_size=READ_BLOCK_SIZE):
+    """
+    Parcourt en flux le tableau JSON de premier niveau d'un témoin.
+    La mémoire utilisée est proportionnelle au plus grand chapitre.
+
+    Args:
+        f: Fichier ouvert en mode binaire
+        block_size: Taille des blocs lus
+
+    Yields:
+        Tuples (chapitre, offset, length) : chapitre décodé et position
+        en octets de son texte JSON dans le fichier
+    """
+    buffer = _Buffer(f, block_size)
+    if buffer.skip_whitespace() != '[':
+        return
+    buffer.pos += 1
+    if buffer.skip_whitespace() == ']':
+        return
+
+    while True:
+        buffer.discard()
+        while True:
+            try:
+                chapter, end = _DECODER.raw_decode(buffer.text, buffer.pos)
+                break
+            except json.JSONDecodeError:
+                # Chapitre incomplet dans le tampon : lire davantage
+                if not buffer.fill(len(buffer.text)):
+                    raise
+        offset = buffer.byte_offset(buffer.pos)
+        length = len(buffer.text[buffer.pos:end].encode('utf-8'))
+        buffer.pos = end
+        yield chapter, offset, length
+
+        separator = buffer.skip_whitespace()
+        if separator == ',':
+            buffer.pos += 1
+            buffer.skip_whitespace()
+        elif separator == ']':
+            return
+        else:
+            raise ValueError(f"Séparateur inattendu à l'octet {buffer.byte_offset(buffer.pos)}")
+
+
+def read_chapter_at(witness_file, offset, length):
+    """
+    Lit un seul chapitre à partir de sa position en octets.
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+        offset: Position du chapitre dans le fichier (octets)
+        length: Longueur du texte JSON du chapitre (octets)
+
+    Returns:
+        Chapitre décodé (liste de vers)
+    """
+    with open(witness_file, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length).decode('utf-8'))
@@ -0,0 +1,222 @@
+"""
+Module de cache des témoins.
+Conserve en mémoire les chapitres déjà parsés pour éviter de relire
+et de reparser les fichiers JSON des témoins à chaque collation.
+Chaque chapitre est lu isolément (position en octets de l'index des
+chapitres) : collationner un chapitre ne charge pas tout le manuscrit.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from chapter_index import chapter_index_store
+from compiled_witness import compiled_witness_store
+from config import COMPILED_WITNESS_ENABLED, TOKEN_STORE_ENABLED, WITNESS_CACHE_MAX_BYTES
+from token_store import token_store, tokenize_verse
+from witness_reader import iter_chapters
+
+
+def prepare_verses(chapter, tokenized=None):
+    """
+    Prépare les vers d'un chapitre pour la collation.
+
+    Args:
+        chapter: Chapitre brut (liste de dicts du fichier JSON)
+        tokenized: Vers déjà tokenisés du chapitre (voir token_store.py),
+            calculés ici si None
+
+    Returns:
+        Liste de vers avec texte normalisé et tokens (paires (t, n))
+    """
+    items = [item for item in (chapter if isinstance(chapter, list) else [])
+             if isinstance(item, dict) and 'text' in item]
+    if tokenized is None or len(tokenized) != len(items):
+        tokenized = [tokenize_verse(item['text']) + (None,) for item in items]
+
+    verses = []
+    for item, (text_normalized, tokens, token_ids) in zip(items, tokenized):
+        verses.append({
+            'text': item['text'],
+            'text_normalized': text_normalized,
+            'tokens': tuple(tokens),
+            'token_ids': token_ids,
+            'region': item.get('region', ''),
+            'alto_id': item.get('alto_id', ''),
+            'type': item.get('type', ''),
+            'page': item.get('page', '')
+        })
+    return verses
+
+
+def parse_witness_file(witness_file):
+    """
+    Parse un fichier témoin complet (en flux) et prépare ses vers pour la collation.
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+
+    Returns:
+        Liste de chapitres (chaque chapitre = liste de vers avec texte normalisé)
+    """
+    with open(witness_file, 'rb') as f:
+        return [prepare_verses(chapter) for chapter, _, _ in iter_chapters(f)]
+
+
+def load_chapter(witness_file, chapter_index):
+    """
+    Lit et prépare un seul chapitre d'un témoin.
+
+    Utilise le format compilé (compiled_witness.py) s'il est disponible,
+    sinon relit le chapitre dans le JSON à sa position en octets. Les
+    tokens viennent du fichier de tokens (token_store.py) s'il est disponible.
+
+    Args:
+        witness_file: Chemin vers le fichier JSON du témoin
+        chapter_index: Index du chapitre (0-based)
+
+    Returns:
+        Tuple (vers préparés, taille du chapitre en octets)
+    """
+    tokens = token_store.get(witness_file) if TOKEN_STORE_ENABLED else None
+    tokenized = tokens.get_chapter(chapter_index) if tokens is not None else None
+
+    compiled = compiled_witness_store.get(witness_file) if COMPILED_WITNESS_ENABLED else None
+    if compiled is not None:
+        if chapter_index < 0 or chapter_index >= compiled.chapter_count:
+            return [], 0
+        return (prepare_verses(compiled.get_chapter(chapter_index), tokenized),
+                compiled.chapter_size(chapter_index))
+
+    chapter, size = chapter_index_store.read_chapter(witness_file, chapter_index)
+    return prepare_verses(chapter, tokenized), size
+
+
+class WitnessStore:
+    """
+    Cache LRU des chapitres parsés, partagé par tout le processus.
+
+    Les entrées sont indexées par (chemin absolu, index du chapitre) et
+    validées par (mtime, taille) du fichier : un fichier modifié sur disque
+    est automatiquement relu. Le budget mémoire est exprimé en octets de
+    JSON source des chapitres gardés.
+    """
+
+    def __init__(self, max_bytes=WITNESS_CACHE_MAX_BYTES, loader=load_chapter):
+        """
+        Initialise le cache.
+
+        Args:
+            max_bytes: Taille cumulée maximale des chapitres gardés en mémoire
+            loader: Fonction (fichier, index) -> (vers, taille en octets)
+        """
+        self.max_bytes = max_bytes
+        self.loader = loader
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(path):
+        """Retourne la signature (mtime, taille) d'un fichier."""
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get_chapter(self, witness_file, chapter_index):
+        """
+        Récupère un chapitre parsé d'un témoin.
+
+        La liste retournée est partagée : ne pas la modifier.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+            chapter_index: Index du chapitre (0-based)
+
+        Returns:
+            Liste de vers du chapitre (vide si l'index est hors limites)
+        """
+        path = os.path.abspath(witness_file)
+        key = (path, chapter_index)
+        signature = self._signature(path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['signature'] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['verses']
+            self.misses += 1
+
+        # Lire hors du verrou pour ne pas bloquer les autres témoins
+        verses, size = self.loader(path, chapter_index)
+
+        with self._lock:
+            self._remove(key)
+            if size <= self.max_bytes:
+                self._entries[key] = {
+                    'signature': signature,
+                    'verses': verses,
+                    'size': size
+                }
+                self._total_bytes += size
+                self._evict()
+
+        return verses
+
+    def get_chapters(self, witness_file):
+        """
+        Récupère tous les chapitres parsés d'un témoin.
+
+        Args:
+            witness_file: Chemin vers le fichier JSON du témoin
+
+        Returns:
+            Liste de chapitres
+        """
+        count = chapter_index_store.chapter_count(witness_file)
+        return [self.get_chapter(witness_file, i) for i in range(count)]
+
+    def invalidate(self, witness_file=None):
+        """
+        Retire les chapitres d'un témoin du cache (ou vide tout le cache).
+
+        Args:
+            witness_file: Chemin du témoin à invalider, None pour tout vider
+        """
+        with self._lock:
+            if witness_file is None:
+                self._entries.clear()
+                self._total_bytes = 0
+            else:
+                path = os.path.abspath(witness_file)
+                for key in [k for k in self._entries if k[0] == path]:
+                    self._remove(key)
+
+    def stats(self):
+        """Retourne des statistiques d'utilisation du cache."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _remove(self, key):
+        """Retire une entrée (verrou déjà acquis)."""
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._total_bytes -= entry['size']
+
+    def _evict(self):
+        """Évince les entrées les moins récemment utilisées (verrou déjà acquis)."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._total_bytes -= entry['size']
+
+
+# Instance partagée par le processus
+witness_store = WitnessStore()
@@ -1,16 +1,33 @@
 """
 Module de gestion des œuvres et des témoins.
 Permet d'ajouter, lister et gérer les œuvres et leurs témoins associés.
+Le registre (works.json) est gardé en mémoire, indexé par identifiant, et
+relu seulement quand le fichier change sur disque (autre processus) ; les
+modifications sont faites sous verrou inter-processus, et écrites de façon
+atomique (voir file_lock.py).
 """
 
 import json
 import os
 import shutil
+import threading
 from datetime import datetime
 
+from chapter_index import chapter_index_store
+from compiled_witness import compiled_witness_store
+from file_lock import file_lock, write_json_atomic
+from token_store import token_store
+from vocabulary import vocabulary_store
+from witness_store import witness_store
+
 
 class WorkManager:
-    """Gère les œuvres et leurs témoins."""
+    """
+    Gère les œuvres et leurs témoins.
+
+    Les dicts retournés (œuvres, témoins) sont ceux du registre en mémoire :
+    ils ne doivent pas être modifiés par l'appelant.
+    """
     
     def __init__(self, works_file='../data/works.json', witnesses_dir='../data/input'):
         """
@@ -22,23 +39,72 @@ class WorkManager:
         """
         self.works_file = works_file
         self.witnesses_dir = witnesses_dir
+        self._lock = threading.RLock()
+        self._data = None
+        self._stamp = None
+        self._works = {}
+        self._witnesses = {}
         os.makedirs(witnesses_dir, exist_ok=True)
         self._ensure_works_file()
     
     def _ensure_works_file(self):
         """Crée le fichier works.json s'il n'existe pas."""
-        if not os.path.exists(self.works_file):
-            self._save_works({"works": []})
+        os.makedirs(os.path.dirname(os.path.abspath(self.works_file)), exist_ok=True)
+        with file_lock(self.works_file):
+            if not os.path.exists(self.works_file):
+                self._save_works({"works": []})
+    
+    def _file_stamp(self):
+        """Empreinte (mtime, taille, inode) de works.json, None s'il est absent."""
+        try:
+            stat = os.stat(self.works_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
     
     def _load_works(self):
         """Charge les œuvres depuis le fichier JSON."""
-        with open(self.works_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        try:
+            with open(self.works_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"works": []}
     
     def _save_works(self, data):
-        """Sauvegarde les œuvres dans le fichier JSON."""
-        with open(self.works_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """
+        Sauvegarde les œuvres dans le fichier JSON (écriture atomique) :
+        un autre processus lit l'ancienne ou la nouvelle version, jamais
+        un fichier à moitié écrit.
+        """
+        try:
+            write_json_atomic(self.works_file, data)
+        except Exception:
+            # Le registre en mémoire a pu être modifié : relire le fichier
+            self._data = None
+            raise
+        with self._lock:
+            self._data = data
+            self._stamp = self._file_stamp()
+            self._index()
+    
+    def _registry(self):
+        """Retourne le registre en mémoire, relu si works.json a changé sur disque."""
+        if self._data is None or self._file_stamp() != self._stamp:
+            with self._lock:
+                stamp = self._file_stamp()
+                if self._data is None or stamp != self._stamp:
+                    self._data = self._load_works()
+                    self._stamp = stamp
+                    self._index()
+        return self._data
+    
+    def _index(self):
+        """Reconstruit les index par identifiant d'œuvre et de témoin."""
+        self._works = {work['id']: work for work in self._data.get('works', [])}
+        self._witnesses = {
+            work_id: {wit['id']: wit for wit in work.get('witnesses', [])}
+            for work_id, work in self._works.items()
+        }
     
     def list_works(self):
         """
@@ -47,8 +113,7 @@ class WorkManager:
         Returns:
             Liste des œuvres
         """
-        data = self._load_works()
-        return data.get('works', [])
+        return self._registry().get('works', [])
     
     def get_work(self, work_id):
         """
@@ -60,11 +125,22 @@ class WorkManager:
         Returns:
             Dict de l'œuvre ou None
         """
-        works = self.list_works()
-        for work in works:
-            if work['id'] == work_id:
-                return work
-        return None
+        self._registry()
+        return self._works.get(work_id)
+    
+    def get_witness(self, work_id, witness_id):
+        """
+        Récupère un témoin d'une œuvre par son ID.
+        
+        Args:
+            work_id: ID de l'œuvre
+            witness_id: ID du témoin
+        
+        Returns:
+            Dict du témoin ou None
+        """
+        self._registry()
+        return self._witnesses.get(work_id, {}).get(witness_id)
     
     def add_work(self, name, author=None, date=None):
         """
@@ -78,28 +154,29 @@ class WorkManager:
         Returns:
             Dict de l'œuvre créée
         """
-        data = self._load_works()
-        
-        # Générer un ID unique
-        work_id = name.lower().replace(' ', '_').replace('-', '_')
-        # S'assurer que l'ID est unique
-        counter = 1
-        original_id = work_id
-        while any(w['id'] == work_id for w in data['works']):
-            work_id = f"{original_id}_{counter}"
-            counter += 1
-        
-        new_work = {
-            "id": work_id,
-            "name": name,
-            "author": author,
-            "date": date,
-            "witnesses": [],
-            "created_at": datetime.now().isoformat()
-        }
-        
-        data['works'].append(new_work)
-        self._save_works(data)
+        with self._lock, file_lock(self.works_file):
+            data = self._registry()
+            
+            # Générer un ID unique
+            work_id = name.lower().replace(' ', '_').replace('-', '_')
+            # S'assurer que l'ID est unique
+            counter = 1
+            original_id = work_id
+            while work_id in self._works:
+                work_id = f"{original_id}_{counter}"
+                counter += 1
+            
+            new_work = {
+                "id": work_id,
+                "name": name,
+                "author": author,
+                "date": date,
+                "witnesses": [],
+                "created_at": datetime.now().isoformat()
+            }
+            
+            data['works'].append(new_work)
+            self._save_works(data)
         return new_work
     
     def add_witness(self, work_id, witness_name, witness_file_path):
@@ -114,16 +191,7 @@ class WorkManager:
         Returns:
             Dict du témoin créé ou None si erreur
         """
-        data = self._load_works()
-        
-        # Trouver l'œuvre
-        work = None
-        for w in data['works']:
-            if w['id'] == work_id:
-                work = w
-                break
-        
-        if not work:
+        if not self.get_work(work_id):
             return None
         
         # Vérifier que le fichier existe
@@ -138,6 +206,16 @@ class WorkManager:
         dest_path = os.path.join(dest_dir, filename)
         
         shutil.copy2(witness_file_path, dest_path)
+        witness_store.invalidate(dest_path)
+        
+        # Construire l'index des chapitres (nombre de vers, régions, pages...),
+        # le format compilé et les tokens pré-calculés lus par la collation
+        try:
+            chapter_index_store.build(dest_path)
+            compiled_witness_store.build(dest_path)
+            token_store.build(dest_path)
+        except Exception as e:
+            print(f"Erreur lors de l'indexation de {dest_path}: {e}")
         
         # Ajouter le témoin à l'œuvre
         new_witness = {
@@ -147,8 +225,13 @@ class WorkManager:
             "added_at": datetime.now().isoformat()
         }
         
-        work['witnesses'].append(new_witness)
-        self._save_works(data)
+        with self._lock, file_lock(self.works_file):
+            data = self._registry()
+            work = self._works.get(work_id)
+            if not work:
+                return None
+            work['witnesses'].append(new_witness)
+            self._save_works(data)
         return new_witness
     
     def list_witnesses(self, work_id):
@@ -177,10 +260,8 @@ class WorkManager:
             Nombre de chapitres
         """
         try:
-            with open(witness_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return len(data) if isinstance(data, list) else 0
-        except:
+            return chapter_index_store.chapter_count(witness_file)
+        except Exception:
             return 0
     
     def update_work(self, work_id, name=None, author=None, date=None):
@@ -196,29 +277,23 @@ class WorkManager:
         Returns:
             Dict de l'œuvre mise à jour ou None si non trouvée
         """
-        data = self._load_works()
-        
-        # Trouver l'œuvre
-        work = None
-        for w in data['works']:
-            if w['id'] == work_id:
-                work = w
-                break
-        
-        if not work:
-            return None
-        
-        # Mettre à jour les champs fournis
-        if name is not None:
-            work['name'] = name
-        if author is not None:
-            work['author'] = author
-        if date is not None:
-            work['date'] = date
-        
-        work['updated_at'] = datetime.now().isoformat()
-        
-        self._save_works(data)
+        with self._lock, file_lock(self.works_file):
+            data = self._registry()
+            work = self._works.get(work_id)
+            if not work:
+                return None
+            
+            # Mettre à jour les champs fournis
+            if name is not None:
+                work['name'] = name
+            if author is not None:
+                work['author'] = author
+            if date is not None:
+                work['date'] = date
+            
+            work['updated_at'] = datetime.now().isoformat()
+            
+            self._save_works(data)
         return work
     
     def delete_work(self, work_id):
@@ -231,19 +306,23 @@ class WorkManager:
         Returns:
             True si supprimé, False si non trouvé
         """
-        data = self._load_works()
-        
-        # Trouver l'œuvre
-        work = None
-        work_index = None
-        for i, w in enumerate(data['works']):
-            if w['id'] == work_id:
-                work = w
-                work_index = i
-                break
-        
-        if not work:
-            return False
+        with self._lock, file_lock(self.works_file):
+            data = self._registry()
+            work = self._works.get(work_id)
+            if not work:
+                return False
+            # Supprimer l'œuvre de la liste
+            data['works'].remove(work)
+            self._save_works(data)
+        
+        for wit in work.get('witnesses', []):
+            if wit.get('file'):
+                witness_store.invalidate(wit['file'])
+                chapter_index_store.invalidate(wit['file'], remove_file=True)
+                compiled_witness_store.invalidate(wit['file'], remove_file=True)
+                token_store.invalidate(wit['file'], remove_file=True)
+        
+        vocabulary_store.delete(work_id)
         
         # Supprimer le dossier des témoins et tous les fichiers
         work_dir = os.path.join(self.witnesses_dir, work_id)
@@ -252,10 +331,6 @@ class WorkManager:
                 shutil.rmtree(work_dir)
             except Exception as e:
                 print(f"Erreur lors de la suppression du dossier {work_dir}: {e}")
-        
-        # Supprimer l'œuvre de la liste
-        data['works'].pop(work_index)
-        self._save_works(data)
         return True
     
     def update_witness(self, work_id, witness_id, new_name):
@@ -270,33 +345,17 @@ class WorkManager:
         Returns:
             Dict du témoin mis à jour ou None si non trouvé
         """
-        data = self._load_works()
-        
-        # Trouver l'œuvre
-        work = None
-        for w in data['works']:
-            if w['id'] == work_id:
-                work = w
-                break
-        
-        if not work:
-            return None
-        
-        # Trouver le témoin
-        witness = None
-        for wit in work['witnesses']:
-            if wit['id'] == witness_id:
-                witness = wit
-                break
-        
-        if not witness:
-            return None
-        
-        # Mettre à jour le nom
-        witness['name'] = new_name
-        witness['updated_at'] = datetime.now().isoformat()
-        
-        self._save_works(data)
+        with self._lock, file_lock(self.works_file):
+            data = self._registry()
+            witness = self._witnesses.get(work_id, {}).get(witness_id)
+            if not witness:
+                return None
+            
+            # Mettre à jour le nom
+            witness['name'] = new_name
+            witness['updated_at'] = datetime.now().isoformat()
+            
+            self._save_works(data)
         return witness
     
     def delete_witness(self, work_id, witness_id):
@@ -310,38 +369,26 @@ class WorkManager:
         Returns:
             True si supprimé, False si non trouvé
         """
-        data = self._load_works()
-        
-        # Trouver l'œuvre
-        work = None
-        for w in data['works']:
-            if w['id'] == work_id:
-                work = w
-                break
-        
-        if not work:
-            return False
-        
-        # Trouver et supprimer le témoin
-        witness_index = None
-        witness_file = None
-        for i, wit in enumerate(work['witnesses']):
-            if wit['id'] == witness_id:
-                witness_index = i
-                witness_file = wit.get('file')
-                break
-        
-        if witness_index is None:
-            return False
+        with self._lock, file_lock(self.works_file):
+            data = self._registry()
+            witness = self._witnesses.get(work_id, {}).get(witness_id)
+            if not witness:
+                return False
+            # Supprimer le témoin de la liste
+            self._works[work_id]['witnesses'].remove(witness)
+            self._save_works(data)
+        witness_file = witness.get('file')
         
         # Supprimer le fichier du témoin
+        if witness_file:
+            witness_store.invalidate(witness_file)
+            chapter_index_store.invalidate(witness_file, remove_file=True)
+            compiled_witness_store.invalidate(witness_file, remove_file=True)
+            token_store.invalidate(witness_file, remove_file=True)
         if witness_file and os.path.exists(witness_file):
             try:
                 os.remove(witness_file)
             except Exception as e:
                 print(f"Erreur lors de la suppression du fichier {witness_file}: {e}")
-        
-        # Supprimer le témoin de la liste
-        work['witnesses'].pop(witness_index)
-        self._save_works(data)
         return True
+
@@ -0,0 +1,24 @@
+"""
+Point d'entrée WSGI pour un serveur de production.
+
+Usage (depuis la racine du projet) :
+    gunicorn -c backend/gunicorn.conf.py wsgi:app
+ou, sans fork (Windows) :
+    waitress-serve --threads=8 --port=5001 --call wsgi:get_app  (depuis backend/)
+"""
+
+import os
+import sys
+
+# Les chemins de données de l'application sont relatifs au dossier backend/
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+os.chdir(BACKEND_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app import app  # noqa: E402
+
+
+def get_app():
+    """Retourne l'application Flask (forme attendue par waitress-serve --call)."""
+    return app
@@ -0,0 +1,50 @@
+"""
+Compare les moteurs d'alignement 'verse' et 'chapter' de perform_collation.
+
+Pour chaque chapitre demandé, collationne les trois témoins fournis avec
+les deux moteurs et affiche le temps d'alignement et la part de vers dont
+l'alignement est identique.
+
+Usage (depuis la racine du projet) :
+    python bench/bench_engines.py [index_chapitre ...]
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+
+from collate import perform_collation
+from config import WITNESSES
+
+
+def chapter_indices(chapter):
+    """Index par témoin : Chantilly a un chapitre vide en 2e position."""
+    return [chapter, chapter, chapter + 1 if chapter > 0 else chapter]
+
+
+def main(chapters):
+    files = list(WITNESSES.values())
+    names = list(WITNESSES.keys())
+
+    print(f"{'chapitre':>8}{'vers':>6}{'verse (ms)':>12}{'chapter (ms)':>14}{'identiques':>12}")
+    for chapter in chapters:
+        indices = chapter_indices(chapter)
+        by_verse = perform_collation(files, names, indices, engine='verse', use_cache=False)
+        by_chapter = perform_collation(files, names, indices, engine='chapter', use_cache=False)
+        if 'error' in by_verse:
+            print(f"{chapter:>8}  {by_verse['error']}")
+            continue
+        same = sum(
+            a['word_alignment'] == b['word_alignment']
+            for a, b in zip(by_verse['verses'], by_chapter['verses'])
+        )
+        print(f"{chapter:>8}{by_verse['total_verses']:>6}"
+              f"{by_verse['timing']['alignment_ms']:>12.0f}"
+              f"{by_chapter['timing']['alignment_ms']:>14.0f}"
+              f"{same / by_verse['total_verses']:>12.0%}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 3])
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark de la normalisation sur les trois témoins fournis.
+
+Compare l'ancienne implémentation (regex recompilées à chaque appel)
+au moteur de normalization.py, en tokens par seconde, sur le chemin
+tokenize_witness_text (NFC + découpage + normalisation par mot).
+
+Usage (depuis la racine du projet) :
+    python bench/bench_normalization.py
+"""
+
+import os
+import re
+import sys
+import time
+import unicodedata
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+
+from config import WITNESSES
+from data_import import load_witness_json
+from normalization import normalize_word, tokenize_words
+
+
+def legacy_normalize_text(text):
+    """Implémentation d'origine de collate.normalize_text (référence)."""
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFC', text)
+    text = re.sub(r'[/.,;:!?\-–—\'\"()\[\]{}…·*°⸫⁊¶§†‡⸝⸞‹›«»„""''‛‟⸗]', '', text)
+    text = text.lower()
+    text = re.sub(r'(.)\1', r'\1', text)
+    text = text.replace('y', 'i')
+    text = text.replace('ict', 'it')
+    text = text.replace('ist', 'it')
+    text = text.replace('tz', 'ts')
+    return text
+
+
+def legacy_tokenize(text):
+    """Implémentation d'origine de collate.tokenize_witness_text (référence)."""
+    text = unicodedata.normalize('NFC', text)
+    return [{"t": w, "n": legacy_normalize_text(w)} for w in re.findall(r'\w+', text)]
+
+
+def new_tokenize(text):
+    """Chemin actuel : découpage précompilé + cache par mot."""
+    return [{"t": w, "n": normalize_word(w)} for w in tokenize_words(text)]
+
+
+def load_texts():
+    """Charge tous les textes de vers des témoins fournis."""
+    texts = []
+    for path in WITNESSES.values():
+        for chapter in load_witness_json(path):
+            texts.extend(v['text'] for v in chapter if isinstance(v, dict) and v.get('text'))
+    return texts
+
+
+def measure(tokenize, texts, repeat=3):
+    """Retourne (tokens, meilleur temps en secondes) sur `repeat` passes."""
+    best = None
+    tokens = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = sum(len(tokenize(t)) for t in texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return tokens, best
+
+
+def main():
+    texts = load_texts()
+
+    # Vérifier l'équivalence avant de mesurer
+    for text in texts:
+        if legacy_tokenize(text) != new_tokenize(text):
+            raise SystemExit(f"Divergence de normalisation sur : {text!r}")
+
+    tokens, legacy_time = measure(legacy_tokenize, texts)
+    normalize_word.cache_clear()
+    _, cold_time = measure(new_tokenize, texts, repeat=1)
+    _, warm_time = measure(new_tokenize, texts)
+
+    print(f"{len(texts)} vers, {tokens} tokens")
+    print(f"{'implémentation':<22}{'secondes':>10}{'tokens/s':>14}")
+    for label, elapsed in [('avant', legacy_time),
+                           ('après (cache froid)', cold_time),
+                           ('après (cache chaud)', warm_time)]:
+        print(f"{label:<22}{elapsed:>10.3f}{tokens / elapsed:>14,.0f}")
+    print(f"cache : {normalize_word.cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Mesure l'évolution du temps de collation avec le nombre de témoins.
+
+Les témoins fournis (3) sont complétés par des témoins dérivés : copies
+d'un témoin réel où une part des mots est remplacée ou omise (graine fixe,
+résultats reproductibles). Pour chaque N, les vers d'un chapitre sont
+alignés en série avec l'aligneur natif (sans la limite
+NATIVE_ALIGNER_MAX_WITNESSES) puis avec CollateX, et les similarités par
+paire (N×N) sont calculées.
+
+Usage (depuis la racine du projet) :
+    python bench/bench_witnesses.py [N ...] [--chapter index] [--max-collatex N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+
+import collate
+from config import WITNESSES
+from similarity import similarity_matrix, verse_similarities
+
+# Proportion de mots remplacés / omis dans les témoins dérivés
+SUBSTITUTION_RATE = 0.08
+OMISSION_RATE = 0.04
+
+
+def real_witnesses(chapter):
+    """Textes normalisés MainZone des 3 témoins fournis (Chantilly décalé d'un chapitre)."""
+    indices = {'chantilly': chapter + 1}
+    witnesses = []
+    for name, path in WITNESSES.items():
+        verses = collate.load_witness_data(path, indices.get(name, chapter))
+        witnesses.append([v['text_normalized'] for v in verses if v.get('region') == 'MainZone'])
+    return witnesses
+
+
+def derived_witness(verses, vocabulary, rng):
+    """Copie d'un témoin avec des substitutions et omissions de mots."""
+    derived = []
+    for text in verses:
+        words = []
+        for word in text.split():
+            draw = rng.random()
+            if draw < OMISSION_RATE:
+                continue
+            words.append(rng.choice(vocabulary) if draw < OMISSION_RATE + SUBSTITUTION_RATE else word)
+        derived.append(' '.join(words) or text)
+    return derived
+
+
+def build_witnesses(base, count):
+    """Liste de count témoins : les témoins réels puis des témoins dérivés."""
+    rng = random.Random(count)
+    vocabulary = sorted({word for verses in base for text in verses for word in text.split()})
+    witnesses = list(base[:count])
+    while len(witnesses) < count:
+        witnesses.append(derived_witness(base[len(witnesses) % len(base)], vocabulary, rng))
+    verse_count = min(len(verses) for verses in witnesses)
+    return [list(texts) for texts in zip(*(verses[:verse_count] for verses in witnesses))]
+
+
+def time_alignment(verse_texts, names, aligner):
+    """Alignement en série de tous les vers ; retourne (ms, niveaux)."""
+    saved = collate.WORD_ALIGNER, collate.NATIVE_ALIGNER_MAX_WITNESSES
+    collate.WORD_ALIGNER, collate.NATIVE_ALIGNER_MAX_WITNESSES = aligner, len(names)
+    try:
+        start = time.perf_counter()
+        results = collate._collate_verse_batch(verse_texts, names)
+        return (time.perf_counter() - start) * 1000, [tier for _, tier in results]
+    finally:
+        collate.WORD_ALIGNER, collate.NATIVE_ALIGNER_MAX_WITNESSES = saved
+
+
+def main(counts, chapter, max_collatex):
+    base = real_witnesses(chapter)
+    # Premier passage (imports, cache de normalisation des mots) hors mesure
+    warm_up = build_witnesses(base, len(base))
+    time_alignment(warm_up, list(WITNESSES), 'native')
+    time_alignment(warm_up[:20], list(WITNESSES), 'collatex')
+
+    print(f"{'N':>3}{'vers':>6}{'divergents':>12}{'natif (ms)':>12}"
+          f"{'CollateX (ms)':>15}{'×':>6}{'similarités (ms)':>18}")
+    for count in counts:
+        verse_texts = build_witnesses(base, count)
+        names = [f'w{i}' for i in range(count)]
+
+        native_ms, tiers = time_alignment(verse_texts, names, 'native')
+        divergent = sum(tier == 'native' for tier in tiers)
+        if count <= max_collatex:
+            collatex_ms, _ = time_alignment(verse_texts, names, 'collatex')
+            collatex = f"{collatex_ms:>15.0f}{collatex_ms / native_ms:>6.1f}"
+        else:
+            collatex = f"{'-':>15}{'-':>6}"
+
+        start = time.perf_counter()
+        similarity_matrix(verse_similarities(verse_texts), count)
+        similarity_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{count:>3}{len(verse_texts):>6}{divergent / len(verse_texts):>12.0%}"
+              f"{native_ms:>12.0f}{collatex}{similarity_ms:>18.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('counts', nargs='*', type=int, default=[2, 3, 4, 6, 8, 10, 12])
+    parser.add_argument('--chapter', type=int, default=1,
+                        help="Index du chapitre dans les témoins BnF (défaut : 1)")
+    parser.add_argument('--max-collatex', type=int, default=12,
+                        help="N au-delà duquel CollateX n'est plus mesuré")
+    args = parser.parse_args()
+    main(args.counts, args.chapter, args.max_collatex)
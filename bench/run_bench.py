@@ -0,0 +1,300 @@
+"""
+Benchmark de référence du pipeline de collation sur les trois témoins fournis.
+
+Mesure chaque étape (lecture d'un chapitre, normalisation, tokenisation,
+alignement CollateX d'un vers, perform_collation par chapitre et sur toute
+l'œuvre, passage à N témoins) et écrit les résultats en JSON. Comparé à
+un fichier de référence, signale les mesures plus lentes que leur seuil
+de régression et sort avec le code 1.
+
+Usage (depuis la racine du projet) :
+    python bench/run_bench.py [--repeat N] [--quick] [--only nom ...]
+                              [--output fichier] [--baseline fichier] [--save-baseline]
+    make bench              # mesure et compare à bench/results/baseline.json
+    make bench-baseline     # mesure et enregistre la référence
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..', 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import collate
+import verse_alignment
+from bench_engines import chapter_indices
+from bench_normalization import load_texts
+from bench_witnesses import build_witnesses, real_witnesses, time_alignment
+from chapter_index import chapter_index_store
+from config import ALIGNMENT_FAST_PATH, COLLATION_WORKERS, WITNESSES, WORD_ALIGNER
+from normalization import NORMALIZATION_VERSION, normalize_text
+from witness_store import witness_store
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+# Version du format des résultats
+RESULTS_VERSION = 1
+
+# Répétitions par mesure (après une exécution de chauffe)
+DEFAULT_REPEAT = 5
+QUICK_REPEAT = 3
+
+# Seuil de régression par défaut : médiane plus lente de plus de 25 %
+DEFAULT_THRESHOLD = 0.25
+# En dessous de cet écart absolu (ms), une différence est du bruit de mesure
+MIN_REGRESSION_MS = 2.0
+
+# Chapitres collationnés un à un (index BnF ; Chantilly décalé, voir bench_engines)
+CHAPTERS = (1, 3)
+# Nombre de vers divergents alignés par CollateX
+COLLATEX_VERSES = 30
+# Nombre de témoins de la mesure de passage à l'échelle (bench_witnesses)
+SCALING_WITNESSES = 8
+
+BENCHMARKS = []
+
+
+def benchmark(name, threshold=DEFAULT_THRESHOLD, full_only=False):
+    """
+    Enregistre une mesure. La fonction reçoit le nombre de répétitions et
+    retourne (durées en ms, nombre d'éléments traités).
+    """
+    def register(function):
+        BENCHMARKS.append({'name': name, 'threshold': threshold,
+                           'full_only': full_only, 'run': function})
+        return function
+    return register
+
+
+def timed(run, repeat, setup=None):
+    """Durées (ms) de `repeat` exécutions de run, après une exécution de chauffe."""
+    samples = []
+    for index in range(repeat + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        if index:
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def bundled_files():
+    """Fichiers et noms des témoins fournis."""
+    return list(WITNESSES.values()), list(WITNESSES.keys())
+
+
+@benchmark('load_witness_data')
+def bench_load_witness_data(repeat):
+    """Lecture à froid du chapitre 1 de chaque témoin (cache mémoire vidé)."""
+    files, _ = bundled_files()
+    indices = chapter_indices(1)
+    loaded = []
+
+    def run():
+        loaded[:] = [collate.load_witness_data(path, index) for path, index in zip(files, indices)]
+
+    samples = timed(run, repeat, setup=witness_store.invalidate)
+    return samples, sum(len(verses) for verses in loaded)
+
+
+@benchmark('normalize_text')
+def bench_normalize_text(repeat):
+    """Normalisation de tous les vers des témoins (cache des mots chaud)."""
+    texts = load_texts()
+    return timed(lambda: [normalize_text(text) for text in texts], repeat), len(texts)
+
+
+@benchmark('tokenize_witness_text')
+def bench_tokenize_witness_text(repeat):
+    """Tokenisation de tous les vers des témoins."""
+    texts = load_texts()
+    return timed(lambda: [collate.tokenize_witness_text(text) for text in texts], repeat), len(texts)
+
+
+@benchmark('collate_verse_words', threshold=0.3)
+def bench_collate_verse_words(repeat):
+    """Alignement CollateX des premiers vers divergents du chapitre 1."""
+    _, names = bundled_files()
+    rows = [list(texts) for texts in zip(*real_witnesses(1)) if len(set(texts)) > 1]
+    rows = rows[:COLLATEX_VERSES]
+    return timed(lambda: [collate.collate_verse_words(texts, names) for texts in rows], repeat), len(rows)
+
+
+def _perform_chapter(chapter):
+    files, names = bundled_files()
+    result = collate.perform_collation(files, names, chapter_indices(chapter), use_cache=False)
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    return result
+
+
+for _chapter in CHAPTERS:
+    def _bench_chapter(repeat, chapter=_chapter):
+        """perform_collation d'un chapitre (sans cache)."""
+        verses = []
+        samples = timed(lambda: verses.append(_perform_chapter(chapter)['total_verses']), repeat)
+        return samples, verses[-1]
+    benchmark(f'perform_collation/chapter_{_chapter}')(_bench_chapter)
+
+
+@benchmark('perform_collation/work', threshold=0.3, full_only=True)
+def bench_perform_work(repeat):
+    """perform_collation de tous les chapitres communs aux trois témoins (sans cache)."""
+    files, _ = bundled_files()
+    chapters = range(min(chapter_index_store.chapter_count(path) for path in files) - 1)
+    verses = []
+
+    def run():
+        verses[:] = [_perform_chapter(chapter)['total_verses'] for chapter in chapters]
+
+    return timed(run, max(1, repeat // 3)), sum(verses)
+
+
+@benchmark(f'native_aligner/{SCALING_WITNESSES}_witnesses', threshold=0.3)
+def bench_native_scaling(repeat):
+    """Alignement natif en série du chapitre 1 avec N témoins (dont dérivés)."""
+    verse_texts = build_witnesses(real_witnesses(1), SCALING_WITNESSES)
+    names = [f'w{i}' for i in range(SCALING_WITNESSES)]
+    return timed(lambda: time_alignment(verse_texts, names, 'native'), repeat), len(verse_texts)
+
+
+def git_commit():
+    """Commit courant (suffixe '+' si l'arbre est modifié), ou None hors dépôt git."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(repeat, quick, only):
+    """
+    Exécute les mesures.
+
+    Returns:
+        Dict des résultats (format écrit en JSON)
+    """
+    results = {}
+    for entry in BENCHMARKS:
+        if only and entry['name'] not in only:
+            continue
+        if quick and entry['full_only']:
+            continue
+        samples, items = entry['run'](repeat)
+        median = statistics.median(samples)
+        results[entry['name']] = {
+            'median_ms': round(median, 3),
+            'min_ms': round(min(samples), 3),
+            'max_ms': round(max(samples), 3),
+            'repeat': len(samples),
+            'items': items,
+            'per_item_us': round(median * 1000 / items, 3) if items else None,
+            'threshold': entry['threshold']
+        }
+        print(f"{entry['name']:<36}{median:>12.2f} ms{items:>8} éléments", flush=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {
+            'collation_workers': COLLATION_WORKERS,
+            'word_aligner': WORD_ALIGNER,
+            'fast_path': ALIGNMENT_FAST_PATH,
+            'normalization_version': NORMALIZATION_VERSION,
+            'numpy': verse_alignment.numpy is not None
+        },
+        'benchmarks': results
+    }
+
+
+def compare(current, baseline):
+    """
+    Compare deux résultats mesure par mesure.
+
+    Returns:
+        Liste des noms des mesures en régression (médiane plus lente que
+        baseline × (1 + seuil), et d'au moins MIN_REGRESSION_MS)
+    """
+    regressions = []
+    print(f"\nRéférence : {baseline.get('commit')} ({baseline.get('created_at')})")
+    print(f"{'mesure':<36}{'référence':>12}{'actuel':>12}{'ratio':>8}")
+    for name, result in current['benchmarks'].items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            print(f"{name:<36}{'-':>12}{result['median_ms']:>12.2f}{'-':>8}")
+            continue
+        ratio = result['median_ms'] / reference['median_ms'] if reference['median_ms'] else 1.0
+        regressed = (ratio > 1 + result['threshold']
+                     and result['median_ms'] - reference['median_ms'] >= MIN_REGRESSION_MS)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<36}{reference['median_ms']:>12.2f}{result['median_ms']:>12.2f}"
+              f"{ratio:>8.2f}{'  RÉGRESSION' if regressed else ''}")
+    return regressions
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int,
+                        help=f"Répétitions par mesure (défaut : {DEFAULT_REPEAT}, {QUICK_REPEAT} avec --quick)")
+    parser.add_argument('--quick', action='store_true',
+                        help=f"{QUICK_REPEAT} répétitions par défaut, sans la collation de toute l'œuvre")
+    parser.add_argument('--only', nargs='+', metavar='NOM', help="Mesures à exécuter")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="Résultats de référence à comparer (ignoré s'il n'existe pas)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Enregistrer aussi les résultats comme référence")
+    args = parser.parse_args()
+
+    missing = [path for path in WITNESSES.values() if not os.path.exists(path)]
+    if missing:
+        raise SystemExit(f"Témoins fournis introuvables : {', '.join(missing)}")
+    unknown = set(args.only or ()) - {entry['name'] for entry in BENCHMARKS}
+    if unknown:
+        raise SystemExit(f"Mesures inconnues : {', '.join(sorted(unknown))}")
+
+    repeat = args.repeat
+    if repeat is None:
+        repeat = QUICK_REPEAT if args.quick else DEFAULT_REPEAT
+    current = run_benchmarks(repeat, args.quick, args.only)
+    write_json(args.output, current)
+    print(f"\nRésultats : {args.output}")
+
+    if args.save_baseline:
+        write_json(args.baseline, current)
+        print(f"Référence enregistrée : {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(current, json.load(f))
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) : {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
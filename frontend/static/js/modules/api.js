@@ -179,17 +179,66 @@ export async function deleteWitness(workId, witnessId) {
 
 // === API COLLATION ===
 
-export async function performCollation(workId, witnessIds, chapterIndex, chapterMapping = null) {
+/**
+ * Lance la collation d'un chapitre en flux (/api/collate/stream, NDJSON).
+ * onEvent reçoit chaque événement ('header', un 'verse' par vers, 'summary')
+ * dès sa réception ; s'il retourne une promesse, la lecture l'attend.
+ * Un événement 'error' est levé comme une erreur.
+ * page : fenêtre de vers ({offset, limit} ou {cursor, limit}, curseur de
+ * header.window de la page précédente), null pour tout le chapitre.
+ */
+export async function streamCollation(workId, witnessIds, chapterIndex, chapterMapping, onEvent,
+                                      page = null, signal = null) {
+    let response;
     try {
-        const response = await fetch('/api/collate', {
+        response = await fetch('/api/collate/stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 work_id: workId,
                 witness_ids: witnessIds,
                 chapter_index: parseInt(chapterIndex),
-                chapter_mapping: chapterMapping // {witness_id: original_chapter_index}
-            })
+                chapter_mapping: chapterMapping, // {witness_id: original_chapter_index}
+                ...page
+            }),
+            signal
+        });
+    } catch (error) {
+        // Collation remplacée par une autre (AbortController) : transmise telle quelle
+        if (error.name === 'AbortError') throw error;
+        handleFetchError(error);
+    }
+    if (!response.ok) {
+        await handleResponse(response);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let done = false;
+    while (!done) {
+        const chunk = await reader.read();
+        done = chunk.done;
+        buffer += decoder.decode(chunk.value, { stream: !done });
+        const lines = buffer.split('\n');
+        buffer = done ? '' : lines.pop();
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const event = JSON.parse(line);
+            if (event.event === 'error') {
+                throw new Error(event.message);
+            }
+            await onEvent(event);
+        }
+    }
+}
+
+export async function startCollateAll(workId, witnessIds) {
+    try {
+        const response = await fetch(`/api/works/${workId}/collate-all`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ witness_ids: witnessIds })
         });
         return await handleResponse(response);
     } catch (error) {
@@ -197,6 +246,29 @@ export async function performCollation(workId, witnessIds, chapterIndex, chapter
     }
 }
 
+export async function fetchJob(jobId) {
+    try {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        return await handleResponse(response);
+    } catch (error) {
+        handleFetchError(error);
+    }
+}
+
+/**
+ * S'abonne à la progression d'une tâche (Server-Sent Events).
+ * onProgress et onDone reçoivent l'état de la tâche ; retourne l'EventSource.
+ */
+export function subscribeJobEvents(jobId, onProgress, onDone) {
+    const source = new EventSource(`/api/jobs/${jobId}/events`);
+    source.addEventListener('progress', (event) => onProgress(JSON.parse(event.data)));
+    source.addEventListener('done', (event) => {
+        source.close();
+        onDone(JSON.parse(event.data));
+    });
+    return source;
+}
+
 // === API DECISIONS ===
 
 export async function saveDecision(workId, chapterIndex, verseNumber, decision) {
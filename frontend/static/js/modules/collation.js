@@ -5,6 +5,11 @@
 import { appState, collationState } from './state.js';
 import * as API from './api.js';
 
+// Collation en cours de réception (interrompue si une autre est lancée)
+let collationController = null;
+// Affichage des vers reçus prévu à la prochaine image
+let displayScheduled = false;
+
 /**
  * Lance la collation
  */
@@ -33,68 +38,219 @@ export async function launchCollation() {
     noResults.style.display = 'none';
     collationFooter.style.display = 'none';
     
+    // Une nouvelle collation interrompt le flux de la précédente
+    if (collationController) collationController.abort();
+    const controller = new AbortController();
+    collationController = controller;
+    
     try {
         // Récupérer le mapping du chapitre sélectionné vers les chapitres originaux
         const selectedChapterIdx = parseInt(appState.selectedChapter);
         const chapterInfo = appState.validChapters.find(ch => ch.index === selectedChapterIdx);
         const chapterMapping = chapterInfo ? chapterInfo.mapping : null;
         
-        const data = await API.performCollation(
-            appState.selectedWork,
-            appState.selectedWitnesses,
-            appState.selectedChapter,
-            chapterMapping
-        );
-        
-        if (data.status === 'success') {
-            collationState.results = data.data;
-            collationState.currentPage = 1;
-            collationState.pendingDecisions = {};
-            
-            // Compter les décisions existantes
-            collationState.totalDecisions = collationState.results.verses.filter(
-                v => v.user_decision !== null && v.user_decision !== undefined
-            ).length;
-            
-            // Afficher les en-têtes des témoins
-            document.getElementById('witness-header-1').textContent = collationState.results.witnesses[0];
-            document.getElementById('witness-header-2').textContent = collationState.results.witnesses[1];
-            document.getElementById('witness-header-3').textContent = collationState.results.witnesses[2];
-            
-            // Charger les décisions de mots persistées
-            try {
-                const { loadWordDecisions } = await import('./decisions.js');
-                await loadWordDecisions();
-            } catch (e) {
-                console.warn('Impossible de charger les décisions mots:', e);
-            }
-            
-            // Afficher les résultats
-            displayCollationResults();
-            
-            // Mettre à jour le bouton export
-            try {
-                const { updateExportButton } = await import('./chapter-validation.js');
-                await updateExportButton();
-            } catch (e) {
-                console.warn('Impossible de mettre à jour le bouton export:', e);
+        // Les vers sont affichés au fil de leur alignement (voir /api/collate/stream) :
+        // d'abord la première page, puis le reste du chapitre en suivant le curseur
+        let page = { offset: 0, limit: collationState.versesPerPage };
+        let summary = null;
+        let decisionsMoved = false;
+        while (page) {
+            const firstPage = page.offset === 0;
+            let pageWindow = null;
+            summary = null;
+            await API.streamCollation(
+                appState.selectedWork,
+                appState.selectedWitnesses,
+                appState.selectedChapter,
+                chapterMapping,
+                async (event) => {
+                    if (event.event === 'header') {
+                        pageWindow = event.window;
+                        if (firstPage) {
+                            await startCollationDisplay(event);
+                            collationLoading.style.display = 'none';
+                            collationTable.style.display = 'block';
+                            collationFooter.style.display = 'block';
+                        }
+                    } else if (event.event === 'verse') {
+                        collationState.results.verses.push(event.verse);
+                        if (event.verse.user_decision !== null && event.verse.user_decision !== undefined) {
+                            collationState.totalDecisions++;
+                        }
+                        scheduleCollationDisplay();
+                    } else if (event.event === 'summary') {
+                        summary = event;
+                    }
+                },
+                page,
+                controller.signal
+            );
+            if (!summary) {
+                throw new Error('La collation s\'est interrompue avant la fin du chapitre');
             }
-            
-            collationLoading.style.display = 'none';
-            collationTable.style.display = 'block';
-            collationFooter.style.display = 'block';
-        } else {
-            collationLoading.style.display = 'none';
-            noResults.innerHTML = `<div class="alert alert-danger">${data.message}</div>`;
-            noResults.style.display = 'block';
+            decisionsMoved = decisionsMoved || Boolean(summary.word_decision_changes);
+            page = pageWindow && pageWindow.cursor ? {
+                cursor: pageWindow.cursor,
+                limit: collationState.results.total_verses - pageWindow.next_offset
+            } : null;
+        }
+        
+        const { event: _, ...details } = summary;
+        Object.assign(collationState.results, details);
+        // Décisions de mots rattachées aux nouveaux vers (témoin mis à jour) : les relire
+        if (decisionsMoved) {
+            await loadCollationWordDecisions();
+        }
+        displayCollationResults();
+        
+        // Mettre à jour le bouton export
+        try {
+            const { updateExportButton } = await import('./chapter-validation.js');
+            await updateExportButton();
+        } catch (e) {
+            console.warn('Impossible de mettre à jour le bouton export:', e);
         }
     } catch (error) {
+        if (error.name === 'AbortError') return;
         console.error('Erreur de collation:', error);
         collationLoading.style.display = 'none';
+        collationTable.style.display = 'none';
+        collationFooter.style.display = 'none';
         
         noResults.innerHTML = `<div class="alert alert-danger">${error.message}<br><small class="text-muted">Voir la console (F12) pour plus de détails</small></div>`;
         noResults.style.display = 'block';
+    } finally {
+        if (collationController === controller) collationController = null;
+    }
+}
+
+/**
+ * Prépare l'affichage d'une collation à la réception de son en-tête
+ * (témoins, nombre de vers) : les vers arrivent ensuite un à un
+ */
+async function startCollationDisplay(header) {
+    const { event: _, ...results } = header;
+    collationState.results = { ...results, verses: [] };
+    collationState.currentPage = 1;
+    collationState.pendingDecisions = {};
+    collationState.totalDecisions = 0;
+    
+    // Afficher les en-têtes des témoins
+    document.getElementById('witness-header-1').textContent = results.witnesses[0];
+    document.getElementById('witness-header-2').textContent = results.witnesses[1];
+    document.getElementById('witness-header-3').textContent = results.witnesses[2];
+    
+    await loadCollationWordDecisions();
+    displayCollationResults();
+}
+
+/**
+ * Charge les décisions de mots persistées du chapitre
+ */
+async function loadCollationWordDecisions() {
+    try {
+        const { loadWordDecisions } = await import('./decisions.js');
+        await loadWordDecisions();
+    } catch (e) {
+        console.warn('Impossible de charger les décisions mots:', e);
+    }
+}
+
+/**
+ * Réaffiche la page courante au plus une fois par image pendant la
+ * réception des vers
+ */
+function scheduleCollationDisplay() {
+    if (displayScheduled) return;
+    displayScheduled = true;
+    requestAnimationFrame(() => {
+        displayScheduled = false;
+        if (collationState.results) displayCollationResults();
+    });
+}
+
+// Flux de progression de la collation de toute l'œuvre en cours
+let collateAllSource = null;
+
+/**
+ * Lance en arrière-plan la collation de tous les chapitres de l'œuvre
+ * (résultats mis en cache) et affiche sa progression
+ */
+export async function launchCollateAll() {
+    if (!appState.selectedWork || !appState.selectedWitnesses.every(w => w !== null)) {
+        alert('Veuillez sélectionner une œuvre et 3 témoins');
+        return;
+    }
+    
+    const button = document.getElementById('btn-collate-all');
+    const progress = document.getElementById('collate-all-progress');
+    button.disabled = true;
+    progress.style.display = 'block';
+    
+    try {
+        const data = await API.startCollateAll(appState.selectedWork, appState.selectedWitnesses);
+        if (data.status !== 'success') {
+            throw new Error(data.message);
+        }
+        
+        const jobId = data.job.job_id;
+        displayCollateAllProgress(data.job);
+        if (collateAllSource) collateAllSource.close();
+        
+        const finish = (job) => {
+            collateAllSource = null;
+            if (job) displayCollateAllProgress(job);
+            button.disabled = false;
+        };
+        const source = API.subscribeJobEvents(jobId, displayCollateAllProgress, finish);
+        collateAllSource = source;
+        // Connexion interrompue : l'état de la tâche est relu ; tant qu'elle
+        // n'est pas terminée, le navigateur se reconnecte au flux
+        source.onerror = async () => {
+            try {
+                const state = await API.fetchJob(jobId);
+                if (['done', 'error', 'cancelled'].includes(state.job.status)) {
+                    source.close();
+                    finish(state.job);
+                }
+            } catch (error) {
+                if (source.readyState === EventSource.CLOSED) {
+                    document.getElementById('collate-all-status').textContent = error.message;
+                    finish(null);
+                }
+            }
+        };
+    } catch (error) {
+        console.error('Erreur de collation de l\'œuvre:', error);
+        document.getElementById('collate-all-status').textContent = error.message;
+        button.disabled = false;
+    }
+}
+
+/**
+ * Affiche l'état de la collation de toute l'œuvre
+ */
+function displayCollateAllProgress(job) {
+    const bar = document.getElementById('collate-all-bar');
+    const status = document.getElementById('collate-all-status');
+    const percent = Math.round(job.progress * 100);
+    
+    bar.style.width = `${percent}%`;
+    bar.classList.toggle('bg-danger', job.failed > 0 || job.status === 'error');
+    bar.classList.toggle('bg-success', job.status === 'done' && job.failed === 0);
+    
+    let text = `${job.completed} / ${job.total} chapitres (dont ${job.cached} déjà en cache)`;
+    if (job.failed > 0) {
+        text += `, ${job.failed} en échec`;
+    }
+    if (job.status === 'done') {
+        text = `Œuvre collationnée : ${text}`;
+    } else if (job.status === 'error') {
+        text = `Collation de l'œuvre interrompue : ${text}`;
+    } else if (job.status === 'cancelled') {
+        text = `Collation de l'œuvre annulée : ${text}`;
     }
+    status.textContent = text;
 }
 
 /**
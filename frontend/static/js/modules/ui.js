@@ -10,7 +10,7 @@ import {
     updateWitnessNameFromFile
 } from './witnesses.js';
 import { onChapterSelected } from './chapters.js';
-import { launchCollation, previousPage, nextPage } from './collation.js';
+import { launchCollation, launchCollateAll, previousPage, nextPage } from './collation.js';
 import { openQualifyModal, saveDecision, clearDecision, saveAllDecisions } from './decisions.js';
 import { 
     toggleChapterEditor, excludeChapter,
@@ -51,6 +51,7 @@ export function exposeGlobalFunctions() {
     
     // Fonctions collation
     window.launchCollation = launchCollation;
+    window.launchCollateAll = launchCollateAll;
     window.previousPage = previousPage;
     window.nextPage = nextPage;
     
@@ -0,0 +1,78 @@
+"""
+Tests unitaires pour l'index des chapitres (chapter_index.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from chapter_index import ChapterIndexStore, build_chapter_index, index_path
+
+
+CHAPTERS = [
+    [
+        {"region": "Rubric", "text": "Prologue é", "page": "f1.xml"},
+        {"region": "MainZone", "text": "Il est ainsy", "page": "f1.xml"},
+        {"region": "MainZone", "text": "que debte", "page": "f2.xml"},
+    ],
+    [],
+    [{"region": "MainZone", "text": "Çà et là", "page": "f3.xml"}],
+]
+
+
+class TestChapterIndex(unittest.TestCase):
+    """Tests pour build_chapter_index et ChapterIndexStore."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.witness_file = os.path.join(self.tmp_dir.name, 'temoin.json')
+        self._write(CHAPTERS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, data, mtime=None):
+        with open(self.witness_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+        if mtime is not None:
+            os.utime(self.witness_file, (mtime, mtime))
+
+    def test_build(self):
+        """Comptes, régions, pages et positions en octets de chaque chapitre."""
+        index = build_chapter_index(self.witness_file)
+        chapters = index['chapters']
+        self.assertEqual(len(chapters), 3)
+        self.assertEqual(chapters[0]['total_verses'], 3)
+        self.assertEqual(chapters[0]['mainzone_verses'], 2)
+        self.assertEqual(chapters[0]['regions'], {'Rubric': 1, 'MainZone': 2})
+        self.assertEqual((chapters[0]['first_page'], chapters[0]['last_page']), ('f1.xml', 'f2.xml'))
+        self.assertEqual(chapters[1]['first_page'], None)
+
+        with open(self.witness_file, 'rb') as f:
+            raw = f.read()
+        for chapter, expected in zip(chapters, CHAPTERS):
+            span = raw[chapter['offset']:chapter['offset'] + chapter['length']]
+            self.assertEqual(json.loads(span), expected)
+
+    def test_store_rebuilds_on_change(self):
+        """L'index est écrit à côté du témoin et reconstruit si le témoin change."""
+        store = ChapterIndexStore()
+        self.assertEqual(store.chapter_count(self.witness_file), 3)
+        self.assertTrue(os.path.exists(index_path(self.witness_file)))
+
+        self._write(CHAPTERS[:1], mtime=1)
+        self.assertEqual(store.chapter_count(self.witness_file), 1)
+        # Un nouveau processus relit l'index annexe à jour
+        self.assertEqual(ChapterIndexStore().get(self.witness_file)['chapters'][0]['total_verses'], 3)
+
+        store.invalidate(self.witness_file, remove_file=True)
+        self.assertFalse(os.path.exists(index_path(self.witness_file)))
+
+
+if __name__ == '__main__':
+    unittest.main()
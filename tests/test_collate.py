@@ -0,0 +1,208 @@
+"""
+Tests unitaires pour le pipeline de collation (collate.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import collate
+from collation_cache import CollationCache
+
+
+VERSE_TEXTS = [
+    ['il est ainsi', 'il et ainsi', 'il est ainsi'],
+    ['que debte lonq temps', 'que dete lonc temps', ''],
+    ['', '', ''],
+    ['en la cite', 'en la cite de troie', 'la cite'],
+] * 5
+WITNESS_NAMES = ['a', 'b', 'c']
+
+
+class TestAlignVerses(unittest.TestCase):
+    """Tests pour align_verses."""
+
+    def test_parallel_preserves_order(self):
+        """Le pool de processus retourne les vers dans l'ordre."""
+        serial = [alignment for alignment, _ in
+                  collate._collate_verse_batch(VERSE_TEXTS, WITNESS_NAMES)]
+
+        saved = (collate.COLLATION_WORKERS, collate.COLLATION_CHUNK_SIZE,
+                 collate.COLLATION_PARALLEL_MIN_VERSES)
+        collate.COLLATION_WORKERS, collate.COLLATION_CHUNK_SIZE = 2, 3
+        collate.COLLATION_PARALLEL_MIN_VERSES = 1
+        try:
+            parallel, _ = collate.align_verses(VERSE_TEXTS, WITNESS_NAMES, 'verse')
+        finally:
+            collate.shutdown_executor()
+            (collate.COLLATION_WORKERS, collate.COLLATION_CHUNK_SIZE,
+             collate.COLLATION_PARALLEL_MIN_VERSES) = saved
+
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel[2], [])
+
+    def test_alignment_tiers(self):
+        """Seuls les vers divergents sont envoyés à l'aligneur (WORD_ALIGNER)."""
+        _, tiers = collate.align_verses(VERSE_TEXTS[:4] + [
+            ['il est ainsi', 'il est ainsi', 'il est ainsi'],
+        ], WITNESS_NAMES, 'verse')
+        self.assertEqual(tiers, ['linear', 'fallback', 'empty', collate.WORD_ALIGNER, 'identical'])
+
+    def test_linear_matches_collatex(self):
+        """L'alignement linéaire produit la même structure que CollateX."""
+        texts = ['que debte lonq temps', 'que dete lonq temps', 'que debte lonq temps']
+        tokens = [collate.tokenize_witness_text(t) for t in texts]
+        self.assertEqual(collate.linear_word_alignment(tokens),
+                         collate.collate_verse_words(texts, WITNESS_NAMES))
+        # Un décalage (forme reprise à la position voisine) est laissé à CollateX
+        shifted = [collate.tokenize_witness_text(t) for t in ['a b c d', 'b a c d', 'a b c d']]
+        self.assertFalse(collate._is_linear_alignment_safe(shifted))
+
+
+class TestPerformCollation(unittest.TestCase):
+    """Tests pour perform_collation avec N témoins."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        texts = ['il est ainsi', 'il et ainsi', 'il est ainsy', 'est ainsi', 'il est ainsi donc']
+        self.files = []
+        for i, text in enumerate(texts):
+            path = os.path.join(self.tmp_dir.name, f'temoin_{i}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([[{"region": "MainZone", "text": text},
+                            {"region": "MainZone", "text": "en la cite"}]], f)
+            self.files.append(path)
+        self.names = [f't{i}' for i in range(len(texts))]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_five_witnesses(self):
+        """Chaque vers porte les N témoins, similarités et distances sont N×N."""
+        result = collate.perform_collation(self.files, self.names, 0, use_cache=False)
+        self.assertEqual(result['total_verses'], 2)
+        first = result['verses'][0]
+        self.assertEqual([w['name'] for w in first['witnesses']], self.names)
+        self.assertEqual(len(first['similarities']), 10)
+        for position in first['word_alignment']:
+            self.assertEqual([w['witness_index'] for w in position['words']], list(range(5)))
+        self.assertEqual(result['verses'][1]['alignment_tier'], 'identical')
+        self.assertEqual(len(result['witness_similarities']), 5)
+        self.assertEqual(result['witness_similarities'][0][2], 1.0)
+        self.assertEqual(len(result['witness_distances'][4]), 5)
+
+    def test_verse_alignment(self):
+        """Avec verse_alignment, un vers manquant n'est pas comparé au vers suivant."""
+        path = os.path.join(self.tmp_dir.name, 'lacune.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([[{"region": "MainZone", "text": "en la cite"}]], f)
+        files, names = self.files[:1] + [path], self.names[:1] + ['lacune']
+
+        by_rank = collate.perform_collation(files, names, 0, use_cache=False)
+        self.assertEqual(by_rank['verses'][0]['witnesses'][1]['text'], 'en la cite')
+
+        result = collate.perform_collation(files, names, 0, use_cache=False, verse_alignment=True)
+        self.assertTrue(result['verse_alignment'])
+        first, second = result['verses']
+        self.assertTrue(first['witnesses'][1]['missing'])
+        self.assertEqual(first['source_verses'], [[0], []])
+        self.assertEqual(second['source_verses'], [[1], [0]])
+        self.assertTrue(second['is_identical'])
+
+    def test_incremental_recollation(self):
+        """Après la mise à jour d'un témoin, seuls les vers modifiés sont réalignés."""
+        saved = collate.collation_cache
+        collate.collation_cache = CollationCache(os.path.join(self.tmp_dir.name, 'cache'))
+        try:
+            first = collate.perform_collation(self.files, self.names, 0)
+            self.assertEqual(first['timing']['reused_verses'], 0)
+
+            with open(self.files[1], 'w', encoding='utf-8') as f:
+                json.dump([[{"region": "MainZone", "text": "il est ainsi"},
+                            {"region": "MainZone", "text": "en la cite"}]], f)
+            second = collate.perform_collation(self.files, self.names, 0)
+        finally:
+            collate.collation_cache = saved
+
+        self.assertEqual(second['timing']['cache'], 'miss')
+        self.assertEqual(second['timing']['reused_verses'], 1)
+        self.assertNotEqual(first['verses'][0]['content_hash'], second['verses'][0]['content_hash'])
+        self.assertEqual(first['verses'][1]['content_hash'], second['verses'][1]['content_hash'])
+        fresh = collate.perform_collation(self.files, self.names, 0, use_cache=False)
+        self.assertEqual([v['word_alignment'] for v in second['verses']],
+                         [v['word_alignment'] for v in fresh['verses']])
+
+    def test_window(self):
+        """Une fenêtre ne contient que ses vers ; hors cache, seuls ceux-ci sont alignés."""
+        first = collate.perform_collation(self.files, self.names, 0, use_cache=False, window=(0, 1))
+        self.assertEqual([v['verse_number'] for v in first['verses']], [1])
+        self.assertEqual(first['total_verses'], 2)
+        self.assertEqual(first['window'], {'offset': 0, 'limit': 1, 'count': 1, 'next_offset': 1})
+        self.assertEqual(first['alignment_tiers'], {first['verses'][0]['alignment_tier']: 1})
+
+        last = collate.perform_collation(self.files, self.names, 0, use_cache=False, window=(1, 5))
+        self.assertEqual([v['verse_number'] for v in last['verses']], [2])
+        self.assertIsNone(last['window']['next_offset'])
+
+        saved = collate.collation_cache
+        collate.collation_cache = CollationCache(os.path.join(self.tmp_dir.name, 'cache'))
+        try:
+            # Fenêtre partielle : le chapitre n'est pas mis en cache
+            page = collate.perform_collation(self.files, self.names, 0, window=(0, 1))
+            self.assertIsNone(collate.collation_cache.get(page['cache_key']))
+            full = collate.perform_collation(self.files, self.names, 0)
+            cached = collate.perform_collation(self.files, self.names, 0, window=(1, 1))
+        finally:
+            collate.collation_cache = saved
+        self.assertEqual(cached['timing']['cache'], 'hit')
+        self.assertEqual([(v['verse_number'], v['word_alignment']) for v in cached['verses']],
+                         [(v['verse_number'], v['word_alignment']) for v in full['verses'][1:]])
+        self.assertEqual(len(full['verses']), 2)
+
+    def test_pages_complete_cache(self):
+        """Quand les pages ont couvert tout le chapitre, il est mis en cache sans nouvel alignement."""
+        saved = collate.collation_cache
+        collate.collation_cache = CollationCache(os.path.join(self.tmp_dir.name, 'cache'))
+        try:
+            first = collate.perform_collation(self.files, self.names, 0, window=(0, 1))
+            last = collate.perform_collation(self.files, self.names, 0, window=(1, 1))
+            cached = collate.collation_cache.get(last['cache_key'])
+            entries = collate.collation_cache.stats()['entries']
+        finally:
+            collate.collation_cache = saved
+
+        self.assertEqual(last['timing']['reused_verses'], 1)
+        self.assertEqual([v['verse_number'] for v in last['verses']], [2])
+        self.assertEqual(entries, 1)
+        fresh = collate.perform_collation(self.files, self.names, 0, use_cache=False)
+        self.assertEqual([v['word_alignment'] for v in cached['verses']],
+                         [v['word_alignment'] for v in fresh['verses']])
+        self.assertEqual(cached['verses'][0]['word_alignment'], first['verses'][0]['word_alignment'])
+
+    def test_iter_collation(self):
+        """Le flux commence par l'en-tête, puis les vers dans l'ordre, et finit par le résumé."""
+        events = list(collate.iter_collation(self.files, self.names, 0, use_cache=False))
+        self.assertEqual([e['event'] for e in events], ['header', 'verse', 'verse', 'summary'])
+        self.assertEqual(events[0]['total_verses'], 2)
+        self.assertNotIn('verses', events[0])
+        self.assertIn('timing', events[-1])
+        result = collate.perform_collation(self.files, self.names, 0, use_cache=False)
+        self.assertEqual([e['verse']['word_alignment'] for e in events[1:-1]],
+                         [v['word_alignment'] for v in result['verses']])
+        self.assertEqual(events[-1]['alignment_tiers'], result['alignment_tiers'])
+
+    def test_witness_count_limits(self):
+        """Un seul témoin, ou un nom manquant, est refusé."""
+        with self.assertRaises(ValueError):
+            collate.perform_collation(self.files[:1], self.names[:1], 0, use_cache=False)
+        with self.assertRaises(ValueError):
+            collate.perform_collation(self.files, self.names[:4], 0, use_cache=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
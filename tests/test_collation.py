@@ -8,8 +8,10 @@ import os
 
 # Ajouter le dossier parent au path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
 
-from backend.collation import normalize_token, tokenize_verses
+from backend.collation import normalize_token, tokenize_verses, factorize_by_verse
 
 
 class TestCollation(unittest.TestCase):
@@ -32,6 +34,15 @@ class TestCollation(unittest.TestCase):
         # Test tz → s
         self.assertEqual(normalize_token('faictz'), 'faits')
     
+    def test_normalize_text_matches_word_cache(self):
+        """Le cache par mot et le chemin multi-mots donnent le même résultat."""
+        from normalization import normalize_text, normalize_word
+        
+        self.assertEqual(normalize_text('Il est ainsy, faictz.'), 'il est ainsi faits')
+        self.assertEqual(normalize_word('Ainſsy;'), normalize_text('Ainſsy;'))
+        self.assertEqual(normalize_text(''), '')
+        self.assertEqual(normalize_text(None), '')
+    
     def test_tokenize_verses(self):
         """Test de la tokenisation."""
         verses = [
@@ -47,6 +58,28 @@ class TestCollation(unittest.TestCase):
             self.assertIn('n', token)  # token normalisé
             self.assertIn('verse_nb', token)  # numéro du vers
 
+    
+    def test_factorize_by_verse(self):
+        """Chaque témoin garde ses mots dans son propre vers."""
+        def tok(text, verse_nb):
+            return [{"t": text, "n": text, "verse_nb": verse_nb}]
+        
+        # Une colonne mélange le vers 0 du témoin A et le vers 1 du témoin B
+        collation_json = {"table": [
+            [tok("il", 0), tok("est", 0), None],
+            [tok("il", 0), tok("et", 1), tok("dit", 1)],
+        ]}
+        
+        verses = factorize_by_verse(collation_json)
+        
+        self.assertEqual(len(verses[0]), 2)
+        self.assertEqual(len(verses[1]), 2)
+        self.assertFalse(verses[0][0]['has_variant'])
+        self.assertTrue(verses[0][1]['words'][1]['missing'])
+        self.assertEqual(verses[1][0]['words'][1]['text'], 'et')
+        self.assertTrue(verses[1][0]['words'][0]['missing'])
+        self.assertEqual([p['index'] for p in verses[1]], [0, 1])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests unitaires pour le cache disque des collations.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from collation_cache import CollationCache, make_cache_key, make_lineage_key
+
+
+def verse(text):
+    return {'text': text, 'region': 'MainZone', 'alto_id': '', 'type': '', 'page': 'f1'}
+
+
+class TestCollationCache(unittest.TestCase):
+    """Tests pour CollationCache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_content(self):
+        """La clé change avec le texte et les paramètres, pas sinon."""
+        data = [[verse('il est')], [verse('il et')]]
+        key = make_cache_key(data, ['a', 'b'], {'engine': 'verse'})
+        self.assertEqual(key, make_cache_key(data, ['a', 'b'], {'engine': 'verse'}))
+        self.assertNotEqual(key, make_cache_key(data, ['a', 'b'], {'engine': 'chapter'}))
+        self.assertNotEqual(key, make_cache_key([[verse('il est')], [verse('il est')]],
+                                                ['a', 'b'], {'engine': 'verse'}))
+
+    def test_roundtrip_and_invalidate(self):
+        """Un résultat enregistré est relu puis invalidé."""
+        cache = CollationCache(self.tmp_dir.name)
+        key = make_cache_key([[verse('il est')]], ['a'], {})
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'success': True, 'verses': [{'verse_number': 1}]})
+        self.assertEqual(cache.get(key)['verses'][0]['verse_number'], 1)
+        self.assertEqual(cache.invalidate(key), 1)
+        self.assertIsNone(cache.get(key))
+        with self.assertRaises(ValueError):
+            cache.invalidate('../works')
+
+    def test_latest_of_lineage(self):
+        """Le dernier résultat d'une lignée est retrouvé sans connaître son contenu."""
+        cache = CollationCache(self.tmp_dir.name)
+        lineage = make_lineage_key(['a.json', 'b.json'], [0, 0], ['a', 'b'], {})
+        self.assertNotEqual(lineage, make_lineage_key(['a.json', 'b.json'], [0, 1], ['a', 'b'], {}))
+        self.assertIsNone(cache.get_latest(lineage))
+        for text in ('il est', 'il et'):
+            key = make_cache_key([[verse(text)]], ['a'], {})
+            cache.put(key, {'text': text}, lineage)
+        self.assertEqual(cache.get_latest(lineage), {'text': 'il et'})
+        self.assertEqual(cache.stats()['hits'], 0)
+        cache.invalidate()
+        self.assertIsNone(cache.get_latest(lineage))
+
+    def test_size_bound(self):
+        """Les entrées les plus anciennes sont évincées au-delà de la limite."""
+        cache = CollationCache(self.tmp_dir.name, max_bytes=1)
+        key = make_cache_key([[verse('il est')]], ['a'], {})
+        cache.put(key, {'success': True})
+        self.assertEqual(cache.stats()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
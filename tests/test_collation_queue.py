@@ -0,0 +1,105 @@
+"""
+Tests unitaires pour la file de collations asynchrones (collation_queue.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import collate
+from collation_cache import CollationCache
+from collation_queue import CollationQueue
+
+
+class TestCollationQueue(unittest.TestCase):
+    """Tests pour CollationQueue."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        files = []
+        for i, text in enumerate(['il est ainsi', 'il et ainsi', 'il est ainsy']):
+            path = os.path.join(self.tmp_dir.name, f'temoin_{i}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([[{"region": "MainZone", "text": text}]], f)
+            files.append(path)
+        self.collation = {'witness_files': files, 'witness_names': ['a', 'b', 'c'],
+                          'chapter_indices': [0, 0, 0]}
+        self.cache_key = collate.collation_cache_key(**self.collation)
+        self.saved_cache = collate.collation_cache
+        collate.collation_cache = CollationCache(os.path.join(self.tmp_dir.name, 'cache'))
+        self.db_path = os.path.join(self.tmp_dir.name, 'queue.sqlite3')
+
+    def tearDown(self):
+        collate.collation_cache = self.saved_cache
+        self.tmp_dir.cleanup()
+
+    def _enqueue(self, queue, user):
+        return queue.enqueue(self.cache_key, {'user': user, 'collation': self.collation})
+
+    def test_deduplication(self):
+        """Deux demandes du même contenu partagent un seul calcul."""
+        queue = CollationQueue(self.db_path, workers=0)
+        first = self._enqueue(queue, 'u1')
+        second = self._enqueue(queue, 'u2')
+        self.assertEqual((first['status'], first['deduplicated']), ('queued', False))
+        self.assertEqual((second['status'], second['deduplicated']), ('queued', True))
+
+        self.assertEqual(queue.run_pending(), 1)
+        for job in (first, second):
+            done = queue.get(job['job_id'])
+            self.assertEqual(done['status'], 'done')
+            self.assertEqual(done['cache_key'], self.cache_key)
+        self.assertEqual(queue.get_params(second['job_id'])['user'], 'u2')
+        result = collate.collation_cache.get(self.cache_key)
+        self.assertEqual(result['total_verses'], 1)
+
+        # Résultat déjà en cache : tâche terminée aussitôt
+        third = self._enqueue(queue, 'u3')
+        self.assertEqual((third['status'], third['deduplicated']), ('done', True))
+        self.assertEqual(queue.run_pending(), 0)
+        self.assertIsNone(queue.get('absente'))
+
+    def test_recovery(self):
+        """Tâche d'un processus disparu : remise en attente ; trop longue : en erreur."""
+        queue = CollationQueue(self.db_path, workers=0, job_timeout=60)
+        job = self._enqueue(queue, 'u1')
+        conn = queue._connect()
+        with conn:
+            conn.execute("UPDATE collation_jobs SET status = 'running', worker_pid = ?, started_at = ?",
+                         (2 ** 30, '2000-01-01T00:00:00'))
+        conn.close()
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(queue.get(job['job_id'])['status'], 'done')
+
+        collate.collation_cache.invalidate()
+        job = self._enqueue(queue, 'u2')
+        conn = queue._connect()
+        with conn:
+            conn.execute("UPDATE collation_jobs SET status = 'running', worker_pid = ?, started_at = ? "
+                         "WHERE job_id = ?", (os.getpid(), '2000-01-01T00:00:00', job['job_id']))
+        conn.close()
+        self.assertEqual(queue.run_pending(), 0)
+        self.assertEqual(queue.get(job['job_id'])['status'], 'error')
+
+    def test_background_worker(self):
+        """Les threads d'exécution prennent les tâches déposées."""
+        queue = CollationQueue(self.db_path, workers=1, poll_interval=0.05)
+        job = self._enqueue(queue, 'u1')
+        deadline = time.monotonic() + 10
+        try:
+            while job['status'] != 'done' and time.monotonic() < deadline:
+                time.sleep(0.02)
+                job = queue.get(job['job_id'])
+        finally:
+            queue.stop()
+        self.assertEqual(job['status'], 'done')
+
+
+if __name__ == '__main__':
+    unittest.main()
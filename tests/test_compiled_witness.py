@@ -0,0 +1,71 @@
+"""
+Tests unitaires pour le format compilé des témoins (compiled_witness.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from compiled_witness import CompiledWitnessStore, compiled_path
+
+
+CHAPTERS = [
+    [
+        {"region": "Rubric", "text": "« Prologue »", "alto_id": "a1", "type": "default", "page": "f1.xml"},
+        {"region": "MainZone", "text": "Il est ainsy", "alto_id": "a2", "type": "default", "page": "f1.xml"},
+        {"region": "numberingZone", "alto_id": "a3"},
+    ],
+    [],
+    [{"region": "MainZone", "text": "", "page": "f2.xml"}],
+]
+
+
+class TestCompiledWitness(unittest.TestCase):
+    """Tests pour CompiledWitnessStore."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.witness_file = os.path.join(self.tmp_dir.name, 'temoin.json')
+        self._write(CHAPTERS)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, data, mtime=None):
+        with open(self.witness_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        if mtime is not None:
+            os.utime(self.witness_file, (mtime, mtime))
+
+    def test_round_trip(self):
+        """Les vers avec texte sont restitués à l'identique."""
+        compiled = CompiledWitnessStore().build(self.witness_file)
+        self.assertEqual(compiled.chapter_count, 3)
+        self.assertEqual(compiled.get_chapter(0), CHAPTERS[0][:2])
+        self.assertEqual(compiled.get_chapter(1), [])
+        self.assertEqual(compiled.get_chapter(2), [
+            {"region": "MainZone", "text": "", "alto_id": "", "type": "", "page": "f2.xml"}
+        ])
+        self.assertEqual(compiled.get_chapter(3), [])
+
+    def test_rebuild_and_fallback(self):
+        """Un témoin modifié est recompilé ; un témoin non compilable retourne None."""
+        store = CompiledWitnessStore()
+        self.assertEqual(store.get(self.witness_file).chapter_count, 3)
+        self._write(CHAPTERS[:1], mtime=1)
+        self.assertEqual(store.get(self.witness_file).chapter_count, 1)
+
+        self._write([[{"region": "MainZone", "text": 42}]], mtime=2)
+        self.assertIsNone(store.get(self.witness_file))
+
+        store.invalidate(self.witness_file, remove_file=True)
+        self.assertFalse(os.path.exists(compiled_path(self.witness_file)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Tests unitaires pour le stockage des décisions de mots (decisions.py).
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from decisions import DecisionManager, WordDecisionManager
+
+
+WITNESSES = ['wit_b', 'wit_a', 'wit_c']
+
+
+def collation(cache_key, verses):
+    """Résultat de collation minimal : verses = [(empreinte, [{témoin: mot}, ...]), ...]."""
+    names = ['A', 'B']
+    return {
+        'cache_key': cache_key,
+        'witnesses': names,
+        'verses': [{
+            'verse_number': number,
+            'content_hash': content_hash,
+            'word_alignment': [{
+                'words': [{'witness_index': i, 'text': words.get(name, ''),
+                           'missing': words.get(name) == '∅'}
+                          for i, name in enumerate(names)]
+            } for words in positions]
+        } for number, (content_hash, positions) in enumerate(verses, 1)]
+    }
+
+
+class TestDecisionManager(unittest.TestCase):
+    """Tests pour DecisionManager (décisions de vers)."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manager = DecisionManager(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_decisions_by_verse(self):
+        """Toutes les décisions d'un chapitre sont indexées par vers."""
+        self.manager.save_decision('w', 0, 2, {'qualification': 'a'})
+        self.manager.save_decision('w', 0, 7, {'qualification': 'b'})
+        self.manager.save_decision('w', 0, 2, {'qualification': 'c'})
+
+        by_verse = self.manager.get_decisions_by_verse('w', 0)
+        self.assertEqual(sorted(by_verse), [2, 7])
+        self.assertEqual(by_verse[2]['qualification'], 'c')
+        self.assertEqual(self.manager.get_decision_for_verse('w', 0, 7), by_verse[7])
+        self.assertIsNone(self.manager.get_decision_for_verse('w', 0, 3))
+        self.assertEqual(self.manager.get_decisions_by_verse('w', 1), {})
+
+
+class TestWordDecisionManager(unittest.TestCase):
+    """Tests pour WordDecisionManager (SQLite)."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manager = WordDecisionManager(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_save_update_delete(self):
+        """Une décision par (chapitre, vers, position), mise à jour en place."""
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 3, 1, 'ignorer')
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 1, 0, 'conserver')
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 3, 1, 'conserver',
+                                        explication='x', words={'a': 'mot'})
+
+        decisions = self.manager.load_word_decisions('w', WITNESSES, 0)
+        self.assertEqual([(d['verse_number'], d['action']) for d in decisions],
+                         [(3, 'conserver'), (1, 'conserver')])
+        self.assertEqual(decisions[0]['words'], {'a': 'mot'})
+        self.assertEqual(self.manager.load_word_decisions('w', WITNESSES, 1), [])
+        # L'ordre des témoins ne change pas la configuration
+        self.assertEqual(self.manager.count_all_decisions('w', sorted(WITNESSES)), 2)
+
+        self.assertTrue(self.manager.delete_word_decision('w', WITNESSES, 0, 3, 1))
+        self.assertFalse(self.manager.delete_word_decision('w', WITNESSES, 0, 3, 1))
+        self.assertTrue(self.manager.delete_all_decisions('w', WITNESSES))
+        self.assertEqual(self.manager.count_all_decisions('w', WITNESSES), 0)
+
+    def test_legacy_json_import_and_export(self):
+        """Les anciens fichiers JSON sont importés et le même format est exporté."""
+        legacy = {
+            'work_id': 'w',
+            'witnesses': WITNESSES,
+            'excluded_chapters': {'wit_c': [1]},
+            'chapters': {'2': {'decisions': [{
+                'verse_number': 5, 'position': 2, 'action': 'conserver',
+                'explication': None, 'words': {'a': 'x'}, 'pages': {'a': 12},
+                'timestamp': '2024-01-01T00:00:00'
+            }]}},
+            'last_modified': '2024-01-01T00:00:00'
+        }
+        legacy_file = self.manager._get_file('w', WITNESSES)
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+
+        self.assertEqual(self.manager.export_json('w', WITNESSES), legacy)
+        config = self.manager.get_configuration('w', WITNESSES)
+        self.assertEqual(config['excluded_chapters'], {'wit_c': [1]})
+        self.assertTrue(config['has_decisions'])
+
+        self.assertTrue(self.manager.delete_all_decisions('w', WITNESSES))
+        self.assertFalse(os.path.exists(legacy_file))
+        self.assertEqual(self.manager.load_word_decisions('w', WITNESSES, 2), [])
+
+    def test_reconcile_chapter(self):
+        """Les décisions suivent leur vers ; celles d'un vers modifié sont signalées."""
+        first = collation('1' * 64, [
+            ('h1', [{'A': 'il', 'B': 'il'}]),
+            ('h2', [{'A': 'il', 'B': 'il'}, {'A': 'est', 'B': 'et'}]),
+        ])
+        self.manager.reconcile_chapter('w', WITNESSES, 0, first)
+        self.assertEqual(self.manager.get_chapter_collation('w', WITNESSES, 0), '1' * 64)
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 1, 0, 'ignorer',
+                                        words={'A': 'il', 'B': 'il'})
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 2, 1, 'conserver',
+                                        words={'A': 'est', 'B': 'et'})
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 2, 0, 'ignorer',
+                                        words={'A': 'il', 'B': 'il'})
+
+        # Vers inséré en tête ; le vers h2 est modifié (mot ajouté, « il » corrigé)
+        second = collation('2' * 64, [
+            ('h0', [{'A': 'or', 'B': 'or'}]),
+            ('h1', [{'A': 'il', 'B': 'il'}]),
+            ('h2b', [{'A': 'donc', 'B': '∅'}, {'A': 'est', 'B': 'et'}]),
+        ])
+        counts = self.manager.reconcile_chapter('w', WITNESSES, 0, second, first)
+        self.assertEqual(counts, {'moved': 1, 'changed': 1, 'stale': 1})
+        decisions = self.manager.load_word_decisions('w', WITNESSES, 0)
+        self.assertEqual([(d['verse_number'], d['position'], d.get('context_change'))
+                          for d in decisions],
+                         [(2, 0, 'moved'), (3, 1, 'changed'), (3, 0, 'stale')])
+        self.assertEqual(self.manager.get_chapter_collation('w', WITNESSES, 0), '2' * 64)
+
+        # Enregistrer à nouveau une décision efface le signalement
+        self.manager.save_word_decision('w', WITNESSES, {}, 0, 2, 0, 'ignorer',
+                                        words={'A': 'il', 'B': 'il'})
+        self.assertNotIn('context_change', self.manager.load_word_decisions('w', WITNESSES, 0)[0])
+
+    def test_reconcile_chapter_collisions(self):
+        """Deux décisions visant la même clé : aucune n'est perdue, celle du vers inchangé l'emporte."""
+        first = collation('1' * 64, [
+            ('h0', [{'A': 'or', 'B': 'or'}, {'A': 'il', 'B': 'il'}]),
+            ('h1', [{'A': 'il', 'B': 'il'}]),
+            ('h2', [{'A': 'est', 'B': 'et'}]),
+        ])
+        self.manager.reconcile_chapter('w', WITNESSES, 0, first)
+        for verse, position, words in [(3, 0, {'A': 'est', 'B': 'et'}),
+                                       (1, 1, {'A': 'il', 'B': 'il'}),
+                                       (2, 0, {'A': 'il', 'B': 'il'})]:
+            self.manager.save_word_decision('w', WITNESSES, {}, 0, verse, position, 'ignorer',
+                                            words=words)
+
+        # Premier vers supprimé : la décision modifiée (1, 1) et la décision
+        # déplacée (2, 0) visent toutes deux (1, 0)
+        second = collation('2' * 64, [
+            ('h1', [{'A': 'il', 'B': 'il'}]),
+            ('h2', [{'A': 'est', 'B': 'et'}]),
+        ])
+        counts = self.manager.reconcile_chapter('w', WITNESSES, 0, second, first)
+        self.assertEqual(counts, {'moved': 2, 'changed': 0, 'stale': 1})
+        decisions = self.manager.load_word_decisions('w', WITNESSES, 0)
+        self.assertEqual(sorted((d['verse_number'], d['position'], d.get('context_change'))
+                                for d in decisions),
+                         [(1, 0, 'moved'), (1, 1, 'stale'), (2, 0, 'moved')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests unitaires pour les verrous inter-processus (file_lock.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import multiprocessing
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import file_lock
+from decisions import DecisionManager
+from vocabulary import VocabularyStore
+from works import WorkManager
+
+ROUNDS = 20
+
+
+def _increment(path):
+    """Lecture-modification-écriture d'un compteur JSON, sous verrou."""
+    for _ in range(ROUNDS):
+        with file_lock.file_lock(path):
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)['value']
+            file_lock.write_json_atomic(path, {'value': value + 1})
+
+
+def _add_works(works_file, witnesses_dir, prefix):
+    manager = WorkManager(works_file, witnesses_dir)
+    for i in range(ROUNDS // 2):
+        manager.add_work(f'{prefix} {i}')
+
+
+def _save_decisions(decisions_dir, first_verse):
+    manager = DecisionManager(decisions_dir)
+    for verse in range(first_verse, first_verse + ROUNDS // 2):
+        manager.save_decision('w', 0, verse, {'qualification': 'pertinent'})
+
+
+def _record_witnesses(vocabulary_dir, witness_files):
+    store = VocabularyStore(vocabulary_dir)
+    store.get('w')
+    for witness_file in witness_files:
+        store.witness_ids('w', witness_file)
+
+
+@unittest.skipIf(file_lock.fcntl is None, "fcntl indisponible")
+class TestFileLock(unittest.TestCase):
+    """Modifications concurrentes depuis plusieurs processus : aucune n'est perdue."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.context = multiprocessing.get_context('fork')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run(self, target, args_list):
+        processes = [self.context.Process(target=target, args=args) for args in args_list]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+
+    def test_counter(self):
+        path = os.path.join(self.tmp_dir.name, 'counter.json')
+        file_lock.write_json_atomic(path, {'value': 0})
+        with file_lock.file_lock(path), file_lock.file_lock(path):
+            pass  # réentrant dans un même thread
+        self._run(_increment, [(path,)] * 4)
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['value'], 4 * ROUNDS)
+
+    def test_work_manager(self):
+        works_file = os.path.join(self.tmp_dir.name, 'works.json')
+        witnesses_dir = os.path.join(self.tmp_dir.name, 'input')
+        self._run(_add_works, [(works_file, witnesses_dir, f'oeuvre {k}') for k in range(4)])
+        self.assertEqual(len(WorkManager(works_file, witnesses_dir).list_works()), 2 * ROUNDS)
+
+    def test_decision_manager(self):
+        self._run(_save_decisions, [(self.tmp_dir.name, k * ROUNDS) for k in range(4)])
+        decisions = DecisionManager(self.tmp_dir.name).load_decisions('w', 0)
+        self.assertEqual(decisions['total_decisions'], 2 * ROUNDS)
+
+    def test_vocabulary_store(self):
+        files = []
+        for k in range(8):
+            path = os.path.join(self.tmp_dir.name, f'temoin_{k}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([[{"region": "MainZone", "text": f"il est forme{k} forme{k}"}]], f)
+            files.append(path)
+        vocabulary_dir = os.path.join(self.tmp_dir.name, 'vocabularies')
+        self._run(_record_witnesses, [(vocabulary_dir, files[k::4]) for k in range(4)])
+        statistics = VocabularyStore(vocabulary_dir).statistics('w', limit=1)
+        self.assertEqual(statistics['size'], 2 + 8)
+        for k in range(8):
+            self.assertEqual(statistics['witnesses'][f'temoin_{k}']['top'], [[f'forme{k}', 2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
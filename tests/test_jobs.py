@@ -0,0 +1,99 @@
+"""
+Tests unitaires pour les tâches de collation en arrière-plan.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import collate
+from collation_cache import CollationCache
+from jobs import JobManager, compute_chapter_mapping
+from vocabulary import VocabularyStore
+
+
+class TestChapterMapping(unittest.TestCase):
+    """Tests pour compute_chapter_mapping."""
+
+    def test_exclusions_shift_chapters(self):
+        """Le i-ème chapitre non exclu de chaque témoin est apparié."""
+        chapters = compute_chapter_mapping(
+            ['a', 'b'],
+            {'a': 3, 'b': 4},
+            {'b': [1]}
+        )
+        self.assertEqual([c['mapping'] for c in chapters], [
+            {'a': 0, 'b': 0},
+            {'a': 1, 'b': 2},
+            {'a': 2, 'b': 3},
+        ])
+        self.assertEqual(compute_chapter_mapping(['a'], {'a': 2}, {'a': [0, 1]}), [])
+
+
+class TestJobManager(unittest.TestCase):
+    """Tests pour JobManager : état partagé par plusieurs processus (deux instances)."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = []
+        for i, text in enumerate(['il est ainsi', 'il et ainsi']):
+            path = os.path.join(self.tmp_dir.name, f'temoin_{i}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump([[{"region": "MainZone", "text": text}]] * 3, f)
+            self.files.append(path)
+        self.saved = collate.collation_cache, collate.vocabulary_store
+        collate.collation_cache = CollationCache(os.path.join(self.tmp_dir.name, 'cache'))
+        collate.vocabulary_store = VocabularyStore(os.path.join(self.tmp_dir.name, 'vocabularies'))
+        db_path = os.path.join(self.tmp_dir.name, 'jobs.sqlite3')
+        self.manager = JobManager(db_path, poll_interval=0.05)
+        self.other = JobManager(db_path, poll_interval=0.05)
+
+    def tearDown(self):
+        collate.collation_cache, collate.vocabulary_store = self.saved
+        self.tmp_dir.cleanup()
+
+    def _start(self):
+        chapters = compute_chapter_mapping(['a', 'b'], {'a': 3, 'b': 3}, {})
+        return self.manager.start_collate_all('w', ['a', 'b'], self.files, ['A', 'B'], chapters)
+
+    def test_progress_from_other_worker(self):
+        """Une tâche lancée par un worker est suivie depuis un autre."""
+        job = self._start()
+        self.assertEqual(self.other.get(job['job_id'])['total'], 3)
+        states = [state for state in self.other.iter_events(job['job_id'], heartbeat=0.5)
+                  if state is not None]
+        self.assertEqual(states[-1]['status'], 'done')
+        self.assertEqual((states[-1]['completed'], states[-1]['failed']), (3, 0))
+        self.assertEqual(self.manager.get(job['job_id']), states[-1])
+        self.assertFalse(self.other.cancel(job['job_id']))
+        self.assertIsNone(self.other.get('absente'))
+
+    def test_cancel_and_orphan(self):
+        """Annulation depuis un autre worker ; tâche d'un processus disparu en erreur."""
+        conn = self.manager._connect()
+        with conn:
+            for job_id, pid in (('active', os.getpid()), ('orpheline', 2 ** 30)):
+                conn.execute(
+                    """
+                    INSERT INTO collate_all_jobs (job_id, work_id, witness_ids, status, total,
+                                                  worker_pid, created_at)
+                    VALUES (?, 'w', '[]', 'running', 1, ?, '2000-01-01T00:00:00')
+                    """,
+                    (job_id, pid)
+                )
+        conn.close()
+        self.assertTrue(self.other.cancel('active'))
+        self.assertTrue(self.manager._is_cancelled('active'))
+        orphan = self.other.get('orpheline')
+        self.assertEqual(orphan['status'], 'error')
+        self.assertEqual(len(orphan['errors']), 1)
+        self.assertFalse(self.manager.cancel('orpheline'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Tests unitaires pour l'aligneur natif (native_aligner.py).
+Suite d'accord : l'aligneur natif doit produire exactement le même
+alignement que CollateX sur les vers divergents des témoins fournis.
+"""
+
+import json
+import os
+import random
+import sys
+import unittest
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import collate
+import native_aligner
+from config import WITNESSES
+from normalization import normalize_text
+
+WITNESS_NAMES = ['a', 'b', 'c']
+
+# Chapitres comparés : le chapitre c + 1 de Chantilly correspond au chapitre c des BnF
+AGREEMENT_CHAPTERS = range(0, 3)
+
+
+def _mainzone_texts(witness_file, chapter_index):
+    with open(witness_file, 'r', encoding='utf-8') as f:
+        chapter = json.load(f)[chapter_index]
+    return [normalize_text(verse['text']) for verse in chapter
+            if verse.get('region') == 'MainZone' and verse.get('text')]
+
+
+class TestNativeAligner(unittest.TestCase):
+    """Tests pour native_aligner."""
+
+    def assertSameAlignment(self, texts):
+        tokens = [collate.tokenize_witness_text(text) for text in texts]
+        self.assertEqual(collate.native_verse_words(texts, WITNESS_NAMES, tokens),
+                         collate.collate_verse_words(texts, WITNESS_NAMES, tokens), texts)
+
+    def test_matches_collatex(self):
+        """Omissions, ajouts, inversions et répétitions alignés comme CollateX."""
+        for texts in (
+            ['en la cite', 'en la cite de troie', 'la cite'],
+            ['a b c d', 'b a c d', 'a b c d'],
+            ['il est il est', 'il est', 'est il est'],
+            ['et dist que', 'que dist et', 'dist'],
+            ['a a a b', 'b a a', 'a b a b a'],
+        ):
+            self.assertSameAlignment(texts)
+
+    def test_vocabulary_ids(self):
+        """Les tokens portant un identifiant de forme sont comparés par identifiant."""
+        tokens = [
+            [{'t': 'Il', 'n': 'il', 'i': 0}, {'t': 'est', 'n': 'est', 'i': 1}],
+            [{'t': 'il', 'n': 'il', 'i': 0}, {'t': 'et', 'n': 'et', 'i': 2}],
+            [{'t': 'il', 'n': 'il', 'i': 0}],
+        ]
+        table = native_aligner.align_tokens(tokens)
+        self.assertEqual([len(row) for row in table], [2, 2, 2])
+        self.assertEqual([cell[0]['t'] for cell in table[0]], ['Il', 'est'])
+        self.assertEqual([cell[0]['t'] for cell in table[1]], ['il', 'et'])
+        self.assertIsNone(table[2][1])
+
+    def test_numpy_fill_matches_python(self):
+        """Le remplissage vectorisé donne les mêmes déplacements que la boucle Python."""
+        if native_aligner.numpy is None:
+            self.skipTest("NumPy non installé")
+        rng = random.Random(3)
+        for rows, ranks in ((1, 1), (5, 9), (40, 60)):
+            match = [[rng.random() < 0.2 for _ in range(ranks)] for _ in range(rows)]
+            self.assertEqual(native_aligner._fill_moves_numpy(match),
+                             native_aligner._fill_moves_python(match))
+
+    def test_tiered_uses_configured_aligner(self):
+        """Les vers divergents passent par l'aligneur configuré."""
+        texts = ['en la cite', 'en la cite de troie', 'la cite']
+        saved = collate.WORD_ALIGNER
+        try:
+            collate.WORD_ALIGNER = 'native'
+            native, tier = collate.align_verse_tiered(texts, WITNESS_NAMES)
+            self.assertEqual(tier, 'native')
+            collate.WORD_ALIGNER = 'collatex'
+            reference, tier = collate.align_verse_tiered(texts, WITNESS_NAMES)
+            self.assertEqual(tier, 'collatex')
+        finally:
+            collate.WORD_ALIGNER = saved
+        self.assertEqual(native, reference)
+
+    @unittest.skipUnless(all(os.path.exists(WITNESSES[name])
+                             for name in ('chantilly', 'bnf_1712', 'bnf_2820')),
+                         "Témoins fournis absents")
+    def test_agreement_on_bundled_witnesses(self):
+        """Accord complet avec CollateX sur les vers divergents des témoins fournis."""
+        compared = 0
+        for chapter in AGREEMENT_CHAPTERS:
+            witnesses = [
+                _mainzone_texts(WITNESSES['chantilly'], chapter + 1),
+                _mainzone_texts(WITNESSES['bnf_1712'], chapter),
+                _mainzone_texts(WITNESSES['bnf_2820'], chapter),
+            ]
+            for texts in zip(*witnesses):
+                if len(set(texts)) > 1 and all(collate.tokenize_witness_text(t) for t in texts):
+                    self.assertSameAlignment(list(texts))
+                    compared += 1
+        self.assertGreater(compared, 100)
+
+    def test_agreement_beyond_three_witnesses(self):
+        """De 4 à 8 témoins, les vers divergents sont alignés comme par CollateX."""
+        rng = random.Random(7)
+        cases = [
+            # L'aligneur natif seul diffère de CollateX sur ces vers
+            ['c', 'a f', 'c c', 'c e a c', 'a', 'd c f'],
+            ['d f', 'b a', 'b e d e', 'a e a d', 'd b d d'],
+            ['b', 'a f f', 'a c', 'f b', 'c b b c', 'd', 'c a a b', 'e d'],
+        ]
+        for _ in range(200):
+            cases.append([' '.join(rng.choice('abcdef') for _ in range(rng.randint(1, 4)))
+                          for _ in range(rng.randint(4, 8))])
+        for texts in cases:
+            names = [f'w{i}' for i in range(len(texts))]
+            aligned, tier = collate.align_verse_tiered(texts, names)
+            self.assertEqual(aligned, collate.collate_verse_words(texts, names), texts)
+            self.assertNotEqual(tier, 'native')
+
+
+if __name__ == '__main__':
+    unittest.main()
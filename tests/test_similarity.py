@@ -0,0 +1,61 @@
+"""
+Tests unitaires pour le calcul de similarité.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import similarity
+
+
+class TestSimilarity(unittest.TestCase):
+    """Tests pour le module similarity."""
+
+    @unittest.skipIf(similarity.Indel is None, "rapidfuzz n'est pas installé")
+    def test_python_ratio_matches_rapidfuzz(self):
+        """Le calcul en Python pur donne le même ratio que rapidfuzz."""
+        ratio = similarity.Indel.normalized_similarity
+
+        rng = random.Random(0)
+        for _ in range(200):
+            text1 = ''.join(rng.choice('abcé ') for _ in range(rng.randint(0, 80)))
+            text2 = ''.join(rng.choice('abcé ') for _ in range(rng.randint(0, 80)))
+            self.assertAlmostEqual(similarity._python_ratio(text1, text2), ratio(text1, text2))
+
+    def test_verse_similarities(self):
+        """Les paires vides sont ignorées, les autres gardent le format 'i-j'."""
+        verse_texts = [['il est', 'il et', 'il est'], ['que', '', 'que']]
+        expected = [
+            [('0-1', 0.909), ('0-2', 1.0), ('1-2', 0.909)],
+            [('0-2', 1.0)],
+        ]
+        self.assertEqual(similarity.verse_similarities(verse_texts), expected)
+
+        saved = similarity.process, similarity._ratio
+        similarity.process, similarity._ratio = None, similarity._python_ratio
+        try:
+            self.assertEqual(similarity.verse_similarities(verse_texts), expected)
+            self.assertEqual(similarity.witness_distance_matrix(['abc', 'abd']),
+                             [[0.0, 0.333], [0.333, 0.0]])
+        finally:
+            similarity.process, similarity._ratio = saved
+
+    def test_similarity_matrix(self):
+        """Moyenne par paire de témoins sur les vers communs, matrice N×N symétrique."""
+        similarities = similarity.verse_similarities(
+            [['il est', 'il et', 'il est', ''], ['que', '', 'que', '']])
+        self.assertEqual(similarity.similarity_matrix(similarities, 4), [
+            [1.0, 0.909, 1.0, None],
+            [0.909, 1.0, 0.909, None],
+            [1.0, 0.909, 1.0, None],
+            [None, None, None, 1.0],
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
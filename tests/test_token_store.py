@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour les tokens pré-calculés des témoins (token_store.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import token_store
+from collate import tokenize_witness_text
+from normalization import normalize_text
+
+
+CHAPTERS = [
+    [
+        {"region": "MainZone", "text": "Il est ainsy que debte"},
+        {"region": "numberingZone"},
+        {"region": "MainZone", "text": "Il est, ainsi !"},
+    ],
+    [],
+    [{"region": "MainZone", "text": ""}],
+]
+
+
+class TestTokenStore(unittest.TestCase):
+    """Tests pour TokenStore."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.witness_file = os.path.join(self.tmp_dir.name, 'temoin.json')
+        with open(self.witness_file, 'w', encoding='utf-8') as f:
+            json.dump(CHAPTERS, f, ensure_ascii=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_matches_tokenizer(self):
+        """Les tokens stockés sont ceux que la collation calculerait."""
+        tokens = token_store.TokenStore().get(self.witness_file)
+        chapter = tokens.get_chapter(0)
+        self.assertEqual(len(chapter), 2)
+        for (text_normalized, pairs, ids), item in zip(chapter, [CHAPTERS[0][0], CHAPTERS[0][2]]):
+            self.assertEqual(text_normalized, normalize_text(item['text']))
+            self.assertEqual([{'t': t, 'n': n} for t, n in pairs],
+                             tokenize_witness_text(text_normalized))
+            self.assertEqual([tokens.normalized[i] for i in ids], [n for _, n in pairs])
+        # Même forme normalisée, même identifiant
+        self.assertEqual(chapter[0][2][:3], chapter[1][2])
+        self.assertEqual(tokens.get_chapter(1), [])
+        self.assertEqual(tokens.get_chapter(2), [('', (), ())])
+
+    def test_normalization_version_invalidates(self):
+        """Un changement des règles de normalisation reconstruit les tokens."""
+        token_store.TokenStore().get(self.witness_file)
+        saved = token_store.NORMALIZATION_VERSION
+        token_store.NORMALIZATION_VERSION = saved + 1
+        try:
+            tokens = token_store.TokenStore().get(self.witness_file)
+            self.assertEqual(tokens.normalization_version, saved + 1)
+        finally:
+            token_store.NORMALIZATION_VERSION = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
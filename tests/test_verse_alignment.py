@@ -0,0 +1,88 @@
+"""
+Tests unitaires pour l'alignement des vers entre témoins (verse_alignment.py).
+"""
+
+import os
+import sys
+import unittest
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import collate
+import verse_alignment
+from config import WITNESSES
+
+VERSES = [
+    'au temps que le roy priam regnoit',
+    'en la cite de troie la grant',
+    'ot un filz qui moult fu vaillant',
+    'hector ot nom le preux le fort',
+    'qui maint chevalier mist a mort',
+]
+
+
+class TestVerseAlignment(unittest.TestCase):
+    """Tests pour verse_alignment."""
+
+    def test_identical_witnesses(self):
+        """Des témoins sans lacune sont appariés par rang."""
+        lines = verse_alignment.align_witness_verses([VERSES, list(VERSES), list(VERSES)])
+        self.assertEqual(lines, [[(i,), (i,), (i,)] for i in range(len(VERSES))])
+
+    def test_missing_verse(self):
+        """Un vers absent d'un témoin ne décale pas les vers suivants (1:0)."""
+        shorter = VERSES[:2] + VERSES[3:]
+        lines = verse_alignment.align_witness_verses([VERSES, shorter])
+        self.assertEqual(lines, [[(0,), (0,)], [(1,), (1,)], [(2,), ()], [(3,), (2,)], [(4,), (3,)]])
+
+    def test_added_verses_grouped(self):
+        """Un vers ajouté par deux témoins forme une seule ligne."""
+        added = 'et de priam la grant lignie'
+        longer = VERSES[:3] + [added + ' est'] + VERSES[3:]
+        other = VERSES[:3] + [added] + VERSES[3:]
+        lines = verse_alignment.align_witness_verses([VERSES, longer, other])
+        self.assertEqual(len(lines), len(VERSES) + 1)
+        self.assertEqual(lines[3], [(), (3,), (3,)])
+        self.assertEqual(lines[4], [(3,), (4,), (4,)])
+
+    def test_split_verse(self):
+        """Un vers coupé en deux dans un témoin est apparié aux deux moitiés (1:2)."""
+        split = VERSES[:1] + ['en la cite de troie', 'la grant'] + VERSES[2:]
+        lines = verse_alignment.align_witness_verses([VERSES, split])
+        self.assertEqual(lines[1], [(1,), (1, 2)])
+        self.assertEqual(lines[2], [(2,), (3,)])
+
+    def test_rewritten_verse(self):
+        """Un vers réécrit, sans trigrammes communs, garde sa place."""
+        rewritten = VERSES[:2] + ['xyz qwv'] + VERSES[3:]
+        lines = verse_alignment.align_witness_verses([VERSES, rewritten])
+        self.assertEqual(lines, [[(i,), (i,)] for i in range(len(VERSES))])
+
+    def test_python_matches_numpy(self):
+        """Les matrices de similarités NumPy et Python pur sont identiques."""
+        if verse_alignment.numpy is None:
+            self.skipTest("NumPy non installé")
+        a = [verse_alignment.verse_signature(text) for text in VERSES]
+        b = [verse_alignment.verse_signature(text) for text in VERSES[1:] + ['le preux']]
+        for numpy_matrix, python_matrix in zip(verse_alignment._pair_similarities_numpy(a, b),
+                                               verse_alignment._pair_similarities_python(a, b)):
+            for numpy_row, python_row in zip(numpy_matrix, python_matrix):
+                for x, y in zip(numpy_row, python_row):
+                    self.assertAlmostEqual(x, y, places=5)
+
+    @unittest.skipUnless(all(os.path.exists(path) for path in WITNESSES.values()),
+                         "Témoins fournis absents")
+    def test_bundled_chapter_with_missing_verse(self):
+        """Chapitre 2 des témoins fournis : un vers absent de BnF 1712 (vers 46)."""
+        witnesses = []
+        for name, path in WITNESSES.items():
+            verses = collate.load_witness_data(path, 3 if name == 'chantilly' else 2)
+            witnesses.append([v['text_normalized'] for v in verses if v.get('region') == 'MainZone'])
+        lines = verse_alignment.align_witness_verses(witnesses)
+        gaps = [index for index, line in enumerate(lines) if any(not indices for indices in line)]
+        self.assertEqual(gaps, [45])
+
+
+if __name__ == '__main__':
+    unittest.main()
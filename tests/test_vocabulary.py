@@ -0,0 +1,114 @@
+"""
+Tests unitaires pour le vocabulaire des formes normalisées (vocabulary.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import collate
+from vocabulary import Vocabulary, VocabularyStore
+
+
+class TestVocabulary(unittest.TestCase):
+    """Tests pour Vocabulary et VocabularyStore."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.witness_file = os.path.join(self.tmp_dir.name, 'temoin_a.json')
+        with open(self.witness_file, 'w', encoding='utf-8') as f:
+            json.dump([[{"region": "MainZone", "text": "il est ainsy il est"}]], f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_encode_is_stable(self):
+        """Une forme garde son identifiant ; les nouvelles formes sont ajoutées à la fin."""
+        vocabulary = Vocabulary(['il', 'est'])
+        self.assertEqual(vocabulary.encode(['est', 'ainsi', 'il', 'ainsi']), [1, 2, 0, 2])
+        self.assertEqual(vocabulary.decode([2, 0]), ['ainsi', 'il'])
+
+    def test_witness_frequencies_persisted(self):
+        """Les fréquences par témoin sont enregistrées et relues depuis le disque."""
+        vocab_dir = os.path.join(self.tmp_dir.name, 'vocabularies')
+        store = VocabularyStore(vocab_dir)
+        ids = store.witness_ids('oeuvre', self.witness_file)
+        self.assertEqual(store.get('oeuvre').decode(ids), ['il', 'est', 'ainsi'])
+
+        statistics = VocabularyStore(vocab_dir).statistics('oeuvre', limit=2)
+        self.assertEqual(statistics['size'], 3)
+        self.assertEqual(statistics['witnesses']['temoin_a'],
+                         {'tokens': 5, 'distinct': 3, 'top': [['il', 2], ['est', 2]]})
+        with self.assertRaises(ValueError):
+            store.save('../autre')
+
+    def test_save_merges_other_workers(self):
+        """Deux workers enregistrent des témoins différents : aucune forme ni fréquence perdue."""
+        vocab_dir = os.path.join(self.tmp_dir.name, 'vocabularies')
+        other_file = os.path.join(self.tmp_dir.name, 'temoin_b.json')
+        with open(other_file, 'w', encoding='utf-8') as f:
+            json.dump([[{"region": "MainZone", "text": "or dame il"}]], f)
+        first, second = VocabularyStore(vocab_dir), VocabularyStore(vocab_dir)
+        first.get('oeuvre')
+        second.get('oeuvre')
+
+        first_ids = first.witness_ids('oeuvre', self.witness_file)
+        second_ids = second.witness_ids('oeuvre', other_file)
+        # Les formes du premier worker gardent leurs identifiants
+        self.assertEqual(VocabularyStore(vocab_dir).get('oeuvre').decode(first_ids),
+                         ['il', 'est', 'ainsi'])
+        self.assertEqual(second.get('oeuvre').decode(second_ids), ['or', 'dame', 'il'])
+        self.assertEqual(VocabularyStore(vocab_dir).get('oeuvre').forms,
+                         ['il', 'est', 'ainsi', 'or', 'dame'])
+
+        statistics = VocabularyStore(vocab_dir).statistics('oeuvre', limit=1)
+        self.assertEqual(statistics['witnesses']['temoin_a']['top'], [['il', 2]])
+        self.assertEqual(statistics['witnesses']['temoin_b'],
+                         {'tokens': 3, 'distinct': 3, 'top': [['il', 1]]})
+        # Le premier worker retrouve les fréquences du second au prochain enregistrement
+        first.save('oeuvre')
+        self.assertEqual(sorted(first.statistics('oeuvre')['witnesses']), ['temoin_a', 'temoin_b'])
+
+    def test_process_ids_stable_across_saves(self):
+        """Les identifiants déjà attribués par un worker ne changent pas quand un autre a enregistré entre-temps."""
+        vocab_dir = os.path.join(self.tmp_dir.name, 'vocabularies')
+        other_file = os.path.join(self.tmp_dir.name, 'temoin_b.json')
+        with open(other_file, 'w', encoding='utf-8') as f:
+            json.dump([[{"region": "MainZone", "text": "or dame il"}]], f)
+        first, second = VocabularyStore(vocab_dir), VocabularyStore(vocab_dir)
+        # Forme attribuée hors témoin (repli de collate._vocabulary_tokens), pas encore enregistrée
+        joie_ids = first.get('oeuvre').encode(['joie'])
+        second_ids = second.witness_ids('oeuvre', other_file)
+
+        first_ids = first.witness_ids('oeuvre', self.witness_file)
+        self.assertEqual(first.get('oeuvre').decode(joie_ids), ['joie'])
+        self.assertEqual(first.get('oeuvre').decode(first_ids), ['il', 'est', 'ainsi'])
+        self.assertEqual(first.witness_ids('oeuvre', self.witness_file), first_ids)
+        self.assertEqual(second.witness_ids('oeuvre', self.witness_file)[0], second_ids[2])
+        self.assertEqual(second.get('oeuvre').decode(second_ids), ['or', 'dame', 'il'])
+
+        # Le fichier garde la numérotation du premier enregistrement
+        self.assertEqual(VocabularyStore(vocab_dir).get('oeuvre').forms,
+                         ['or', 'dame', 'il', 'joie', 'est', 'ainsi'])
+        for store in (first, second, VocabularyStore(vocab_dir)):
+            statistics = store.statistics('oeuvre', limit=1)
+            self.assertEqual(statistics['witnesses']['temoin_a']['top'], [['il', 2]])
+            self.assertEqual(statistics['witnesses']['temoin_b']['tokens'], 3)
+
+    def test_variants_use_identifiers(self):
+        """Les variantes sont détectées sur les identifiants de formes."""
+        tokens = [collate.token_dicts([('que', 'que', 0), ('debte', 'debte', 1)]),
+                  collate.token_dicts([('que', 'que', 0), ('dete', 'dete', 2)]),
+                  collate.token_dicts([('Que', 'que', 0), ('debte', 'debte', 1)])]
+        alignment = collate.linear_word_alignment(tokens)
+        self.assertEqual([p['has_variant'] for p in alignment], [False, True])
+        self.assertEqual(alignment[0]['words'][2]['text'], 'Que')
+
+
+if __name__ == '__main__':
+    unittest.main()
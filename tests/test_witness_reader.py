@@ -0,0 +1,45 @@
+"""
+Tests unitaires pour la lecture en flux des témoins (witness_reader.py).
+"""
+
+import unittest
+import sys
+import os
+import io
+import json
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from witness_reader import iter_chapters
+
+
+CHAPTERS = [
+    [{"region": "MainZone", "text": "Çà et là, il est ainsy", "page": "f1.xml"}],
+    [],
+    [{"region": "Rubric", "text": "« Prologue »"}, {"region": "MainZone", "text": "œuvre"}],
+]
+
+
+class TestIterChapters(unittest.TestCase):
+    """Tests pour iter_chapters."""
+
+    def test_small_blocks(self):
+        """Des blocs plus petits qu'un chapitre (et coupant des caractères UTF-8) donnent le même résultat."""
+        raw = json.dumps(CHAPTERS, ensure_ascii=False, indent=2).encode('utf-8')
+        for block_size in (1, 3, 7, 1 << 20):
+            spans = list(iter_chapters(io.BytesIO(raw), block_size=block_size))
+            self.assertEqual([chapter for chapter, _, _ in spans], CHAPTERS)
+            for chapter, offset, length in spans:
+                self.assertEqual(json.loads(raw[offset:offset + length]), chapter)
+
+    def test_empty_and_invalid(self):
+        """Un tableau vide ne produit rien ; un JSON tronqué lève une erreur."""
+        self.assertEqual(list(iter_chapters(io.BytesIO(b' [ ] '))), [])
+        self.assertEqual(list(iter_chapters(io.BytesIO(b'{"a": 1}'))), [])
+        with self.assertRaises(ValueError):
+            list(iter_chapters(io.BytesIO(b'[[1, 2], [3'), block_size=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Tests unitaires pour le cache des témoins.
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from witness_store import WitnessStore, load_chapter
+
+
+class TestWitnessStore(unittest.TestCase):
+    """Tests pour WitnessStore."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.witness_file = os.path.join(self.tmp_dir.name, 'temoin.json')
+        self._write([[{"region": "MainZone", "text": "Il est ainsy"}]])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, data, mtime=None):
+        with open(self.witness_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        if mtime is not None:
+            os.utime(self.witness_file, (mtime, mtime))
+
+    def test_cache_hit(self):
+        """Un second accès ne reparse pas le fichier."""
+        store = WitnessStore()
+        chapter = store.get_chapter(self.witness_file, 0)
+        self.assertEqual(chapter[0]['text_normalized'], 'il est ainsi')
+        store.get_chapter(self.witness_file, 0)
+        self.assertEqual(store.stats()['misses'], 1)
+        self.assertEqual(store.stats()['hits'], 1)
+        self.assertEqual(store.get_chapter(self.witness_file, 5), [])
+
+    def test_invalidation(self):
+        """Un fichier modifié ou invalidé est reparsé."""
+        store = WitnessStore()
+        store.get_chapter(self.witness_file, 0)
+        self._write([[{"region": "MainZone", "text": "autre texte plus long"}]], mtime=1)
+        self.assertEqual(store.get_chapter(self.witness_file, 0)[0]['text'], 'autre texte plus long')
+        store.invalidate(self.witness_file)
+        self.assertEqual(store.stats()['entries'], 0)
+
+    def test_reads_single_chapter(self):
+        """Seul le chapitre demandé est lu et mis en cache."""
+        self._write([
+            [{"region": "MainZone", "text": "premier"}],
+            [{"region": "MainZone", "text": "Il est ainsy"}],
+        ])
+        loaded = []
+
+        def loader(path, index):
+            loaded.append(index)
+            return load_chapter(path, index)
+
+        store = WitnessStore(loader=loader)
+        self.assertEqual(store.get_chapter(self.witness_file, 1)[0]['text_normalized'], 'il est ainsi')
+        self.assertEqual(store.get_chapter(self.witness_file, 2), [])
+        self.assertEqual(loaded, [1, 2])
+        self.assertEqual(len(store.get_chapters(self.witness_file)), 2)
+
+    def test_byte_budget(self):
+        """Les entrées dépassant le budget sont évincées."""
+        store = WitnessStore(max_bytes=os.path.getsize(self.witness_file))
+        other = os.path.join(self.tmp_dir.name, 'autre.json')
+        with open(other, 'w', encoding='utf-8') as f:
+            json.dump([[{"region": "MainZone", "text": "Il est"}]], f)
+        store.get_chapters(self.witness_file)
+        store.get_chapters(other)
+        self.assertEqual(store.stats()['entries'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour le registre des œuvres (works.py).
+"""
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajouter le dossier backend au path (imports internes du backend)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from works import WorkManager
+
+
+class TestWorkManager(unittest.TestCase):
+    """Tests pour WorkManager."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.works_file = os.path.join(self.tmp_dir.name, 'works.json')
+        self.manager = WorkManager(self.works_file, os.path.join(self.tmp_dir.name, 'input'))
+        self.upload = os.path.join(self.tmp_dir.name, 'upload.json')
+        with open(self.upload, 'w', encoding='utf-8') as f:
+            json.dump([[{"region": "MainZone", "text": "il est ainsi"}]], f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lookups(self):
+        """Œuvres et témoins sont retrouvés par identifiant."""
+        work = self.manager.add_work('Roman de Troie')
+        self.assertEqual(self.manager.add_work('Roman de Troie')['id'], 'roman_de_troie_1')
+        witness = self.manager.add_witness(work['id'], 'BnF 1712', self.upload)
+        self.assertEqual(self.manager.get_work('roman_de_troie'), work)
+        self.assertEqual(self.manager.get_witness(work['id'], 'bnf_1712'), witness)
+        self.assertIsNone(self.manager.get_witness(work['id'], 'absent'))
+        self.assertIsNone(self.manager.get_witness('absent', 'bnf_1712'))
+
+        self.manager.update_witness(work['id'], 'bnf_1712', 'BnF fr. 1712')
+        self.assertTrue(self.manager.delete_witness(work['id'], 'bnf_1712'))
+        self.assertEqual(self.manager.list_witnesses(work['id']), [])
+        self.assertTrue(self.manager.delete_work(work['id']))
+        self.assertEqual([w['id'] for w in self.manager.list_works()], ['roman_de_troie_1'])
+
+        # Le fichier sur disque reflète le registre, sans fichier temporaire laissé
+        with open(self.works_file, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['works'], self.manager.list_works())
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)),
+                         ['input', 'upload.json', 'works.json', 'works.json.lock'])
+
+    def test_reload_on_external_change(self):
+        """works.json modifié par un autre processus est relu ; sinon il ne l'est pas."""
+        self.manager.add_work('Eneas')
+        other = WorkManager(self.works_file, os.path.join(self.tmp_dir.name, 'input'))
+        loads = []
+        load_works = other._load_works
+        other._load_works = lambda: loads.append(1) or load_works()
+
+        self.assertEqual(len(other.list_works()), 1)
+        other.get_work('eneas')
+        other.list_witnesses('eneas')
+        self.assertEqual(len(loads), 1)
+
+        self.manager.add_work('Thebes')
+        self.assertIsNotNone(other.get_work('thebes'))
+        self.assertEqual(len(loads), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()